@@ -5,6 +5,7 @@ local agents/ directory. This module resolves the conflict by temporarily
 adjusting sys.path to import from site-packages.
 """
 
+import importlib
 import sys
 import os
 
@@ -25,12 +26,48 @@ else:
 
 # Import from site-packages
 from agents import Agent, Runner, function_tool, handoff, AsyncOpenAI, OpenAIChatCompletionsModel  # noqa: E402
-from agents.extensions.models.litellm_model import LitellmModel  # noqa: E402
+from agents import Model, ModelResponse, ModelSettings, RunConfig, RunHooks, Usage, set_tracing_disabled  # noqa: E402
+from agents import AgentsException, ItemHelpers, MaxTurnsExceeded  # noqa: E402
 
-# Restore sys.path and modules
+# Keep the SDK package for submodules imported later (see _import_sdk)
+_sdk_agents = sys.modules['agents']
+
+# Restore sys.path and modules. If the local package was not loaded yet,
+# drop the SDK from 'agents' anyway so a later `import agents.<module>`
+# finds the local package whatever the import order.
 sys.path = _saved_paths
 if _local_agents is not None:
     sys.modules['agents'] = _local_agents
+else:
+    sys.modules.pop('agents', None)
+
+
+def _import_sdk(name):
+    """Import an SDK submodule (e.g. 'agents.extensions...') after start-up.
+
+    The SDK package is swapped back in as 'agents' for the duration of the
+    import so the submodule resolves against site-packages.
+    """
+    local = sys.modules.get('agents')
+    sys.modules['agents'] = _sdk_agents
+    try:
+        return importlib.import_module(name)
+    finally:
+        if local is not None:
+            sys.modules['agents'] = local
+        else:
+            sys.modules.pop('agents', None)
+
+
+def __getattr__(name):
+    # LitellmModel pulls in litellm (seconds of import time); load it on first use
+    if name == 'LitellmModel':
+        return _import_sdk('agents.extensions.models.litellm_model').LitellmModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Re-export
-__all__ = ['Agent', 'Runner', 'function_tool', 'handoff', 'LitellmModel', 'AsyncOpenAI', 'OpenAIChatCompletionsModel']
+__all__ = [
+    'Agent', 'Runner', 'function_tool', 'handoff', 'LitellmModel', 'AsyncOpenAI', 'OpenAIChatCompletionsModel',
+    'Model', 'ModelResponse', 'ModelSettings', 'RunConfig', 'RunHooks', 'Usage', 'set_tracing_disabled',
+    'AgentsException', 'ItemHelpers', 'MaxTurnsExceeded',
+]
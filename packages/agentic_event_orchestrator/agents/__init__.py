@@ -18,15 +18,33 @@ from .sdk_agents import (
     run_approval,
     run_mail,
     run_orchestration,
+    # Async runner functions
+    run_triage_async,
+    run_vendor_discovery_async,
+    run_scheduler_async,
+    run_approval_async,
+    run_mail_async,
+    run_orchestration_async,
 )
 
-# Keep old imports for backward compatibility (deprecated)
-try:
-    from .event_planner_agent import EventPlannerAgent
-    from .orchestration_agent import OrchestrationAgent
-except ImportError:
-    EventPlannerAgent = None
-    OrchestrationAgent = None
+
+def __getattr__(name):
+    """Old imports kept for backward compatibility (deprecated).
+
+    Loaded on first access: they pull in google-genai and the legacy vendor
+    stack, which the SDK agents don't need.
+    """
+    if name not in ("EventPlannerAgent", "OrchestrationAgent"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        from .event_planner_agent import EventPlannerAgent
+        from .orchestration_agent import OrchestrationAgent
+    except ImportError:
+        EventPlannerAgent = None
+        OrchestrationAgent = None
+    globals().update(EventPlannerAgent=EventPlannerAgent, OrchestrationAgent=OrchestrationAgent)
+    return globals()[name]
+
 
 __all__ = [
     # OpenAI Agent SDK agents
@@ -43,6 +61,13 @@ __all__ = [
     "run_approval",
     "run_mail",
     "run_orchestration",
+    # Async runner functions
+    "run_triage_async",
+    "run_vendor_discovery_async",
+    "run_scheduler_async",
+    "run_approval_async",
+    "run_mail_async",
+    "run_orchestration_async",
     # Deprecated (for backward compatibility)
     "EventPlannerAgent",
     "OrchestrationAgent",
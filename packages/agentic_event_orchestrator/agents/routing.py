@@ -0,0 +1,291 @@
+"""
+Chat turn routing: which agent a turn starts at.
+
+Two stages run before any model call:
+
+1. PreRouter — deterministic keyword rules mirroring the TriageAgent's
+   routing instructions. A message that clearly matches one specialist is
+   dispatched to it directly; anything ambiguous or unmatched falls
+   through.
+2. Sticky routing — a session remembers the specialist that answered its
+   last turn (the run's `last_agent`) and starts the next turn there.
+
+Only when neither applies does the turn start at the TriageAgent.
+
+Ahead of both, QuickReplies answers messages that are nothing but a
+greeting, a "what can you do" or a thank-you from fixed templates — the
+TriageAgent would only have reproduced its INTRODUCTION text. Either
+shortcut skips the TriageAgent's LLM round trip; the specialist can still
+escalate by handing off, to another specialist or back to triage (see
+follow_up_agents in sdk_agents). A turn answered by the TriageAgent itself
+clears the sticky agent.
+
+The latency a shortcut saves is estimated as the recent average time the
+TriageAgent spent before handing off on turns that did go through it.
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from _agents_sdk import Agent
+from observability import REGISTRY
+
+ROUTES = REGISTRY.counter(
+    "eventai_chat_routes_total",
+    "Chat turns by starting point: triage, prerouted (keyword rules), sticky (previous "
+    "specialist), escalated (a shortcut whose specialist handed back to triage) or quick_reply "
+    "(template, no model call)",
+    ["route", "agent"],
+)
+SAVED_SECONDS = REGISTRY.counter(
+    "eventai_routing_saved_seconds_total",
+    "Estimated triage latency skipped by prerouted, sticky and quick_reply turns",
+)
+TRIAGE_HOP = REGISTRY.gauge(
+    "eventai_triage_hop_seconds", "Moving average of TriageAgent time before a handoff",
+)
+
+STATE_KEY = "active_agent"
+
+# ============================================================================
+# QUICK REPLIES (no model call)
+# ============================================================================
+
+_GREETING = (
+    r"(?:hi+|hey+|hello+|hiya|yo|howdy|greetings|good\s+(?:morning|afternoon|evening|day)|"
+    r"salam|salaam|as+alam+u?\s*o?\s*alaikum|aoa)"
+)
+_ADDRESSEE = r"(?:\s+(?:there|all|everyone|team|bot|event[- ]?ai))?"
+_CAPABILITIES = (
+    r"(?:help|menu|start|what\s+can\s+you\s+do|what\s+do\s+you\s+do|who\s+are\s+you|"
+    r"what\s+are\s+you|how\s+can\s+you\s+help(?:\s+me)?|what\s+can\s+i\s+do(?:\s+here)?|"
+    r"what\s+(?:services|features)\s+do\s+you\s+(?:offer|have))"
+)
+_THANKS = r"(?:thanks?(?:\s+you)?(?:\s+(?:so|very)\s+much|\s+a\s+lot)?|thx|ty|shukriya|jazakallah)"
+# Trailing punctuation/emoji and "please" are ignored; anything else means a real request
+_TAIL = r"(?:\s+please)?[\s!.?,:;)(\U0001F300-\U0001FAFF\u2600-\u27BF]*"
+
+THANKS_REPLY = "You're welcome! 😊 Let me know whenever you'd like to plan, book or schedule something."
+
+
+@dataclass
+class QuickReply:
+    """A templated answer for a message that needs no agent"""
+    intent: str  # "greeting", "capabilities" or "thanks"
+    text: str
+
+
+class QuickReplies:
+    """Matches whole messages that are only a greeting, capability question or thanks"""
+
+    def __init__(self, introduction: str, thanks: str = THANKS_REPLY):
+        self.templates = {"greeting": introduction, "capabilities": introduction, "thanks": thanks}
+        self.patterns = [
+            ("greeting", re.compile(rf"{_GREETING}{_ADDRESSEE}(?:[\s,!.]+{_CAPABILITIES})?{_TAIL}", re.I)),
+            ("capabilities", re.compile(rf"(?:{_GREETING}[\s,!.]+)?{_CAPABILITIES}{_TAIL}", re.I)),
+            ("thanks", re.compile(rf"(?:ok(?:ay)?[\s,!.]+)?{_THANKS}{_TAIL}", re.I)),
+        ]
+
+    @classmethod
+    def from_env(cls, introduction: str) -> Optional["QuickReplies"]:
+        """Build unless CHAT_QUICK_REPLIES is off"""
+        if os.getenv("CHAT_QUICK_REPLIES", "true").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(introduction)
+
+    def match(self, message: str) -> Optional[QuickReply]:
+        message = message.strip()
+        if len(message) > 80:
+            return None
+        for intent, pattern in self.patterns:
+            if pattern.fullmatch(message):
+                return QuickReply(intent, self.templates[intent])
+        return None
+
+
+# ============================================================================
+# KEYWORD PRE-ROUTER
+# ============================================================================
+
+# agent name -> [(regex, weight)]; mirrors the TriageAgent's ROUTING RULES
+DEFAULT_RULES: Dict[str, List[Tuple[str, float]]] = {
+    "EventPlannerAgent": [
+        (r"\bplan(?:ning)?\s+(?:an?\s+|my\s+|our\s+|the\s+)?(?:new\s+)?"
+         r"(?:event|wedding|party|birthday|mehndi|conference|corporate)\b", 1.0),
+        (r"\bcreate\s+(?:an?\s+|my\s+|new\s+)*event\b", 1.0),
+        (r"\borgani[sz]e\b", 1.0),
+    ],
+    "VendorDiscoveryAgent": [
+        (r"\b(?:find|search|searching|looking\s+for|recommend|suggest|show\s+me)\b.{0,40}"
+         r"\b(?:vendors?|caterers?|catering|photographers?|venues?|decorators?|decor|djs?|florists?|"
+         r"makeup\s+artists?|bakers?|cakes?|halls?|marquees?)\b", 1.0),
+        (r"\bvendors?\b", 0.5),
+        (r"\brecommend(?:ation)?s?\b", 0.5),
+    ],
+    "BookingAgent": [
+        (r"\b(?:book|reserve)\b", 1.0),
+        (r"\bmake\s+a\s+booking\b", 1.0),
+        (r"\b(?:my|show|list|view)\s+(?:my\s+)?bookings?\b", 2.0),
+        (r"\bcancel\b.{0,30}\b(?:booking|reservation)\b", 2.0),
+        (r"\bbookings?\b", 0.5),
+    ],
+    "SchedulerAgent": [
+        (r"\bschedul(?:e|ing)\b", 1.0),
+        (r"\btimeline\b", 1.0),
+        (r"\bwhen\s+should\b", 1.0),
+        (r"\b(?:agenda|run\s*sheet|itinerary)\b", 1.0),
+    ],
+    "ApprovalAgent": [
+        (r"\bapprov(?:e|al|als|ed|ing)\b", 1.0),
+    ],
+    "MailAgent": [
+        (r"\binvit(?:e|es|ation|ations)\b", 1.0),
+        (r"\brsvps?\b", 1.0),
+        (r"\bguest\s+list\b", 1.0),
+        (r"\bsend\b", 0.5),
+    ],
+}
+
+
+@dataclass
+class PreRouteDecision:
+    """Outcome of the keyword stage for one message"""
+    agent: Optional[str]  # None: fall back to the TriageAgent
+    confidence: float
+    scores: Dict[str, float]
+
+
+class PreRouter:
+    """Scores a message against per-agent keyword rules.
+
+    A message is dispatched when its best agent scores at least `min_score`
+    and holds at least `min_confidence` of the top-two total, i.e. it is not
+    a multi-intent request that triage (or the orchestrator) should handle.
+    """
+
+    def __init__(self, rules: Dict[str, Sequence[Tuple[str, float]]] = None,
+                 min_score: float = 1.0, min_confidence: float = 0.75):
+        rules = DEFAULT_RULES if rules is None else rules
+        self.rules = {
+            agent: [(re.compile(pattern, re.I), float(weight)) for pattern, weight in patterns]
+            for agent, patterns in rules.items()
+        }
+        self.min_score = min_score
+        self.min_confidence = min_confidence
+
+    @classmethod
+    def from_env(cls) -> Optional["PreRouter"]:
+        """Build from CHAT_PREROUTER* settings, or None when disabled.
+
+        CHAT_PREROUTER_RULES may name a JSON file of
+        {"AgentName": [["regex", weight], ...]} replacing the built-in rules.
+        """
+        if os.getenv("CHAT_PREROUTER", "true").lower() not in ("1", "true", "yes"):
+            return None
+        rules = None
+        rules_path = os.getenv("CHAT_PREROUTER_RULES")
+        if rules_path:
+            with open(rules_path, encoding="utf-8") as f:
+                rules = json.load(f)
+        return cls(rules, min_confidence=float(os.getenv("CHAT_PREROUTER_MIN_CONFIDENCE", "0.75")))
+
+    def classify(self, message: str) -> PreRouteDecision:
+        scores = {}
+        for agent, patterns in self.rules.items():
+            score = sum(weight for pattern, weight in patterns if pattern.search(message))
+            if score:
+                scores[agent] = score
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return PreRouteDecision(None, 0.0, scores)
+
+        best, top = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        confidence = top / (top + runner_up)
+        if top < self.min_score or confidence < self.min_confidence:
+            return PreRouteDecision(None, confidence, scores)
+        return PreRouteDecision(best, confidence, scores)
+
+
+# ============================================================================
+# CHAT ROUTER
+# ============================================================================
+
+@dataclass
+class Route:
+    """Where a turn starts and why"""
+    agent: Agent
+    kind: str  # "triage", "prerouted" or "sticky"
+
+
+class ChatRouter:
+    """Chooses each chat turn's starting agent"""
+
+    def __init__(self, entry_agent: Agent, follow_up_agents: Dict[str, Agent],
+                 pre_router: Optional[PreRouter] = None, sticky: bool = True, smoothing: float = 0.2):
+        self.entry_agent = entry_agent
+        self.follow_up_agents = follow_up_agents
+        self.pre_router = pre_router
+        self.sticky = sticky
+        self.smoothing = smoothing
+        self.triage_hop_seconds: Optional[float] = None
+
+    @classmethod
+    def from_env(cls, entry_agent: Agent, follow_up_agents: Dict[str, Agent]) -> "ChatRouter":
+        """Build with CHAT_STICKY_ROUTING and CHAT_PREROUTER* (both default on)"""
+        sticky = os.getenv("CHAT_STICKY_ROUTING", "true").lower() in ("1", "true", "yes")
+        return cls(entry_agent, follow_up_agents, pre_router=PreRouter.from_env(), sticky=sticky)
+
+    def select(self, state: Dict[str, Any], message: str = "") -> Route:
+        """The agent this session's next turn should start at"""
+        if self.pre_router is not None and message:
+            decision = self.pre_router.classify(message)
+            agent = self.follow_up_agents.get(decision.agent or "")
+            if agent is not None:
+                return Route(agent, "prerouted")
+        if self.sticky:
+            agent = self.follow_up_agents.get(state.get(STATE_KEY) or "")
+            if agent is not None:
+                return Route(agent, "sticky")
+        return Route(self.entry_agent, "triage")
+
+    def record(self, state: Dict[str, Any], route: Route, last_agent: Optional[Agent],
+               agent_seconds: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+        """Account for a finished turn; returns the session state with the next starting point.
+
+        `agent_seconds` is the run's per-agent breakdown (RunRecord.agents).
+        """
+        entry = self.entry_agent.name
+        last_name = last_agent.name if last_agent is not None else None
+
+        if route.kind == "triage":
+            ROUTES.inc(route="triage", agent=last_name or entry)
+            triage = agent_seconds.get(entry)
+            if triage and last_name and last_name != entry:
+                self._observe_triage_hop(triage["seconds"])
+        elif entry in agent_seconds:
+            ROUTES.inc(route="escalated", agent=route.agent.name)
+        else:
+            ROUTES.inc(route=route.kind, agent=route.agent.name)
+            if self.triage_hop_seconds is not None:
+                SAVED_SECONDS.inc(self.triage_hop_seconds)
+
+        active = last_name if last_name in self.follow_up_agents else None
+        return {**state, STATE_KEY: active}
+
+    def record_quick_reply(self):
+        """Account for a turn answered from a template; routing state is left as is"""
+        ROUTES.inc(route="quick_reply", agent=self.entry_agent.name)
+        if self.triage_hop_seconds is not None:
+            SAVED_SECONDS.inc(self.triage_hop_seconds)
+
+    def _observe_triage_hop(self, seconds: float):
+        if self.triage_hop_seconds is None:
+            self.triage_hop_seconds = seconds
+        else:
+            self.triage_hop_seconds += self.smoothing * (seconds - self.triage_hop_seconds)
+        TRIAGE_HOP.set(self.triage_hop_seconds)
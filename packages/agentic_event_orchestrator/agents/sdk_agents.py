@@ -4,7 +4,6 @@ This module defines all agents using the OpenAI Agent SDK with proper
 tool integration and agent handoffs.
 """
 
-import asyncio
 import sys, os
 
 # Load .env FIRST before anything else
@@ -18,7 +17,13 @@ if os.environ.get("OPENAI_API_KEY", "").startswith("sk-dummy"):
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from _agents_sdk import Agent, Runner, function_tool, handoff, AsyncOpenAI, OpenAIChatCompletionsModel
+from _agents_sdk import Agent, ModelSettings, RunConfig, Runner
+from observability import RUN_HOOKS, current_run, observe_run
+from llm import (
+    AgentModels, CachingModel, Cassette, LLMResponseCache, LLMTransport, PruningModel, RecordingModel, ReplayModel,
+    ToolGroup, build_llm_client,
+)
+from dataclasses import replace
 from typing import Dict, Any, Optional
 
 # Import all tools
@@ -59,15 +64,24 @@ from tools import (
 )
 
 # Gemini via OpenAI-compatible endpoint (reference: https://ai.google.dev/gemini-api/docs/openai)
+# on a pooled keep-alive transport with retries and a concurrency cap (llm/transport.py)
 gemini_api_key = os.environ.get("GEMINI_API_KEY", "")
-external_client = AsyncOpenAI(
+llm_transport = LLMTransport.from_env("gemini")
+external_client = build_llm_client(
+    base_url=os.getenv("GEMINI_BASE_URL") or "https://generativelanguage.googleapis.com/v1beta/openai/",
     api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-MODEL = OpenAIChatCompletionsModel(
-    model="gemini-3-flash-preview",
-    openai_client=external_client,
+    transport=llm_transport,
 )
+# GEMINI_MODEL for every agent, unless LLM_AGENT_MODELS picks another tier for it (llm/models.py)
+llm_models = AgentModels.from_env(external_client)
+MODEL = llm_models.model_for()
+
+# LLM_MODE=record appends every model call to LLM_CASSETTE; LLM_MODE=replay
+# answers from it with synthetic latency and never calls Gemini (llm/replay.py)
+LLM_MODE = os.getenv("LLM_MODE", "live").lower()
+llm_cassette = Cassette.from_env() if LLM_MODE in ("record", "replay") else None
+if LLM_MODE == "replay":
+    MODEL = ReplayModel.from_env(llm_cassette)
 
 # ============================================================================
 # VENDOR DISCOVERY AGENT
@@ -355,6 +369,19 @@ event_planner_agent = event_planner_agent.clone(
 # TRIAGE AGENT (Entry Point)
 # ============================================================================
 
+# Also served verbatim, without a model call, for plain greetings (see agents/routing.py)
+INTRODUCTION = """Welcome to **Event-AI** 🎉
+
+I'm your AI-powered event planning assistant. Here's what I can help you with:
+
+• 📋 **Plan Events** — Create and manage weddings, birthdays, corporate events
+• 🔍 **Find Vendors** — Search top-rated vendors in Pakistan
+• 📅 **Book Services** — Reserve vendors for your event dates
+• 📊 **Track Bookings** — View and manage your existing bookings
+• ⚡ **Smart Scheduling** — Get AI-optimized event timelines
+
+What would you like to do today?"""
+
 triage_agent = Agent(
     name="TriageAgent",
     model=MODEL,
@@ -381,18 +408,7 @@ CONVERSATION GUIDELINES:
 - Remember context from the conversation
 
 INTRODUCTION (use when user first messages or says hi):
-"Welcome to **Event-AI** 🎉
-
-I'm your AI-powered event planning assistant. Here's what I can help you with:
-
-• 📋 **Plan Events** — Create and manage weddings, birthdays, corporate events
-• 🔍 **Find Vendors** — Search top-rated vendors in Pakistan
-• 📅 **Book Services** — Reserve vendors for your event dates
-• 📊 **Track Bookings** — View and manage your existing bookings
-• ⚡ **Smart Scheduling** — Get AI-optimized event timelines
-
-What would you like to do today?"
-""",
+""" + f'"{INTRODUCTION}"\n',
     handoffs=[
         event_planner_agent,
         vendor_discovery_agent,
@@ -404,29 +420,179 @@ What would you like to do today?"
     ],
 )
 
-import nest_asyncio
-nest_asyncio.apply()
+# ============================================================================
+# PER-AGENT MODELS (model tier, record/replay, schema pruning, response cache)
+# ============================================================================
+
+# None unless LLM_CACHE_ENABLED is set
+llm_cache = LLMResponseCache.from_env()
+
+# Agents whose calls are never served from the cache (their tools write)
+LLM_CACHE_DISABLED_AGENTS = {
+    name.strip()
+    for name in os.getenv("LLM_CACHE_DISABLED_AGENTS", "BookingAgent,ApprovalAgent,MailAgent").split(",")
+    if name.strip()
+}
+
+
+def _wrap_models(agent: Agent, wrap, seen: set):
+    """Replace the model of `agent` and every agent reachable through its handoffs with `wrap(agent)`."""
+    if id(agent) in seen:
+        return
+    seen.add(id(agent))
+    agent.model = wrap(agent)
+    for target in agent.handoffs:
+        _wrap_models(getattr(target, "agent", target), wrap, seen)
+
+
+# Compact tool/handoff schemas and on-demand tool groups (llm/pruning.py)
+LLM_TOOL_SCHEMAS = os.getenv("LLM_TOOL_SCHEMAS", "full").lower()
+LLM_TOOL_GROUPS = os.getenv("LLM_TOOL_GROUPS", "false").lower() in ("1", "true", "yes")
+
+# Per agent: tools hidden on the first step of a turn unless the message matches
+TOOL_GROUPS = {
+    "VendorDiscoveryAgent": [
+        ToolGroup.of(["check_availability", "get_pricing", "get_vendor_details"],
+                     r"availab|free on|book(ed)?\b|price|pricing|cost|quote|detail|contact|review"),
+    ],
+    "EventPlannerAgent": [
+        ToolGroup.of(["get_event_details", "update_event_status"], r"detail|status|update|cancel|confirm|postpone"),
+    ],
+    "BookingAgent": [
+        ToolGroup.of(["cancel_booking", "get_booking_details"], r"cancel|detail|status|booking (id|#|number)"),
+    ],
+    "SchedulerAgent": [
+        ToolGroup.of(["check_constraints", "calculate_budget"], r"budget|cost|constraint|conflict|clash|afford"),
+    ],
+    "ApprovalAgent": [
+        ToolGroup.of(["notify_stakeholders", "record_approval_decision"],
+                     r"approve|reject|decision|decline|notify|stakeholder"),
+    ],
+    "MailAgent": [
+        ToolGroup.of(["get_detailed_rsvps", "send_reminders"], r"remind|follow[- ]?up|who|which guests|detail"),
+    ],
+}
+
+
+def _pruned_model(agent: Agent):
+    groups = TOOL_GROUPS.get(agent.name, []) if LLM_TOOL_GROUPS else []
+    return PruningModel(agent.model, agent=agent.name, compact=LLM_TOOL_SCHEMAS == "compact", groups=groups)
+
+
+def _cached_model(agent: Agent):
+    if agent.name in LLM_CACHE_DISABLED_AGENTS or isinstance(agent.model, CachingModel):
+        return agent.model
+    return CachingModel(agent.model, llm_cache, agent=agent.name)
+
+
+# Before the follow-up clones below, so they inherit the wrapped models.
+# Recording sits under the cache so only real provider calls are recorded.
+if LLM_MODE == "replay":
+    _wrap_models(triage_agent, lambda agent: agent.model.for_agent(agent.name), set())
+else:
+    _wrap_models(triage_agent, lambda agent: llm_models.model_for(agent.name), set())
+if LLM_MODE == "record":
+    _wrap_models(triage_agent, lambda agent: RecordingModel(agent.model, llm_cassette, agent=agent.name), set())
+if LLM_TOOL_SCHEMAS == "compact" or LLM_TOOL_GROUPS:
+    _wrap_models(triage_agent, _pruned_model, set())
+if llm_cache is not None:
+    _wrap_models(triage_agent, _cached_model, set())
 
 # ============================================================================
-# RUNNER FUNCTIONS
+# FOLLOW-UP AGENTS (sticky routing)
 # ============================================================================
+#
+# When a chat turn ends in a specialist, the next message in that session
+# starts at the same specialist instead of going through triage again. These
+# clones add a way back: a handoff to the TriageAgent for messages outside
+# the specialist's domain.
+
+FOLLOW_UP_INSTRUCTIONS = """
+
+FOLLOW-UP MESSAGES:
+You may receive the user's next message directly, without the TriageAgent routing it.
+If the message is about something outside your responsibilities, do not answer it yourself —
+hand off to TriageAgent so it can be routed to the right specialist.
+"""
 
-def run_triage(user_input: str) -> Any:
-    """Run the triage agent to route a user request."""
-    return Runner.run_sync(triage_agent, user_input)
 
+def _follow_up_agent(agent: Agent) -> Agent:
+    return agent.clone(
+        instructions=agent.instructions + FOLLOW_UP_INSTRUCTIONS,
+        handoffs=list(agent.handoffs) + [triage_agent],
+    )
 
-def run_vendor_discovery(query: str, context: Optional[Dict] = None) -> Any:
-    """Run the vendor discovery agent."""
+
+# Specialist name -> the agent follow-up turns start at
+follow_up_agents: Dict[str, Agent] = {
+    agent.name: _follow_up_agent(agent)
+    for agent in (
+        event_planner_agent,
+        vendor_discovery_agent,
+        booking_agent,
+        scheduler_agent,
+        approval_agent,
+        mail_agent,
+        orchestrator_agent,
+    )
+}
+
+# ============================================================================
+# RUNNER FUNCTIONS
+# ============================================================================
+#
+# Each agent has an async runner built on the awaitable ``Runner.run`` — use
+# these from FastAPI endpoints and Chainlit handlers so a single event loop
+# can hold many concurrent conversations. The sync ``run_*`` variants wrap
+# ``Runner.run_sync`` for scripts and must not be called from a running loop.
+#
+# Every run goes through run_agent / run_agent_streamed / _run_sync so the
+# shared run hooks and metrics see it. A budget on the enclosing run
+# (observe_run(..., budget=...)) sets the SDK's max_turns.
+
+def _budget_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    record = current_run()
+    budget = record.budget if record is not None else None
+    if budget is not None:
+        kwargs.setdefault("max_turns", budget.sdk_max_turns)
+    return kwargs
+
+
+async def run_agent(agent: Agent, user_input: Any, **kwargs) -> Any:
+    """Run any agent with the shared run hooks and metrics."""
+    with observe_run(agent.name):
+        return await Runner.run(agent, user_input, hooks=RUN_HOOKS, **_budget_kwargs(kwargs))
+
+
+def run_agent_streamed(agent: Agent, user_input: Any, **kwargs) -> Any:
+    """Start a streamed run with the shared run hooks.
+    
+    The caller consumes ``stream_events()`` and should do so inside
+    ``observe_run(agent.name)`` so the run is recorded. Usage is requested
+    in the stream (include_usage): Gemini's endpoint only reports it when
+    asked, and the run would otherwise count 0 tokens.
+    """
+    run_config = kwargs.get("run_config") or RunConfig()
+    kwargs["run_config"] = replace(
+        run_config, model_settings=ModelSettings(include_usage=True).resolve(run_config.model_settings),
+    )
+    return Runner.run_streamed(agent, user_input, hooks=RUN_HOOKS, **_budget_kwargs(kwargs))
+
+
+def _run_sync(agent: Agent, user_input: Any) -> Any:
+    with observe_run(agent.name):
+        return Runner.run_sync(agent, user_input, hooks=RUN_HOOKS)
+
+
+def _vendor_discovery_input(query: str, context: Optional[Dict] = None) -> str:
     input_text = query
     if context:
         input_text += f"\n\nContext: {context}"
-    return Runner.run_sync(vendor_discovery_agent, input_text)
+    return input_text
 
 
-def run_scheduler(event_details: Dict[str, Any]) -> Any:
-    """Run the scheduler agent with event details."""
-    input_text = f"""Create a schedule for:
+def _scheduler_input(event_details: Dict[str, Any]) -> str:
+    return f"""Create a schedule for:
 - Event Type: {event_details.get('event_type', 'event')}
 - Date: {event_details.get('date', 'TBD')}
 - Location: {event_details.get('location', 'TBD')}
@@ -434,44 +600,104 @@ def run_scheduler(event_details: Dict[str, Any]) -> Any:
 - Budget: PKR {event_details.get('budget', 0):,.0f}
 - Preferences: {', '.join(event_details.get('preferences', []))}
 """
-    return Runner.run_sync(scheduler_agent, input_text)
 
 
-def run_approval(plan_details: Dict[str, Any]) -> Any:
-    """Run the approval agent for a plan."""
-    input_text = f"""Process approval for:
+def _approval_input(plan_details: Dict[str, Any]) -> str:
+    return f"""Process approval for:
 - Event Type: {plan_details.get('event_type', 'event')}
 - Total Cost: PKR {plan_details.get('total_cost', 0):,.0f}
 - Vendors: {plan_details.get('vendor_count', 0)}
 - Requester: {plan_details.get('requester', 'coordinator')}
 """
-    return Runner.run_sync(approval_agent, input_text)
 
 
-def run_mail(event_details: Dict[str, Any], guests: list) -> Any:
-    """Run the mail agent for invitations."""
-    input_text = f"""Handle invitations for:
+def _mail_input(event_details: Dict[str, Any], guests: list) -> str:
+    return f"""Handle invitations for:
 - Event Type: {event_details.get('event_type', 'event')}
 - Date: {event_details.get('date', 'TBD')}
 - Location: {event_details.get('location', 'TBD')}
 - Guests: {len(guests)} recipients
 """
-    return Runner.run_sync(mail_agent, input_text)
+
+
+async def run_triage_async(user_input: str) -> Any:
+    """Run the triage agent to route a user request."""
+    return await run_agent(triage_agent, user_input)
+
+
+async def run_vendor_discovery_async(query: str, context: Optional[Dict] = None) -> Any:
+    """Run the vendor discovery agent."""
+    return await run_agent(vendor_discovery_agent, _vendor_discovery_input(query, context))
+
+
+async def run_scheduler_async(event_details: Dict[str, Any]) -> Any:
+    """Run the scheduler agent with event details."""
+    return await run_agent(scheduler_agent, _scheduler_input(event_details))
+
+
+async def run_approval_async(plan_details: Dict[str, Any]) -> Any:
+    """Run the approval agent for a plan."""
+    return await run_agent(approval_agent, _approval_input(plan_details))
+
+
+async def run_mail_async(event_details: Dict[str, Any], guests: list) -> Any:
+    """Run the mail agent for invitations."""
+    return await run_agent(mail_agent, _mail_input(event_details, guests))
+
+
+async def run_orchestration_async(user_input: str) -> Any:
+    """Run the full orchestration workflow."""
+    return await run_agent(orchestrator_agent, user_input)
+
+
+async def run_booking_async(user_input: str) -> Any:
+    """Run the booking agent."""
+    return await run_agent(booking_agent, user_input)
+
+
+async def run_event_planning_async(user_input: str) -> Any:
+    """Run the event planner agent."""
+    return await run_agent(event_planner_agent, user_input)
+
+
+def run_triage(user_input: str) -> Any:
+    """Run the triage agent to route a user request."""
+    return _run_sync(triage_agent, user_input)
+
+
+def run_vendor_discovery(query: str, context: Optional[Dict] = None) -> Any:
+    """Run the vendor discovery agent."""
+    return _run_sync(vendor_discovery_agent, _vendor_discovery_input(query, context))
+
+
+def run_scheduler(event_details: Dict[str, Any]) -> Any:
+    """Run the scheduler agent with event details."""
+    return _run_sync(scheduler_agent, _scheduler_input(event_details))
+
+
+def run_approval(plan_details: Dict[str, Any]) -> Any:
+    """Run the approval agent for a plan."""
+    return _run_sync(approval_agent, _approval_input(plan_details))
+
+
+def run_mail(event_details: Dict[str, Any], guests: list) -> Any:
+    """Run the mail agent for invitations."""
+    return _run_sync(mail_agent, _mail_input(event_details, guests))
 
 
 def run_orchestration(user_input: str) -> Any:
     """Run the full orchestration workflow."""
-    return Runner.run_sync(orchestrator_agent, user_input)
+    return _run_sync(orchestrator_agent, user_input)
 
 
 def run_booking(user_input: str) -> Any:
     """Run the booking agent."""
-    return Runner.run_sync(booking_agent, user_input)
+    return _run_sync(booking_agent, user_input)
 
 
 def run_event_planning(user_input: str) -> Any:
     """Run the event planner agent."""
-    return Runner.run_sync(event_planner_agent, user_input)
+    return _run_sync(event_planner_agent, user_input)
 
 
 # ============================================================================
@@ -488,7 +714,16 @@ __all__ = [
     "booking_agent",
     "event_planner_agent",
     "orchestrator_agent",
+    "follow_up_agents",
+    "INTRODUCTION",
+    "llm_cache",
+    "llm_cassette",
+    "llm_models",
+    "llm_transport",
+    "LLM_MODE",
     # Runner functions
+    "run_agent",
+    "run_agent_streamed",
     "run_triage",
     "run_vendor_discovery",
     "run_scheduler",
@@ -497,4 +732,13 @@ __all__ = [
     "run_orchestration",
     "run_booking",
     "run_event_planning",
+    # Async runner functions
+    "run_triage_async",
+    "run_vendor_discovery_async",
+    "run_scheduler_async",
+    "run_approval_async",
+    "run_mail_async",
+    "run_orchestration_async",
+    "run_booking_async",
+    "run_event_planning_async",
 ]
@@ -1,5 +1,5 @@
 import chainlit as cl
-from agents.sdk_agents import run_orchestration, run_vendor_discovery
+from agents.sdk_agents import run_orchestration_async, run_vendor_discovery_async
 from nlp_processor.structured_output import EventRequirements
 import json
 
@@ -27,7 +27,7 @@ async def main(message: cl.Message):
     
     try:
         # Use the orchestrator agent to handle the complete workflow
-        result = run_orchestration(message.content)
+        result = await run_orchestration_async(message.content)
         
         # Format and display the result
         response_text = f"""{result.final_output}
@@ -52,7 +52,7 @@ async def main(message: cl.Message):
             if res and res.get("value") == "approve":
                 await cl.Message(content="✅ Processing approval and booking...").send()
                 # Trigger approval workflow
-                approval_result = run_orchestration("Approve the plan and proceed with booking and invitations")
+                approval_result = await run_orchestration_async("Approve the plan and proceed with booking and invitations")
                 await cl.Message(content=f"✅ {approval_result.final_output}").send()
             elif res and res.get("value") == "modify":
                 await cl.Message(content="📝 Please describe what changes you'd like to make...").send()
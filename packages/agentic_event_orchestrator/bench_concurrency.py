@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Load test: async /api/chat vs the legacy Runner.run_sync endpoint.
+
+Every agent's model is swapped for a stand-in that sleeps for a fixed
+"LLM latency" and answers with a short message, so the numbers measure the
+serving model only — no Gemini key or network needed.
+
+Run: python bench_concurrency.py --requests 200 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Measure raw serving capacity, not the admission limits
+os.environ.setdefault("LLM_MAX_CONCURRENCY", "100000")
+os.environ.setdefault("LLM_PER_KEY_CONCURRENCY", "100000")
+# "hi" would be answered from a template without reaching the model
+os.environ.setdefault("CHAT_QUICK_REPLIES", "false")
+
+import httpx
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+
+import server
+from _agents_sdk import Model, ModelResponse, Runner, Usage, set_tracing_disabled
+from agents.sdk_agents import follow_up_agents, triage_agent
+from llm.cache import replay_events
+
+
+class SleepyModel(Model):
+    """Stand-in model that waits `latency` seconds and returns a fixed reply."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        message = ResponseOutputMessage(
+            id="msg_bench",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text="Happy to help!", annotations=[])],
+        )
+        return ModelResponse(output=[message], usage=Usage(), response_id=None)
+
+    async def stream_response(self, *args, **kwargs):
+        """The same reply as get_response, streamed as one text delta"""
+        response = await self.get_response(*args, **kwargs)
+        for event in replay_events(response.output, "sleepy-model", response.usage):
+            yield event
+
+
+def install_model(agent, model, seen=None):
+    """Point `agent` and every agent reachable through its handoffs at `model`."""
+    seen = seen if seen is not None else set()
+    if id(agent) in seen:
+        return
+    seen.add(id(agent))
+    agent.model = model
+    for target in agent.handoffs:
+        install_model(getattr(target, "agent", target), model, seen)
+
+
+@server.app.post("/bench/chat-sync")
+def legacy_chat(request: server.ChatRequest):
+    """The pre-async endpoint shape: a sync def blocking a threadpool worker."""
+    result = Runner.run_sync(triage_agent, request.message)
+    return {"response": result.final_output}
+
+
+async def fire(path: str, total: int) -> float:
+    transport = httpx.ASGITransport(app=server.app)
+    headers = {"X-API-Key": server.AI_SERVICE_API_KEY}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=None) as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post(path, json={"message": "hi", "session_id": f"bench-{i}"})
+            for i in range(total)
+        ])
+        elapsed = time.perf_counter() - start
+    failed = [r for r in responses if r.status_code != 200]
+    if failed:
+        raise SystemExit(f"{path}: {len(failed)} requests failed (first: {failed[0].status_code})")
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="concurrent requests per run")
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated LLM latency (s)")
+    args = parser.parse_args()
+
+    set_tracing_disabled(True)
+    model = SleepyModel(args.latency)
+    install_model(triage_agent, model)
+    for agent in follow_up_agents.values():
+        install_model(agent, model)
+
+    print(f"{args.requests} concurrent requests, {args.latency:.2f}s simulated LLM latency")
+    for label, path in (("sync  run_sync", "/bench/chat-sync"), ("async Runner.run", "/api/chat")):
+        calls = model.calls
+        elapsed = await fire(path, args.requests)
+        # Every request must have reached the model, or the timing measures a shortcut
+        assert model.calls - calls >= args.requests, f"{path}: only {model.calls - calls} model calls"
+        print(f"  {label:<18} {elapsed:6.2f}s wall  {args.requests / elapsed:7.1f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
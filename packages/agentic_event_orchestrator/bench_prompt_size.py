@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Prompt size per agent with full vs pruned tool and handoff schemas.
+
+For every agent, serializes what the first model call of a turn sends —
+instructions plus tool and handoff schemas, as the Chat Completions
+converter renders them — under each pruning mode (see llm/pruning.py)
+and reports the tokens. Tokens are counted with tiktoken's o200k encoding
+when it can be loaded, else estimated at 4 characters per token; Gemini's
+own count differs a little but the relative savings hold.
+
+With --live N each agent/mode pair is also sent N times to the configured
+provider (GEMINI_API_KEY, or GEMINI_BASE_URL for mock_openai_server.py)
+to report the prompt tokens the provider bills and the median latency.
+
+Run: python bench_prompt_size.py [--message "Find caterers in Lahore"] [--live 3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from agents.sdk_agents import TOOL_GROUPS, follow_up_agents, llm_models, triage_agent
+import _agents_sdk
+from _agents_sdk import ModelSettings, handoff, set_tracing_disabled
+from llm import PruningModel
+
+MODES = {
+    "full": dict(compact=False, groups=False),
+    "compact": dict(compact=True, groups=False),
+    "groups": dict(compact=False, groups=True),
+    "compact+groups": dict(compact=True, groups=True),
+}
+
+
+def _tokenizer():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("o200k_base")
+        return "o200k", lambda text: len(encoding.encode(text))
+    except Exception:
+        return "chars/4", lambda text: (len(text) + 3) // 4
+
+
+def _pruner(agent, mode: str) -> PruningModel:
+    settings = MODES[mode]
+    groups = TOOL_GROUPS.get(agent.name, []) if settings["groups"] else []
+    return PruningModel(None, agent=agent.name, compact=settings["compact"], groups=groups)
+
+
+def _call_args(agent, mode: str, message: str):
+    """(instructions, tools, handoffs) for the agent's first call of a turn under `mode`"""
+    handoffs = [target if hasattr(target, "tool_name") else handoff(target) for target in agent.handoffs]
+    tools, handoffs = _pruner(agent, mode).prune(message, list(agent.tools), handoffs)
+    return agent.instructions if isinstance(agent.instructions, str) else "", tools, handoffs
+
+
+def measure_offline(agents, message: str):
+    converter = _agents_sdk._import_sdk("agents.models.chatcmpl_converter").Converter
+    tokenizer, count = _tokenizer()
+    print(f"First-call prompt tokens ({tokenizer}) for {message!r}")
+    print(f"  {'agent':<22}{'instr':>7}" + "".join(f"{mode:>16}" for mode in MODES))
+    totals = {mode: 0 for mode in MODES}
+    for agent in agents:
+        row = f"  {agent.name:<22}"
+        for mode in MODES:
+            instructions, tools, handoffs = _call_args(agent, mode, message)
+            schemas = [converter.tool_to_openai(tool) for tool in tools]
+            schemas += [converter.convert_handoff_tool(h) for h in handoffs]
+            if mode == "full":
+                row += f"{count(instructions):>7}"
+            tokens = count(instructions) + count(json.dumps(schemas))
+            totals[mode] += tokens
+            row += f"{tokens:>10} ({len(schemas):>2}t)"
+        print(row)
+    baseline = totals["full"]
+    print(f"  {'total':<29}" + "".join(
+        f"{totals[mode]:>10} {-(1 - totals[mode] / baseline) * 100:>4.0f}%" for mode in MODES
+    ))
+
+
+async def measure_live(agents, message: str, repeat: int):
+    print(f"\nLive: provider prompt tokens and median latency over {repeat} calls")
+    print(f"  {'agent':<22}" + "".join(f"{mode:>16}" for mode in MODES))
+    settings = ModelSettings(max_tokens=16)
+    for agent in agents:
+        provider = llm_models.model_for(agent.name)
+        row = f"  {agent.name:<22}"
+        for mode in MODES:
+            pruner = _pruner(agent, mode)
+            pruner.model = provider
+            instructions, _, _ = _call_args(agent, "full", message)
+            handoffs = [target if hasattr(target, "tool_name") else handoff(target) for target in agent.handoffs]
+            latencies, prompt_tokens = [], 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                response = await pruner.get_response(
+                    instructions, message, settings, list(agent.tools), None, handoffs, None,
+                    previous_response_id=None, conversation_id=None, prompt=None,
+                )
+                latencies.append(time.perf_counter() - start)
+                prompt_tokens = response.usage.input_tokens
+            row += f"{prompt_tokens:>8} {statistics.median(latencies) * 1000:>5.0f}ms"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--message", default="Find caterers in Lahore for 200 guests")
+    parser.add_argument("--live", type=int, default=0, help="also call the provider N times per agent and mode")
+    args = parser.parse_args()
+
+    set_tracing_disabled(True)
+    # Follow-up clones carry the extra handoff back to triage, as in a chat session
+    agents = [triage_agent, *follow_up_agents.values()]
+    measure_offline(agents, args.message)
+    if args.live:
+        asyncio.run(measure_live(agents, args.message, args.live))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Offline /api/chat benchmark against recorded model calls.
+
+Runs the server in-process with LLM_MODE=replay (see llm/replay.py): the
+agents, handoffs, tools, sessions and middleware are real, only the model
+is answered from a cassette after a synthetic delay. Reports throughput,
+latency percentiles and where each request's time went — replayed model
+latency, tool execution, and the rest (framework overhead).
+
+bench_cassette.jsonl holds a small hand-written conversation set; record
+your own with LLM_MODE=record LLM_CASSETTE=my.jsonl against Gemini.
+
+Run: python bench_replay.py --requests 200 --concurrency 50 --scale 0.1
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+MESSAGES = [
+    "Find caterers in Lahore for 200 guests under 5 lakh",
+    "I need some help getting ready for my sister's big day",
+    "Plan a birthday party for 50 people in Karachi",
+    "Schedule a venue visit next Friday",
+]
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def fire(server, total: int, concurrency: int):
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=server.app)
+    headers = {"X-API-Key": server.AI_SERVICE_API_KEY}
+    latencies = []
+    agents = {}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=None) as client:
+        async def one(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/api/chat", json={
+                    "message": MESSAGES[i % len(MESSAGES)], "session_id": f"replay-{i}",
+                })
+                latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise SystemExit(f"/api/chat returned {response.status_code}: {response.text[:200]}")
+            agent = response.json()["agent"]
+            agents[agent] = agents.get(agent, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*[one(i) for i in range(total)])
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies, agents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cassette", default=os.path.join(HERE, "bench_cassette.jsonl"))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, help="fixed model latency per call (s); default: recorded")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier on the model latency")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± fraction of random spread")
+    args = parser.parse_args()
+
+    # Must be set before the agents are built
+    os.environ["LLM_MODE"] = "replay"
+    os.environ["LLM_CASSETTE"] = args.cassette
+    os.environ["LLM_REPLAY_LATENCY"] = "" if args.latency is None else str(args.latency)
+    os.environ["LLM_REPLAY_LATENCY_SCALE"] = str(args.scale)
+    os.environ["LLM_REPLAY_JITTER"] = str(args.jitter)
+    # Measure the orchestrator, not the admission limits
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", "100000")
+    os.environ.setdefault("LLM_PER_KEY_CONCURRENCY", "100000")
+    os.environ.setdefault("LLM_MAX_QUEUE", "100000")
+
+    import server
+    from _agents_sdk import set_tracing_disabled
+    from agents.sdk_agents import follow_up_agents, llm_cassette, triage_agent
+    from llm.replay import REPLAY_CALLS, REPLAY_LATENCY
+    from observability.tools import TOOL_CALLS, TOOL_LATENCY
+
+    set_tracing_disabled(True)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    agent_names = [triage_agent.name, *follow_up_agents]
+    tool_names = sorted({tool.name for agent in follow_up_agents.values() for tool in agent.tools})
+
+    elapsed, latencies, agents = asyncio.run(fire(server, args.requests, args.concurrency))
+
+    model_seconds = sum(REPLAY_LATENCY.value(agent=name) for name in agent_names)
+    tool_seconds = sum(TOOL_LATENCY.sum(tool=name) for name in tool_names)
+    tool_calls = sum(TOOL_CALLS.value(tool=name) for name in tool_names)
+    matches = {
+        match: sum(REPLAY_CALLS.value(agent=name, match=match) for name in agent_names)
+        for match in ("exact", "user_step", "step", "miss")
+    }
+    framework = sum(latencies) - model_seconds - tool_seconds
+    n = len(latencies)
+
+    print(f"{n} requests, concurrency {args.concurrency}, cassette {os.path.basename(args.cassette)} "
+          f"({llm_cassette.entries} calls), latency scale {args.scale:g}")
+    print(f"  throughput   {n / elapsed:8.1f} req/s  ({elapsed:.2f}s wall)")
+    print(f"  latency      p50 {statistics.median(latencies) * 1000:7.1f}ms  "
+          f"p95 {_percentile(latencies, 0.95) * 1000:7.1f}ms  p99 {_percentile(latencies, 0.99) * 1000:7.1f}ms")
+    print("  per request (mean):")
+    print(f"    model      {model_seconds / n * 1000:8.1f}ms  (replayed)")
+    print(f"    tools      {tool_seconds / n * 1000:8.1f}ms  ({tool_calls / n:.2f} calls)")
+    print(f"    framework  {framework / n * 1000:8.1f}ms")
+    print(f"  replay matches {matches}")
+    print(f"  answered by    {agents}")
+
+
+if __name__ == "__main__":
+    main()
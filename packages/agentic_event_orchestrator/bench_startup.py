@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Start-up benchmark: how long `import server` takes, and what it drags in.
+
+Runs `python -X importtime -c "import server"` in fresh interpreters and
+checks the median cumulative import times against startup_budget.json:
+
+- total_ms: the whole `import server`
+- modules: per-module cumulative budgets (e.g. agents.sdk_agents, tools)
+- forbidden: heavy optional dependencies that must only load on first use
+  (litellm, google.genai, chainlit, psycopg2)
+
+Exits non-zero when a budget is exceeded or a forbidden module is
+imported, so it can gate CI. --update rewrites the time budgets from the
+current measurements plus headroom.
+
+Run: python bench_startup.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGET = os.path.join(HERE, "startup_budget.json")
+
+
+def profile_imports(target: str = "server"):
+    """One cold import of `target`: {module: cumulative µs} in first-import order"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    # litellm fetches its cost map over the network at import unless told not to
+    env.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=HERE, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def imported(modules, package: str) -> bool:
+    return any(name == package or name.startswith(package + ".") for name in modules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", default="server")
+    parser.add_argument("--budget", default=DEFAULT_BUDGET)
+    parser.add_argument("--top", type=int, default=15, help="slowest top-level imports to list")
+    parser.add_argument("--update", action="store_true", help="write measured times (+50%%) as the new budgets")
+    args = parser.parse_args()
+
+    with open(args.budget, encoding="utf-8") as f:
+        budget = json.load(f)
+
+    samples = defaultdict(list)
+    runs = []
+    for _ in range(max(1, args.runs)):
+        modules = profile_imports(args.target)
+        runs.append(modules)
+        for name, micros in modules.items():
+            samples[name].append(micros / 1000)
+    median = {name: statistics.median(values) for name, values in samples.items()}
+
+    total = median[args.target]
+    print(f"import {args.target}: median {total:.0f}ms over {len(runs)} runs "
+          f"(min {min(samples[args.target]):.0f}ms, max {max(samples[args.target]):.0f}ms)")
+
+    print("\nSlowest imports (median cumulative ms):")
+    ranked = sorted((m for m in median if m != args.target), key=median.get, reverse=True)
+    for name in ranked[:args.top]:
+        print(f"  {median[name]:8.1f}  {name}")
+
+    failures = []
+    if total > budget["total_ms"]:
+        failures.append(f"import {args.target} took {total:.0f}ms (budget {budget['total_ms']}ms)")
+    for name, limit in budget.get("modules", {}).items():
+        if name in median and median[name] > limit:
+            failures.append(f"{name} took {median[name]:.0f}ms (budget {limit}ms)")
+    for package in budget.get("forbidden", []):
+        if any(imported(modules, package) for modules in runs):
+            failures.append(f"{package} is imported at start-up; it should load on first use")
+
+    if args.update:
+        budget["total_ms"] = round(total * 1.5)
+        for name in budget.get("modules", {}):
+            if name in median:
+                budget["modules"][name] = round(median[name] * 1.5)
+        with open(args.budget, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"\nBudgets updated in {args.budget}")
+
+    if failures:
+        print("\nStart-up budget exceeded:")
+        for failure in failures:
+            print(f"  ❌ {failure}")
+        sys.exit(1)
+    print("\n✅ Within start-up budget")
+
+
+if __name__ == "__main__":
+    main()
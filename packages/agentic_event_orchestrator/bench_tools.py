@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Per-turn tool latency: a turn's tool calls run serially vs on the tool pool.
+
+A stand-in VendorDiscovery model asks, in one turn, for check_availability
+and get_pricing on --vendors vendors, then answers. The tools block for a
+fixed time each (as tools/ do on `requests`), vendor i taking
+latency * (1 + i/10) so the calls differ. The same run is made with a
+one-thread tool pool (calls one after another) and with TOOL_MAX_WORKERS
+threads, and the per-turn breakdown from RunRecord.turn_breakdown() is
+printed: model time, tool calls, wall time, busy time (the serial cost)
+and the slowest call. No Gemini key or network needed.
+
+Run: python bench_tools.py --vendors 5 --latency 0.3
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText
+
+from _agents_sdk import Agent, Model, ModelResponse, Runner, Usage, set_tracing_disabled
+from llm.cache import replay_events
+from observability import RUN_HOOKS, observe_run
+from observability.tools import configure_tool_pool, function_tool
+
+LATENCY = 0.3
+
+
+def _io(vendor_id: str):
+    index = int(vendor_id.lstrip("v") or 0)
+    time.sleep(LATENCY * (1 + index / 10))
+
+
+@function_tool
+def check_availability(vendor_id: str, event_date: str) -> str:
+    """Check if a vendor is available on the event date."""
+    _io(vendor_id)
+    return f"{vendor_id} is available on {event_date}"
+
+
+@function_tool
+def get_pricing(vendor_id: str) -> str:
+    """Get a vendor's pricing."""
+    _io(vendor_id)
+    return f"{vendor_id}: PKR 150,000"
+
+
+class FanOutModel(Model):
+    """Asks for both tools on every vendor in one turn, then answers"""
+
+    def __init__(self, vendors: int, latency: float):
+        self.vendors = vendors
+        self.latency = latency
+
+    async def get_response(self, system_instructions, input, *args, **kwargs) -> ModelResponse:
+        await asyncio.sleep(self.latency)
+        if any(isinstance(item, dict) and item.get("type") == "function_call_output" for item in input):
+            output = [ResponseOutputMessage(
+                id="msg_bench", type="message", role="assistant", status="completed",
+                content=[ResponseOutputText(type="output_text", text="All vendors are available.", annotations=[])],
+            )]
+        else:
+            output = []
+            for i in range(self.vendors):
+                output.append(ResponseFunctionToolCall(
+                    type="function_call", call_id=f"avail_{i}", name="check_availability",
+                    arguments=f'{{"vendor_id": "v{i}", "event_date": "2026-12-20"}}',
+                ))
+                output.append(ResponseFunctionToolCall(
+                    type="function_call", call_id=f"price_{i}", name="get_pricing", arguments=f'{{"vendor_id": "v{i}"}}',
+                ))
+        return ModelResponse(output=output, usage=Usage(requests=1), response_id=None)
+
+    async def stream_response(self, *args, **kwargs):
+        """The same turn as get_response, streamed as replayed events"""
+        response = await self.get_response(*args, **kwargs)
+        for event in replay_events(response.output, "fan-out-model", response.usage):
+            yield event
+
+
+async def run_once(agent):
+    with observe_run(agent.name) as record:
+        started = time.perf_counter()
+        await Runner.run(agent, "Check availability and pricing for the shortlisted vendors", hooks=RUN_HOOKS)
+        return time.perf_counter() - started, record.turn_breakdown()
+
+
+def report(label: str, seconds: float, breakdown):
+    print(f"\n{label}: run {seconds:.2f}s")
+    print(f"  {'turn':<6}{'agent':<24}{'model':>8}{'calls':>7}{'wall':>8}{'busy':>8}{'slowest':>10}")
+    for turn in breakdown:
+        print(f"  {turn['turn']:<6}{turn['agent']:<24}{turn['llm_seconds']:>7.2f}s{turn['tool_calls']:>7}"
+              f"{turn['tools_wall_seconds']:>7.2f}s{turn['tools_busy_seconds']:>7.2f}s"
+              f"{turn['slowest_tool_seconds']:>9.2f}s")
+
+
+def main():
+    global LATENCY
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--vendors", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per tool call (vendor 0)")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="seconds per model call")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("TOOL_MAX_WORKERS", "16")))
+    args = parser.parse_args()
+    LATENCY = args.latency
+
+    set_tracing_disabled(True)
+    agent = Agent(name="VendorDiscoveryAgent", instructions="Find vendors",
+                  model=FanOutModel(args.vendors, args.model_latency), tools=[check_availability, get_pricing])
+
+    configure_tool_pool(1)
+    report("Serial (1 tool thread)", *asyncio.run(run_once(agent)))
+    configure_tool_pool(args.workers)
+    report(f"Concurrent ({args.workers} tool threads)", *asyncio.run(run_once(agent)))
+
+
+if __name__ == "__main__":
+    main()
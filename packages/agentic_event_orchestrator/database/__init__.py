@@ -3,18 +3,17 @@ Database connection and vendor repository for PostgreSQL.
 Connects the Python agents to the shared PostgreSQL database.
 """
 
+import importlib.util
 import os
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
 import json
 
-# Try to import psycopg2, fall back to sample data if not available
-try:
-    import psycopg2
-    from psycopg2.extras import RealDictCursor
-    POSTGRES_AVAILABLE = True
-except ImportError:
-    POSTGRES_AVAILABLE = False
+from observability.tracing import span
+
+# psycopg2 is imported on first connection; fall back to sample data if not available
+POSTGRES_AVAILABLE = importlib.util.find_spec("psycopg2") is not None
+if not POSTGRES_AVAILABLE:
     print("psycopg2 not installed. Using sample data.")
 
 
@@ -61,6 +60,7 @@ class DatabaseConnection:
             return None
         
         if self._conn is None or self._conn.closed:
+            import psycopg2
             try:
                 if self.connection_string:
                     self._conn = psycopg2.connect(self.connection_string)
@@ -102,6 +102,7 @@ class VendorRepository:
             # Fallback to sample data
             return self._get_sample_vendors(event_type, location, budget, keywords, limit)
         
+        from psycopg2.extras import RealDictCursor
         try:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 # Build query
@@ -134,8 +135,10 @@ class VendorRepository:
                 query += " ORDER BY rating DESC LIMIT %s"
                 params.append(limit)
                 
-                cur.execute(query, params)
-                rows = cur.fetchall()
+                with span("db.query", kind="client", **{"db.system": "postgresql", "db.operation": "search_vendors"}) as s:
+                    cur.execute(query, params)
+                    rows = cur.fetchall()
+                    s.set_attribute("db.rows", len(rows))
                 
                 return [self._row_to_vendor(row) for row in rows]
                 
@@ -150,8 +153,10 @@ class VendorRepository:
         if conn is None:
             return None
         
+        from psycopg2.extras import RealDictCursor
         try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur, \
+                    span("db.query", kind="client", **{"db.system": "postgresql", "db.operation": "get_vendor_by_id"}):
                 cur.execute("""
                     SELECT 
                         id::text, name, category, description,
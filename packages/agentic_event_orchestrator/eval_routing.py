@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation of the keyword pre-router against a labelled corpus.
+
+Each corpus line is {"message": ..., "agent": ...} where `agent` is the
+specialist the turn belongs to. Labels that are not a specialist
+(TriageAgent, OrchestratorAgent) mark messages the pre-router should leave
+to LLM triage: greetings, vague or multi-intent requests.
+
+Reported:
+- coverage: share of messages dispatched without triage
+- precision: share of dispatched messages that reached the right agent
+- fallbacks, split into correct (labelled for triage) and missed
+- per-agent confusion
+- classifier latency
+- estimated triage latency saved, net of mis-routes (a wrong specialist
+  costs a hop of its own before escalating)
+
+Run: python eval_routing.py --corpus routing_corpus.jsonl --triage-seconds 1.2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from agents.routing import DEFAULT_RULES, PreRouter
+
+FALLBACK = "(triage)"
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(router, corpus, repeat):
+    rows = []
+    timings = []
+    for example in corpus:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            decision = router.classify(example["message"])
+            timings.append((time.perf_counter() - started) * 1e6)
+        rows.append((example, decision))
+    return rows, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                         "routing_corpus.jsonl"))
+    parser.add_argument("--rules", help="JSON rules file (as for CHAT_PREROUTER_RULES)")
+    parser.add_argument("--min-confidence", type=float, default=0.75)
+    parser.add_argument("--triage-seconds", type=float, default=1.2,
+                        help="TriageAgent latency before a handoff (see eventai_triage_hop_seconds)")
+    parser.add_argument("--repeat", type=int, default=200, help="classify() calls per message for timing")
+    parser.add_argument("--show-errors", action="store_true")
+    args = parser.parse_args()
+
+    rules = None
+    if args.rules:
+        with open(args.rules, encoding="utf-8") as f:
+            rules = json.load(f)
+    router = PreRouter(rules, min_confidence=args.min_confidence)
+    specialists = set(rules or DEFAULT_RULES)
+
+    corpus = load_corpus(args.corpus)
+    rows, timings = evaluate(router, corpus, max(1, args.repeat))
+
+    confusion = defaultdict(Counter)
+    correct = wrong = fallback_ok = fallback_missed = 0
+    errors = []
+    for example, decision in rows:
+        expected = example["agent"]
+        got = decision.agent or FALLBACK
+        confusion[expected][got] += 1
+        if decision.agent is None:
+            if expected in specialists:
+                fallback_missed += 1
+            else:
+                fallback_ok += 1
+        elif decision.agent == expected:
+            correct += 1
+        else:
+            wrong += 1
+            errors.append((example["message"], expected, got, decision.scores))
+
+    total = len(rows)
+    dispatched = correct + wrong
+    saved = correct * args.triage_seconds
+    # A mis-route runs the wrong specialist (about one hop) and then triage anyway
+    lost = wrong * args.triage_seconds
+    timings.sort()
+
+    print(f"Corpus: {total} messages from {args.corpus}")
+    print(f"Coverage:   {dispatched}/{total} dispatched without triage ({dispatched / total:.0%})")
+    print(f"Precision:  {correct}/{dispatched} dispatched to the right agent "
+          f"({correct / dispatched:.0%})" if dispatched else "Precision:  n/a (nothing dispatched)")
+    print(f"Fallbacks:  {fallback_ok} correct (triage/multi-intent), {fallback_missed} missed specialists")
+    print(f"Accuracy:   {(correct + fallback_ok) / total:.0%} "
+          "(dispatched correctly or rightly left to triage)")
+    print(f"Classifier: mean {statistics.mean(timings):.1f}µs, "
+          f"p99 {timings[int(len(timings) * 0.99) - 1]:.1f}µs per message")
+    print(f"Saved:      {saved - lost:.1f}s net over the corpus "
+          f"({saved:.1f}s skipped, {lost:.1f}s lost to mis-routes), "
+          f"{(saved - lost) / total * 1000:.0f}ms per turn at {args.triage_seconds}s per triage hop")
+
+    print("\nConfusion (expected -> routed):")
+    for expected in sorted(confusion):
+        cells = ", ".join(f"{got}: {n}" for got, n in confusion[expected].most_common())
+        print(f"  {expected:22} {cells}")
+
+    if args.show_errors and errors:
+        print("\nMis-routes:")
+        for message, expected, got, scores in errors:
+            print(f"  {message!r}: expected {expected}, got {got} {scores}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Model-call layers that sit between the agents and the model provider.
+"""
+
+from .cache import CachingModel, LLMResponseCache
+from .models import AgentModels
+from .pruning import PruningModel, ToolGroup
+from .replay import Cassette, RecordingModel, ReplayMiss, ReplayModel
+from .transport import LLMTransport, build_llm_client
+
+__all__ = [
+    "AgentModels",
+    "PruningModel",
+    "ToolGroup",
+    "CachingModel",
+    "LLMResponseCache",
+    "Cassette",
+    "RecordingModel",
+    "ReplayMiss",
+    "ReplayModel",
+    "LLMTransport",
+    "build_llm_client",
+]
@@ -0,0 +1,302 @@
+"""
+Memoization of model calls.
+
+CachingModel wraps a Model (OpenAIChatCompletionsModel in practice) and
+answers a call from LLMResponseCache when an identical call was made
+within the TTL. The key is a hash of everything that determines the
+model's answer: model name, system instructions, input items, tool and
+handoff schemas, output schema and sampling settings. Repeated discovery
+queries, tool-result summaries over the same vendor list and the
+TriageAgent's introduction are then paid for once.
+
+The cache has two tiers: an in-process LRU, and optionally a directory of
+JSON files shared by workers and kept across restarts. Both honour the
+TTL. Cached responses report zero usage; the tokens they would have cost
+are counted in eventai_llm_cache_saved_tokens_total.
+
+Caching is chosen per agent: each agent gets its own CachingModel (for
+per-agent hit accounting) unless it is listed in LLM_CACHE_DISABLED_AGENTS.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseOutputItem,
+    ResponseOutputMessage,
+    ResponseTextDeltaEvent,
+    ResponseUsage,
+)
+from pydantic import TypeAdapter
+
+from _agents_sdk import Model, ModelResponse, Usage
+from observability import REGISTRY, provider_model_name
+
+logger = logging.getLogger("llm.cache")
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "eventai_llm_cache_requests_total",
+    "Model calls seen by the response cache, by agent and result (hit_memory, hit_disk, miss, bypass)",
+    ["agent", "result"],
+)
+CACHE_SAVED_TOKENS = REGISTRY.counter(
+    "eventai_llm_cache_saved_tokens_total", "Tokens the cached responses cost when first generated", ["agent", "type"],
+)
+
+_OUTPUT_ITEMS = TypeAdapter(List[ResponseOutputItem])
+
+# A cached entry: the response's output items as JSON plus the usage it cost
+Entry = Dict[str, Any]
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_unset=True)
+    return str(value)
+
+
+def _tool_schema(tool: Any) -> Dict[str, Any]:
+    schema = {"type": type(tool).__name__, "name": getattr(tool, "name", None)}
+    if hasattr(tool, "params_json_schema"):
+        schema.update(
+            description=tool.description,
+            parameters=tool.params_json_schema,
+            strict=getattr(tool, "strict_json_schema", None),
+        )
+    return schema
+
+
+def make_key(model_name: str, system_instructions: Optional[str], input: Any, model_settings: Any,
+             tools: List[Any], output_schema: Any, handoffs: List[Any]) -> str:
+    """Hash of everything that determines a model call's answer"""
+    payload = {
+        "model": model_name,
+        "instructions": system_instructions,
+        "input": input,
+        "settings": model_settings.to_json_dict() if hasattr(model_settings, "to_json_dict") else None,
+        "tools": [_tool_schema(tool) for tool in tools],
+        "handoffs": [
+            {"name": h.tool_name, "description": h.tool_description, "parameters": h.input_json_schema}
+            for h in handoffs
+        ],
+        "output": (
+            None if output_schema is None or output_schema.is_plain_text()
+            else {"name": output_schema.name(), "schema": output_schema.json_schema()}
+        ),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=_jsonable, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """TTL'd LRU of model responses with an optional on-disk tier"""
+
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 2048, directory: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: "OrderedDict[str, Tuple[float, Entry]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.disk_errors = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMResponseCache"]:
+        """Build from LLM_CACHE_* settings, or None when the cache is disabled"""
+        if os.getenv("LLM_CACHE_ENABLED", "false").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL", "3600")),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048")),
+            directory=os.getenv("LLM_CACHE_DIR") or None,
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Tuple[Optional[Entry], Optional[str]]:
+        """(entry, tier) for a fresh cached response, or (None, None)"""
+        now = time.time()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                if cached[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits["memory"] += 1
+                    return cached[1], "memory"
+                del self._entries[key]
+                self.expirations += 1
+
+        if self.directory:
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    stored = json.load(f)
+            except FileNotFoundError:
+                stored = None
+            except (OSError, ValueError):
+                self.disk_errors += 1
+                stored = None
+            if stored is not None and stored["expires_at"] > now:
+                with self._lock:
+                    self._remember(key, stored["expires_at"], stored["entry"])
+                    self.hits["disk"] += 1
+                return stored["entry"], "disk"
+
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    def put(self, key: str, entry: Entry):
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, entry)
+        if self.directory:
+            path = self._path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"expires_at": expires_at, "entry": entry}, f, ensure_ascii=False)
+                os.replace(tmp, path)
+            except OSError:
+                self.disk_errors += 1
+                logger.warning("Could not write LLM cache entry %s", path, exc_info=True)
+
+    def _remember(self, key: str, expires_at: float, entry: Entry):
+        self._entries[key] = (expires_at, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "directory": self.directory,
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "disk_errors": self.disk_errors,
+            }
+
+
+def _entry(output: List[Any], usage: Optional[Usage]) -> Entry:
+    return {
+        "output": [item.model_dump(mode="json", exclude_unset=True) for item in output],
+        "input_tokens": usage.input_tokens if usage else 0,
+        "output_tokens": usage.output_tokens if usage else 0,
+    }
+
+
+class CachingModel(Model):
+    """A Model that serves repeated identical calls from an LLMResponseCache"""
+
+    def __init__(self, model: Model, cache: LLMResponseCache, agent: str = ""):
+        self.model = model
+        self.cache = cache
+        self.agent = agent
+        self.model_name = provider_model_name(model)
+
+    def _lookup(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                previous_response_id, conversation_id) -> Tuple[Optional[str], Optional[Entry]]:
+        if previous_response_id or conversation_id:
+            # Server-side conversation state is not part of the key
+            CACHE_REQUESTS.inc(agent=self.agent, result="bypass")
+            return None, None
+        key = make_key(self.model_name, system_instructions, input, model_settings, tools, output_schema, handoffs)
+        entry, tier = self.cache.get(key)
+        if entry is None:
+            CACHE_REQUESTS.inc(agent=self.agent, result="miss")
+            return key, None
+        CACHE_REQUESTS.inc(agent=self.agent, result=f"hit_{tier}")
+        CACHE_SAVED_TOKENS.inc(entry["input_tokens"], agent=self.agent, type="input")
+        CACHE_SAVED_TOKENS.inc(entry["output_tokens"], agent=self.agent, type="output")
+        return key, entry
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing, *, previous_response_id=None, conversation_id=None, prompt=None) -> ModelResponse:
+        key, entry = self._lookup(system_instructions, input, model_settings, tools, output_schema, handoffs,
+                                  previous_response_id, conversation_id)
+        if entry is not None:
+            return ModelResponse(output=_OUTPUT_ITEMS.validate_python(entry["output"]), usage=Usage(), response_id=None)
+
+        response = await self.model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, conversation_id=conversation_id, prompt=prompt,
+        )
+        if key is not None:
+            self.cache.put(key, _entry(response.output, response.usage))
+        return response
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing, *, previous_response_id=None, conversation_id=None,
+                              prompt=None) -> AsyncIterator[Any]:
+        key, entry = self._lookup(system_instructions, input, model_settings, tools, output_schema, handoffs,
+                                  previous_response_id, conversation_id)
+        if entry is not None:
+            for event in replay_events(_OUTPUT_ITEMS.validate_python(entry["output"]), self.model_name):
+                yield event
+            return
+
+        async for event in self.model.stream_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, conversation_id=conversation_id, prompt=prompt,
+        ):
+            if key is not None and event.type == "response.completed":
+                usage = event.response.usage
+                self.cache.put(key, _entry(event.response.output, Usage(
+                    input_tokens=usage.input_tokens if usage else 0,
+                    output_tokens=usage.output_tokens if usage else 0,
+                )))
+            yield event
+
+
+def replay_events(output: List[Any], model_name: str, usage: Optional[Usage] = None) -> List[Any]:
+    """Stream events for a stored response: its text as one delta per message, then completion"""
+    events: List[Any] = []
+    sequence = 0
+    for index, item in enumerate(output):
+        if isinstance(item, ResponseOutputMessage):
+            for content_index, part in enumerate(item.content):
+                text = getattr(part, "text", None)
+                if text:
+                    events.append(ResponseTextDeltaEvent(
+                        type="response.output_text.delta", delta=text, item_id=item.id, output_index=index,
+                        content_index=content_index, sequence_number=sequence, logprobs=[],
+                    ))
+                    sequence += 1
+    events.append(ResponseCompletedEvent(
+        type="response.completed",
+        sequence_number=sequence,
+        response=Response(
+            id="cached", created_at=time.time(), model=model_name, object="response", output=output,
+            parallel_tool_calls=False, tool_choice="auto", tools=[],
+            usage=ResponseUsage(
+                input_tokens=usage.input_tokens,
+                input_tokens_details={"cached_tokens": usage.input_tokens_details.cached_tokens},
+                output_tokens=usage.output_tokens,
+                output_tokens_details={"reasoning_tokens": 0},
+                total_tokens=usage.total_tokens,
+            ) if usage is not None else None,
+        ),
+    ))
+    return events
@@ -0,0 +1,72 @@
+"""
+Per-agent model selection.
+
+Every agent runs on GEMINI_MODEL through the Gemini OpenAI-compatible
+client unless LLM_AGENT_MODELS names another model for it:
+
+    LLM_AGENT_MODELS=TriageAgent=gemini-2.5-flash-lite,OrchestratorAgent=gemini-2.5-pro
+
+so routing and simple CRUD agents can run on a smaller, faster tier and
+the orchestrator on a stronger one. A name prefixed with "litellm/" is
+served by the SDK's LitellmModel instead (e.g.
+"litellm/anthropic/claude-sonnet-4"; LITELLM_API_KEY / LITELLM_BASE_URL
+are passed through when set, otherwise litellm reads the provider's own
+environment variables). litellm is only imported when such a model is
+configured.
+
+One Model instance is built per distinct name and shared by the agents
+using it.
+"""
+
+import os
+from typing import Any, Dict
+
+import _agents_sdk
+from _agents_sdk import Model, OpenAIChatCompletionsModel
+
+LITELLM_PREFIX = "litellm/"
+DEFAULT_MODEL = "gemini-3-flash-preview"
+
+
+class AgentModels:
+    """Resolves each agent's Model from the default and per-agent model names"""
+
+    def __init__(self, client: Any, default: str = DEFAULT_MODEL, per_agent: Dict[str, str] = None):
+        self.client = client
+        self.default = default
+        self.per_agent = dict(per_agent or {})
+        self._models: Dict[str, Model] = {}
+
+    @classmethod
+    def from_env(cls, client: Any) -> "AgentModels":
+        """Build from GEMINI_MODEL / LLM_AGENT_MODELS"""
+        per_agent = {}
+        for entry in os.getenv("LLM_AGENT_MODELS", "").split(","):
+            if "=" in entry:
+                agent, name = entry.split("=", 1)
+                per_agent[agent.strip()] = name.strip()
+        return cls(client, default=os.getenv("GEMINI_MODEL") or DEFAULT_MODEL, per_agent=per_agent)
+
+    def name_for(self, agent: str) -> str:
+        return self.per_agent.get(agent) or self.default
+
+    def model_for(self, agent: str = "") -> Model:
+        """The (shared) Model for `agent`; the default model for unknown agents"""
+        name = self.name_for(agent)
+        model = self._models.get(name)
+        if model is None:
+            model = self._models[name] = self._build(name)
+        return model
+
+    def _build(self, name: str) -> Model:
+        if name.startswith(LITELLM_PREFIX):
+            return _agents_sdk.LitellmModel(
+                model=name[len(LITELLM_PREFIX):],
+                base_url=os.getenv("LITELLM_BASE_URL") or None,
+                api_key=os.getenv("LITELLM_API_KEY") or None,
+            )
+        return OpenAIChatCompletionsModel(model=name, openai_client=self.client)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Configured models for monitoring"""
+        return {"default": self.default, "agents": dict(self.per_agent)}
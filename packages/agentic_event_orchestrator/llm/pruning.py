@@ -0,0 +1,155 @@
+"""
+Smaller tool and handoff schemas in each model call.
+
+Every function tool's JSON schema (docstring-derived descriptions and
+per-parameter titles included) and every handoff is serialized into every
+model call an agent makes. PruningModel wraps an agent's Model and rewrites
+the `tools` and `handoffs` it forwards; the agents, and the tools the
+Runner can execute, are unchanged.
+
+Two independent reductions:
+
+- compact schemas (LLM_TOOL_SCHEMAS=compact): a tool's description is cut
+  to its first sentence, parameter descriptions lose examples and
+  "Optional", and the redundant "title" keys go; a handoff's boilerplate
+  description becomes "Transfer to <agent>." (the routing agents'
+  instructions already describe each specialist).
+- tool groups (LLM_TOOL_GROUPS=true): an agent's less common tools are
+  hidden on its first step of a turn and loaded once the agent has called
+  any of its tools this turn, or straight away when the user's message
+  matches the group's pattern (e.g. "cancel" for cancel_booking).
+
+Compacted schemas are built once per tool and reused.
+"""
+
+import dataclasses
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Pattern, Sequence, Tuple
+
+from _agents_sdk import Model, ModelResponse
+
+from .replay import turn_position
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+_CLAUSE_END = re.compile(r"\s*(?:;|\. |,? e\.g\.|, such as|\(e\.g\.)")
+_OPTIONAL = re.compile(r"^optional\s+", re.IGNORECASE)  # nullability is in the schema
+
+MAX_DESCRIPTION_CHARS = 120
+MAX_PARAMETER_CHARS = 60
+
+
+@dataclass(frozen=True)
+class ToolGroup:
+    """Tools loaded on demand, and the user-message pattern that loads them up front"""
+    tools: Tuple[str, ...]
+    unlock: Optional[Pattern] = None
+
+    @classmethod
+    def of(cls, tools: Sequence[str], unlock: Optional[str] = None) -> "ToolGroup":
+        return cls(tuple(tools), re.compile(unlock, re.IGNORECASE) if unlock else None)
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def compact_description(text: Optional[str]) -> str:
+    """First sentence of a tool description"""
+    text = " ".join((text or "").split())
+    return _clip(_SENTENCE_END.split(text, 1)[0], MAX_DESCRIPTION_CHARS)
+
+
+def compact_schema(schema: Any) -> Any:
+    """JSON schema without titles, and parameter descriptions without examples"""
+    if isinstance(schema, list):
+        return [compact_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    compacted = {}
+    for key, value in schema.items():
+        if key == "title" and isinstance(value, str):
+            continue
+        if key == "description" and isinstance(value, str):
+            value = _OPTIONAL.sub("", _CLAUSE_END.split(" ".join(value.split()), 1)[0])
+            value = _clip(value[:1].upper() + value[1:], MAX_PARAMETER_CHARS)
+        elif key == "properties" and isinstance(value, dict):
+            # property names are data here, not schema keywords
+            value = {name: compact_schema(prop) for name, prop in value.items()}
+        else:
+            value = compact_schema(value)
+        compacted[key] = value
+    return compacted
+
+
+class PruningModel(Model):
+    """A Model that forwards compacted and/or on-demand tool and handoff schemas"""
+
+    def __init__(self, model: Model, agent: str = "", compact: bool = True, groups: Sequence[ToolGroup] = ()):
+        self.model = model
+        self.agent = agent
+        self.compact = compact
+        self.groups = list(groups)
+        # Keyed by name, holding the original: the SDK builds a new Handoff for a bare
+        # Agent every turn, and an id() key would be reused once the old one is freed
+        self._compacted: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+
+    def _cached(self, kind: str, name: str, original: Any, build) -> Any:
+        entry = self._compacted.get((kind, name))
+        if entry is None or entry[0] is not original:
+            entry = (original, build(original))
+            self._compacted[(kind, name)] = entry
+        return entry[1]
+
+    def _compact_tool(self, tool: Any) -> Any:
+        if not hasattr(tool, "params_json_schema"):
+            return tool  # hosted tools have no schema of ours
+        return self._cached("tool", tool.name, tool, lambda t: dataclasses.replace(
+            t,
+            description=compact_description(t.description),
+            params_json_schema=compact_schema(t.params_json_schema),
+        ))
+
+    def _compact_handoff(self, handoff: Any) -> Any:
+        return self._cached("handoff", handoff.tool_name, handoff, lambda h: dataclasses.replace(
+            h, tool_description=f"Transfer to {h.agent_name}.",
+        ))
+
+    def hidden_tools(self, input: Any, tools: List[Any]) -> set:
+        """Names of the tools not loaded for this call"""
+        user, step = turn_position(input, tools)
+        if step > 0:
+            return set()
+        hidden = set()
+        for group in self.groups:
+            if group.unlock is None or not group.unlock.search(user):
+                hidden.update(group.tools)
+        return hidden
+
+    def prune(self, input: Any, tools: List[Any], handoffs: List[Any]) -> Tuple[List[Any], List[Any]]:
+        """The tools and handoffs to send for this call"""
+        if self.groups:
+            hidden = self.hidden_tools(input, tools)
+            tools = [tool for tool in tools if getattr(tool, "name", None) not in hidden]
+        if self.compact:
+            tools = [self._compact_tool(tool) for tool in tools]
+            handoffs = [self._compact_handoff(handoff) for handoff in handoffs]
+        return tools, handoffs
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing, *, previous_response_id=None, conversation_id=None, prompt=None) -> ModelResponse:
+        tools, handoffs = self.prune(input, tools, handoffs)
+        return await self.model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, conversation_id=conversation_id, prompt=prompt,
+        )
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing, *, previous_response_id=None, conversation_id=None,
+                              prompt=None) -> AsyncIterator[Any]:
+        tools, handoffs = self.prune(input, tools, handoffs)
+        async for event in self.model.stream_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, conversation_id=conversation_id, prompt=prompt,
+        ):
+            yield event
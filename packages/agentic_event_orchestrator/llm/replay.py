@@ -0,0 +1,273 @@
+"""
+Record/replay stand-in for the model provider.
+
+With LLM_MODE=record every agent's model calls go to Gemini as usual and
+are appended to a JSONL cassette (LLM_CASSETTE): the agent, the call's key
+(make_key from llm/cache.py, minus the model name), the last user message, the step within the
+turn, the output items — messages, tool calls and handoffs alike — plus
+the tokens and latency they cost.
+
+With LLM_MODE=replay no provider is called: ReplayModel answers each call
+from the cassette after a synthetic delay, so /api/chat can be load-tested
+and profiled offline with real tool execution, handoffs and session
+handling, and framework overhead, tool latency and throughput measured
+without Gemini in the picture. A call is matched, in order, by:
+
+  1. exact key            (same agent, instructions, input, tools)
+  2. agent + user + step  (same question, same point in the turn)
+  3. agent + step         (any recorded turn of that agent)
+
+"step" is the number of this agent's own tool calls since the last user
+message, so a hand-written cassette only needs agent/step/output entries.
+Unmatched calls get a short placeholder reply, or raise ReplayMiss when
+LLM_REPLAY_STRICT is set.
+
+The delay is LLM_REPLAY_LATENCY seconds when set, otherwise each entry's
+recorded latency; either is multiplied by LLM_REPLAY_LATENCY_SCALE and
+spread by ±LLM_REPLAY_JITTER (a fraction).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+from openai.types.responses.response_usage import InputTokensDetails
+
+from _agents_sdk import Model, ModelResponse, Usage
+from observability import REGISTRY
+
+from .cache import _OUTPUT_ITEMS, make_key, replay_events
+
+logger = logging.getLogger("llm.replay")
+
+REPLAY_CALLS = REGISTRY.counter(
+    "eventai_llm_replay_calls_total",
+    "Model calls answered from the replay cassette, by agent and match (exact, user_step, step, miss)",
+    ["agent", "match"],
+)
+REPLAY_LATENCY = REGISTRY.counter(
+    "eventai_llm_replay_latency_seconds_total", "Synthetic model latency spent by replayed calls", ["agent"],
+)
+
+# One cassette line
+Entry = Dict[str, Any]
+
+
+class ReplayMiss(LookupError):
+    """Raised in strict replay when no recorded call matches"""
+
+    def __init__(self, agent: str, step: int):
+        super().__init__(f"No recorded model call for {agent or 'agent'} at step {step}")
+        self.agent = agent
+        self.step = step
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+def turn_position(input: Any, tools: List[Any]) -> Tuple[str, int]:
+    """(last user message, number of the agent's own tool calls after it)"""
+    if isinstance(input, str):
+        return input, 0
+    names = {getattr(tool, "name", None) for tool in tools}
+    user, step = "", 0
+    for item in input:
+        item = item if isinstance(item, dict) else getattr(item, "model_dump", lambda: {})()
+        if item.get("role") == "user":
+            user, step = _text(item.get("content")), 0
+        elif item.get("type") == "function_call" and item.get("name") in names:
+            step += 1
+    return user, step
+
+
+def replay_key(system_instructions, input, model_settings, tools, output_schema, handoffs) -> str:
+    """make_key without the model name, so a recording replays under any model"""
+    return make_key("", system_instructions, input, model_settings, tools, output_schema, handoffs)
+
+
+class Cassette:
+    """Recorded model calls in a JSONL file, indexed for ReplayModel lookups"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._by_key: Dict[Tuple[str, str], Entry] = {}
+        self._by_user_step: Dict[Tuple[str, str, int], Entry] = {}
+        self._by_step: Dict[Tuple[str, int], Entry] = {}
+        self.entries = 0
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+
+    @classmethod
+    def from_env(cls) -> "Cassette":
+        return cls(os.getenv("LLM_CASSETTE", "llm_cassette.jsonl"))
+
+    def _index(self, entry: Entry):
+        agent, step = entry.get("agent", ""), int(entry.get("step", 0))
+        if entry.get("key"):
+            self._by_key[(agent, entry["key"])] = entry
+        if entry.get("user") is not None:
+            self._by_user_step.setdefault((agent, entry["user"], step), entry)
+        self._by_step.setdefault((agent, step), entry)
+        self.entries += 1
+
+    def append(self, entry: Entry):
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._index(entry)
+
+    def find(self, agent: str, key: str, user: str, step: int) -> Tuple[Optional[Entry], str]:
+        """(entry, match) for the best recorded call, or (None, "miss")"""
+        entry = self._by_key.get((agent, key))
+        if entry is not None:
+            return entry, "exact"
+        entry = self._by_user_step.get((agent, user, step))
+        if entry is not None:
+            return entry, "user_step"
+        entry = self._by_step.get((agent, step))
+        if entry is not None:
+            return entry, "step"
+        return None, "miss"
+
+
+class RecordingModel(Model):
+    """A Model that passes calls through and appends each one to a Cassette"""
+
+    def __init__(self, model: Model, cassette: Cassette, agent: str = ""):
+        self.model = model
+        self.cassette = cassette
+        self.agent = agent
+
+    def _record(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                output: List[Any], usage: Any, latency: float):
+        user, step = turn_position(input, tools)
+        self.cassette.append({
+            "agent": self.agent,
+            "key": replay_key(system_instructions, input, model_settings, tools, output_schema, handoffs),
+            "user": user,
+            "step": step,
+            "latency": round(latency, 4),
+            "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+            "cached_tokens": getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", 0) or 0,
+            "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+            "output": [item.model_dump(mode="json", exclude_unset=True) for item in output],
+        })
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing, *, previous_response_id=None, conversation_id=None, prompt=None) -> ModelResponse:
+        start = time.perf_counter()
+        response = await self.model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, conversation_id=conversation_id, prompt=prompt,
+        )
+        self._record(system_instructions, input, model_settings, tools, output_schema, handoffs,
+                     response.output, response.usage, time.perf_counter() - start)
+        return response
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing, *, previous_response_id=None, conversation_id=None,
+                              prompt=None) -> AsyncIterator[Any]:
+        start = time.perf_counter()
+        async for event in self.model.stream_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, conversation_id=conversation_id, prompt=prompt,
+        ):
+            if event.type == "response.completed":
+                self._record(system_instructions, input, model_settings, tools, output_schema, handoffs,
+                             event.response.output, event.response.usage, time.perf_counter() - start)
+            yield event
+
+
+class ReplayModel(Model):
+    """A Model that answers from a Cassette after a synthetic delay, never calling a provider"""
+
+    model = "replay"
+
+    def __init__(self, cassette: Cassette, agent: str = "", latency: Optional[float] = None,
+                 latency_scale: float = 1.0, jitter: float = 0.0, strict: bool = False):
+        self.cassette = cassette
+        self.agent = agent
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.jitter = jitter
+        self.strict = strict
+
+    @classmethod
+    def from_env(cls, cassette: Cassette) -> "ReplayModel":
+        """Build from LLM_REPLAY_* settings"""
+        latency = os.getenv("LLM_REPLAY_LATENCY", "")
+        return cls(
+            cassette,
+            latency=float(latency) if latency else None,
+            latency_scale=float(os.getenv("LLM_REPLAY_LATENCY_SCALE", "1.0")),
+            jitter=float(os.getenv("LLM_REPLAY_JITTER", "0")),
+            strict=os.getenv("LLM_REPLAY_STRICT", "false").lower() in ("1", "true", "yes"),
+        )
+
+    def for_agent(self, agent: str) -> "ReplayModel":
+        """The same cassette and timing, labelled for `agent`'s lookups"""
+        return ReplayModel(self.cassette, agent, self.latency, self.latency_scale, self.jitter, self.strict)
+
+    def _delay(self, entry: Optional[Entry]) -> float:
+        base = self.latency if self.latency is not None else (entry or {}).get("latency", 0.0)
+        delay = base * self.latency_scale
+        if self.jitter:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(0.0, delay)
+
+    async def _answer(self, system_instructions, input, model_settings, tools, output_schema,
+                      handoffs) -> Tuple[List[Any], Usage]:
+        user, step = turn_position(input, tools)
+        key = replay_key(system_instructions, input, model_settings, tools, output_schema, handoffs)
+        entry, match = self.cassette.find(self.agent, key, user, step)
+        REPLAY_CALLS.inc(agent=self.agent, match=match)
+        if entry is None:
+            if self.strict:
+                raise ReplayMiss(self.agent, step)
+            logger.debug("No recorded call for %s at step %d", self.agent, step)
+
+        delay = self._delay(entry)
+        if delay:
+            await asyncio.sleep(delay)
+            REPLAY_LATENCY.inc(delay, agent=self.agent)
+
+        if entry is None:
+            return [ResponseOutputMessage(
+                id="msg_replay", type="message", role="assistant", status="completed",
+                content=[ResponseOutputText(type="output_text", text="(no recorded response)", annotations=[])],
+            )], Usage(requests=1)
+        input_tokens, output_tokens = entry.get("input_tokens", 0), entry.get("output_tokens", 0)
+        usage = Usage(requests=1, input_tokens=input_tokens, output_tokens=output_tokens,
+                      total_tokens=input_tokens + output_tokens,
+                      input_tokens_details=InputTokensDetails(cached_tokens=entry.get("cached_tokens", 0)))
+        return _OUTPUT_ITEMS.validate_python(entry["output"]), usage
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing, *, previous_response_id=None, conversation_id=None, prompt=None) -> ModelResponse:
+        output, usage = await self._answer(system_instructions, input, model_settings, tools, output_schema, handoffs)
+        return ModelResponse(output=output, usage=usage, response_id=None)
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing, *, previous_response_id=None, conversation_id=None,
+                              prompt=None) -> AsyncIterator[Any]:
+        output, usage = await self._answer(system_instructions, input, model_settings, tools, output_schema, handoffs)
+        for event in replay_events(output, self.model, usage):
+            yield event
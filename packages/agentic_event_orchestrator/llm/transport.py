@@ -0,0 +1,224 @@
+"""
+HTTP transport for the model provider's OpenAI-compatible client.
+
+build_llm_client() returns an AsyncOpenAI whose httpx client runs on
+LLMTransport, which adds to httpx's own connection pool:
+
+- explicit pool size and keep-alive (LLM_HTTP_MAX_CONNECTIONS,
+  LLM_HTTP_MAX_KEEPALIVE, LLM_HTTP_KEEPALIVE_EXPIRY), and HTTP/2 when the
+  h2 package is installed (the `http2` extra) and LLM_HTTP2 is not switched
+  off; LLM_HTTP2=true without h2 logs a warning and stays on HTTP/1.1
+- a per-provider cap on in-flight calls (LLM_HTTP_CONCURRENCY, 0 = none);
+  a streamed response holds its slot until the stream is closed
+- retries on 429, 5xx and connection errors (LLM_HTTP_RETRIES) with
+  exponential backoff and full jitter between LLM_HTTP_RETRY_BASE and
+  LLM_HTTP_RETRY_MAX seconds, honouring Retry-After. The OpenAI client's
+  own retries are turned off so calls are not retried twice.
+
+Waiting is measured in two places: for a concurrency slot
+(eventai_llm_http_queue_wait_seconds) and for a pooled connection, i.e.
+from handing the request to the pool until it starts connecting or sending
+(eventai_llm_http_pool_wait_seconds, from httpcore trace events). New
+connections are counted too, which shows how well keep-alive is reused.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import os
+import random
+import time
+from typing import Any, Optional
+
+import httpx
+
+from _agents_sdk import AsyncOpenAI
+from observability import REGISTRY
+
+logger = logging.getLogger("llm.transport")
+
+HTTP_QUEUE_WAIT = REGISTRY.histogram(
+    "eventai_llm_http_queue_wait_seconds", "Time model calls waited for a provider concurrency slot", ["provider"],
+)
+HTTP_POOL_WAIT = REGISTRY.histogram(
+    "eventai_llm_http_pool_wait_seconds", "Time model calls waited for a pooled HTTP connection", ["provider"],
+)
+HTTP_CONNECTIONS = REGISTRY.counter(
+    "eventai_llm_http_connections_opened_total", "New TCP connections to the model provider", ["provider"],
+)
+HTTP_RETRIES = REGISTRY.counter(
+    "eventai_llm_http_retries_total", "Model calls retried, by reason (status code or connect_error)",
+    ["provider", "reason"],
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("eventai_llm_http_in_flight", "Model HTTP calls in flight", ["provider"])
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class _SlotReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees the concurrency slot when closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class LLMTransport(httpx.AsyncBaseTransport):
+    """Pooled keep-alive transport with a concurrency cap and retry/backoff"""
+
+    def __init__(self, provider: str = "gemini", max_connections: int = 100, max_keepalive: int = 20,
+                 keepalive_expiry: float = 30.0, http2: Optional[bool] = None, concurrency: int = 0,
+                 retries: int = 3, retry_base: float = 0.5, retry_max: float = 8.0):
+        h2_available = importlib.util.find_spec("h2") is not None
+        if http2 is None:
+            http2 = h2_available
+        elif http2 and not h2_available:
+            logger.warning("HTTP/2 requested but the h2 package is missing (install the 'http2' extra); "
+                           "using HTTP/1.1")
+            http2 = False
+        self.provider = provider
+        self.http2 = http2
+        self.retries = retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.concurrency = concurrency
+        self._slots = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+        self._pool = httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+
+    @classmethod
+    def from_env(cls, provider: str = "gemini") -> "LLMTransport":
+        """Build from LLM_HTTP_* settings"""
+        http2 = os.getenv("LLM_HTTP2", "")
+        return cls(
+            provider=provider,
+            max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "30")),
+            http2=(http2.lower() in ("1", "true", "yes")) if http2 else None,
+            concurrency=int(os.getenv("LLM_HTTP_CONCURRENCY", "32")),
+            retries=int(os.getenv("LLM_HTTP_RETRIES", "3")),
+            retry_base=float(os.getenv("LLM_HTTP_RETRY_BASE", "0.5")),
+            retry_max=float(os.getenv("LLM_HTTP_RETRY_MAX", "8")),
+        )
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before retry `attempt` (1-based): Retry-After if given, else full jitter"""
+        if retry_after:
+            try:
+                return min(self.retry_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass  # HTTP-date form; fall back to our own schedule
+        return random.uniform(0, min(self.retry_max, self.retry_base * 2 ** (attempt - 1)))
+
+    async def _acquire(self):
+        if self._slots is None:
+            return
+        start = time.perf_counter()
+        await self._slots.acquire()
+        HTTP_QUEUE_WAIT.observe(time.perf_counter() - start, provider=self.provider)
+
+    def _release(self):
+        HTTP_IN_FLIGHT.dec(provider=self.provider)
+        if self._slots is not None:
+            self._slots.release()
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        waited = False
+
+        async def trace(event: str, info: Any):
+            nonlocal waited
+            if not waited and event.endswith(("connect_tcp.started", "send_request_headers.started")):
+                waited = True
+                HTTP_POOL_WAIT.observe(time.perf_counter() - started, provider=self.provider)
+            if event == "connection.connect_tcp.complete":
+                HTTP_CONNECTIONS.inc(provider=self.provider)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        return await self._pool.handle_async_request(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self._acquire()
+        HTTP_IN_FLIGHT.inc(provider=self.provider)
+        try:
+            attempt = 0
+            while True:
+                try:
+                    response = await self._send(request)
+                except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError) as e:
+                    if attempt >= self.retries:
+                        raise
+                    attempt += 1
+                    HTTP_RETRIES.inc(provider=self.provider, reason="connect_error")
+                    delay = self.backoff(attempt)
+                    logger.info("Retrying %s after %s (attempt %d, %.2fs)", request.url.path, e, attempt, delay)
+                    await asyncio.sleep(delay)
+                    continue
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    break
+                attempt += 1
+                HTTP_RETRIES.inc(provider=self.provider, reason=str(response.status_code))
+                delay = self.backoff(attempt, response.headers.get("retry-after"))
+                # Drain the (small) error body so the connection goes back to the pool
+                try:
+                    await response.aread()
+                finally:
+                    await response.aclose()
+                logger.info("Retrying %s after HTTP %d (attempt %d, %.2fs)",
+                            request.url.path, response.status_code, attempt, delay)
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._release()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_SlotReleasingStream(response.stream, self._release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._pool.aclose()
+
+    def snapshot(self) -> dict:
+        """Settings and current load for monitoring"""
+        return {
+            "provider": self.provider,
+            "http2": self.http2,
+            "concurrency": self.concurrency,
+            "in_flight": HTTP_IN_FLIGHT.value(provider=self.provider),
+            "retries": self.retries,
+        }
+
+
+def build_llm_client(base_url: str, api_key: str, provider: str = "gemini",
+                     transport: Optional[LLMTransport] = None) -> AsyncOpenAI:
+    """An AsyncOpenAI on an LLMTransport (LLM_HTTP_* settings unless one is given)"""
+    transport = transport or LLMTransport.from_env(provider)
+    http_client = httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(float(os.getenv("LLM_HTTP_TIMEOUT", "120")), connect=10.0),
+    )
+    # Retries happen in the transport, per HTTP attempt
+    return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
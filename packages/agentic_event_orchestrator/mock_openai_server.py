@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Minimal OpenAI-compatible server for exercising the LLM HTTP transport.
+
+Serves POST /chat/completions (plain and streamed) and GET /models under
+any prefix, with a fixed latency and optional injected failures, and keeps
+connection statistics: how many TCP connections were opened (keep-alive
+reuse), and the peak number of requests in flight (concurrency caps).
+
+Point the agents at it with GEMINI_BASE_URL=http://127.0.0.1:8765/v1/.
+
+Run: python mock_openai_server.py --port 8765 --latency 0.5 --fail-first 2
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+USAGE = {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer with injectable latency/failures and connection stats"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0, fail_first: int = 0, fail_status: int = 503,
+                 reply: str = "Hello from the mock model"):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.reply = reply
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/"
+
+    def start(self) -> "MockOpenAIServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path.endswith("/models"):
+            self._json(200, {"object": "list", "data": [{"id": "mock-model", "object": "model", "owned_by": "mock"}]})
+        else:
+            self._json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with server._lock:
+            server.requests += 1
+            failing = server.requests <= server.fail_first
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.latency)
+            if failing:
+                self._json(server.fail_status, {"error": {"message": "injected failure"}}, {"Retry-After": "0"})
+            elif not self.path.endswith("/chat/completions"):
+                self._json(404, {"error": {"message": "not found"}})
+            elif body.get("stream"):
+                self._stream(body)
+            else:
+                self._json(200, _completion(body, server.reply))
+        finally:
+            with server._lock:
+                server.in_flight -= 1
+
+    def _stream(self, body: dict):
+        reply = self.server.reply
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunks = [
+            {"choices": [{"index": 0, "delta": {"role": "assistant", "content": reply}, "finish_reason": None}]},
+            {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]},
+        ]
+        # Like OpenAI/Gemini: usage only when asked for, in a last chunk with no choices
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunks.append({"choices": [], "usage": dict(USAGE)})
+        for chunk in chunks:
+            chunk.update(id="chatcmpl-mock", object="chat.completion.chunk", created=int(time.time()),
+                         model=body.get("model", "mock-model"))
+            self._chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+        self._chunk(b"data: [DONE]\n\n")
+        self._chunk(b"")
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+
+def _completion(body: dict, reply: str) -> dict:
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock-model"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+        "usage": dict(USAGE),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per completion")
+    parser.add_argument("--fail-first", type=int, default=0, help="answer the first N requests with --fail-status")
+    parser.add_argument("--fail-status", type=int, default=503)
+    args = parser.parse_args()
+    server = MockOpenAIServer(args.port, args.latency, args.fail_first, args.fail_status)
+    print(f"Mock OpenAI-compatible server on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,101 @@
+"""
+Rule-based extraction of event details from chat messages.
+
+Pulls the fields of EventRequirements that users state in passing —
+event type, date, budget, location and attendee count — without a model
+call, so they can be carried across turns cheaply. Only confident matches
+are returned; anything ambiguous is left for the agents to ask about.
+"""
+
+import re
+from typing import Dict
+
+EVENT_TYPES = (
+    "baby shower", "bridal shower", "mehndi", "mehendi", "baraat", "walima", "nikkah", "nikah",
+    "wedding", "engagement", "birthday", "anniversary", "graduation", "reunion", "conference",
+    "seminar", "workshop", "corporate event", "product launch", "concert", "festival", "party",
+)
+
+CITIES = (
+    "Lahore", "Karachi", "Islamabad", "Rawalpindi", "Faisalabad", "Multan", "Peshawar",
+    "Quetta", "Sialkot", "Gujranwala", "Hyderabad",
+)
+
+_MONTHS = (
+    "jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+    "sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+)
+
+_EVENT_TYPE_RE = re.compile(r"\b(" + "|".join(re.escape(t) for t in EVENT_TYPES) + r")s?\b", re.I)
+_CITY_RE = re.compile(r"\b(" + "|".join(CITIES) + r")\b", re.I)
+_PLACE_RE = re.compile(r"\b(?:in|at|near)\s+((?:[A-Z][\w'&-]*)(?:\s+[A-Z][\w'&-]*){0,3})")
+
+_DATE_RES = (
+    re.compile(r"\b(\d{4}-\d{2}-\d{2})\b"),
+    re.compile(r"\b(\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4})\b"),
+    re.compile(rf"\b((?:{_MONTHS})\.?\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s+\d{{4}})?)\b", re.I),
+    re.compile(rf"\b(\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?(?:{_MONTHS})\.?(?:,?\s+\d{{4}})?)\b", re.I),
+    re.compile(r"\b((?:this|next)\s+(?:week(?:end)?|month|monday|tuesday|wednesday|thursday|friday|saturday|sunday))\b", re.I),
+)
+
+# Word boundaries keep "chai-rs 50" and "30 m-inutes" from reading as money
+_AMOUNT = r"\d[\d,]*(?:\.\d+)?(?:\s*(?:k|lakh|lac|million|mn|m)\b)?"
+_BUDGET_RES = (
+    re.compile(rf"((?:\b(?:rs\.?|pkr|usd)|\$|£|€)\s*{_AMOUNT})", re.I),
+    re.compile(rf"({_AMOUNT}\s*(?:rupees|rs|pkr|dollars|usd))\b", re.I),
+    re.compile(rf"\bbudget\s+(?:is\s+|of\s+|around\s+|about\s+|under\s+|:\s*)*({_AMOUNT})", re.I),
+)
+
+_ATTENDEES_RE = re.compile(
+    r"\b(\d[\d,]*)\s*(?:\+\s*)?(?:guests?|people|persons?|attendees|pax|heads|visitors|participants)\b", re.I,
+)
+
+_PLACE_STOPWORDS = {"The", "A", "An", "My", "Our", "This", "That", "Next", "I"}
+
+
+def _first(patterns, text: str):
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _location(text: str):
+    city = _CITY_RE.search(text)
+    if city:
+        return city.group(1).title()
+    place = _PLACE_RE.search(text)
+    if place:
+        words = place.group(1).split()
+        # "in June", "at The ..." are not places
+        if words[0] not in _PLACE_STOPWORDS and not re.fullmatch(_MONTHS, words[0], re.I):
+            return " ".join(words)
+    return None
+
+
+def extract_slots(text: str) -> Dict[str, str]:
+    """Event details stated in `text`, keyed like EventRequirements fields"""
+    slots: Dict[str, str] = {}
+
+    event_type = _EVENT_TYPE_RE.search(text)
+    if event_type:
+        slots["event_type"] = event_type.group(1).lower()
+
+    date = _first(_DATE_RES, text)
+    if date:
+        slots["date"] = date
+
+    budget = _first(_BUDGET_RES, text)
+    if budget:
+        slots["budget"] = " ".join(budget.split())
+
+    location = _location(text)
+    if location:
+        slots["location"] = location
+
+    attendees = _ATTENDEES_RE.search(text)
+    if attendees:
+        slots["attendees"] = attendees.group(1).replace(",", "")
+
+    return slots
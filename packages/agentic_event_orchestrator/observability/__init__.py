@@ -0,0 +1,60 @@
+"""
+Observability for the orchestrator: Prometheus-text metrics and span
+tracing for HTTP endpoints, agent runs, model calls, tools and I/O.
+
+The run-hook names are loaded on first use: they subclass the Agents SDK,
+and low-level modules (database, sessions) that only open spans should
+not pay for importing it.
+"""
+
+import importlib
+
+from .cancellation import Cancellation, RunCancelled, cancellable, cancellation_reason, raise_if_cancelled
+from .metrics import REGISTRY, Counter, Gauge, Histogram, MetricsRegistry
+from .http import MetricsMiddleware, TracingMiddleware
+from .tracing import Span, current_span, current_trace_id, get_tracer, instrument_requests, span
+from .usage import ModelPrices, UsageLedger, add_usage, key_fingerprint
+
+_LAZY = {
+    name: ".runs"
+    for name in ("RUN_HOOKS", "ObservabilityHooks", "RunRecord", "current_run", "observe_run", "provider_model_name")
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = [
+    "Cancellation",
+    "RunCancelled",
+    "cancellable",
+    "cancellation_reason",
+    "raise_if_cancelled",
+    "REGISTRY",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "MetricsMiddleware",
+    "TracingMiddleware",
+    "RUN_HOOKS",
+    "ObservabilityHooks",
+    "RunRecord",
+    "current_run",
+    "observe_run",
+    "provider_model_name",
+    "Span",
+    "current_span",
+    "current_trace_id",
+    "get_tracer",
+    "instrument_requests",
+    "span",
+    "ModelPrices",
+    "UsageLedger",
+    "add_usage",
+    "key_fingerprint",
+]
@@ -0,0 +1,61 @@
+"""
+Cancellation scope shared by a request's agent run and its tool calls.
+
+The serving layer opens cancellable() around the work it may abandon
+(client disconnected, deadline passed) and sets the scope's reason before
+cancelling the task. Cancelling the task stops the Runner and any async
+tool calls; sync tools run in worker threads, which cannot be interrupted,
+so instrumented tools call raise_if_cancelled() before starting and a call
+still queued for a thread never runs.
+"""
+
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+
+class RunCancelled(Exception):
+    """Raised inside a tool call whose request was abandoned"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Run cancelled: {reason}")
+        self.reason = reason
+
+
+@dataclass
+class Cancellation:
+    reason: Optional[str] = None  # "client_disconnect", "deadline", ...
+
+    def cancel(self, reason: str):
+        if self.reason is None:
+            self.reason = reason
+
+
+_scope: contextvars.ContextVar[Optional[Cancellation]] = contextvars.ContextVar("eventai_cancellation", default=None)
+
+
+@contextmanager
+def cancellable():
+    """Open a scope; tasks and threads started inside inherit it"""
+    scope = Cancellation()
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        try:
+            _scope.reset(token)
+        except ValueError:
+            # A streaming generator finalized from another context
+            _scope.set(None)
+
+
+def cancellation_reason() -> Optional[str]:
+    scope = _scope.get()
+    return scope.reason if scope is not None else None
+
+
+def raise_if_cancelled():
+    reason = cancellation_reason()
+    if reason is not None:
+        raise RunCancelled(reason)
@@ -0,0 +1,144 @@
+"""
+HTTP request metrics, request spans and worker-pool saturation gauges.
+
+Both middlewares are plain ASGI so the measured latency covers the whole
+response, including streamed (SSE) bodies. Requests are labelled by route
+template rather than raw path to keep label cardinality bounded.
+"""
+
+import asyncio
+import sys
+import time
+
+from .metrics import REGISTRY
+from .tracing import activate, parse_traceparent, start_span
+
+TRACE_HEADER = b"x-trace-id"
+
+HTTP_LATENCY = REGISTRY.histogram(
+    "eventai_http_request_duration_seconds", "HTTP request latency by endpoint", ["endpoint", "method", "status"],
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("eventai_http_requests_in_flight", "HTTP requests currently being served")
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-endpoint request latency"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            HTTP_LATENCY.observe(
+                time.perf_counter() - started,
+                endpoint=endpoint, method=scope["method"], status=str(status["code"]),
+            )
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span of each request.
+
+    Continues the caller's trace when a W3C `traceparent` header is sent
+    and returns the trace id as X-Trace-Id, so a slow or failed response
+    can be matched to its spans.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        trace_id, parent_id = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        span = start_span(
+            f"{scope['method']} {scope['path']}", kind="server", trace_id=trace_id, parent_id=parent_id,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        )
+
+        async def send_with_trace_id(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                message["headers"] = list(message.get("headers", [])) + [(TRACE_HEADER, span.trace_id.encode("ascii"))]
+            await send(message)
+
+        try:
+            with activate(span):
+                await self.app(scope, receive, send_with_trace_id)
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            route = scope.get("route")
+            if getattr(route, "path", None):
+                span.name = f"{scope['method']} {route.path}"
+                span.set_attribute("http.route", route.path)
+            span.end()
+
+
+def _threadpool_stats():
+    """Workers, busy workers and queued jobs for the pools agent runs use.
+
+    `tools` is the pool sync tools run on (once tools are loaded);
+    `asyncio` is the loop's default executor; `anyio` is Starlette's pool
+    for sync endpoints.
+    """
+    stats = {}
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return stats
+
+    executor = getattr(loop, "_default_executor", None)
+    if executor is not None:
+        stats["asyncio"] = {
+            "max_workers": executor._max_workers,
+            "workers": len(executor._threads),
+            "queued": executor._work_queue.qsize(),
+        }
+    else:
+        stats["asyncio"] = {"max_workers": 0, "workers": 0, "queued": 0}
+
+    tools = sys.modules.get(f"{__package__}.tools")
+    if tools is not None:
+        stats["tools"] = tools.tool_pool_stats()
+
+    try:
+        import anyio.to_thread
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        stats["anyio"] = {"max_workers": limiter.total_tokens, "workers": limiter.borrowed_tokens, "queued": 0}
+    except Exception:
+        pass
+    return stats
+
+
+def _threadpool_gauge(field_name: str):
+    return lambda: {(pool,): values[field_name] for pool, values in _threadpool_stats().items()}
+
+
+REGISTRY.gauge("eventai_threadpool_max_workers", "Worker thread limit per pool", ["pool"],
+               callback=_threadpool_gauge("max_workers"))
+REGISTRY.gauge("eventai_threadpool_workers", "Worker threads started (asyncio) or borrowed (anyio) per pool", ["pool"],
+               callback=_threadpool_gauge("workers"))
+REGISTRY.gauge("eventai_threadpool_queued", "Jobs waiting for a worker thread per pool", ["pool"],
+               callback=_threadpool_gauge("queued"))
@@ -0,0 +1,287 @@
+"""
+Agent run metrics and spans via SDK run hooks.
+
+observe_run() brackets one Runner run and publishes a RunRecord through a
+context variable; ObservabilityHooks (passed as `hooks=` to the Runner)
+fills it in as the run moves between agents. Per agent this yields time
+spent, the model it ran on, LLM turns, model-call latency and token
+usage; per run, total
+duration and turn count. The same hooks open a span per agent segment and
+per model call under the run's span.
+
+Per model turn, the tool calls it asked for are logged (see tools.py) and
+summarised when the turn closes: calls, wall time from first start to last
+end, busy time (the sum of the calls) and the slowest call. With the calls
+running concurrently, wall time approaches the slowest call rather than
+the sum; RunRecord.turn_breakdown() gives the figures per turn.
+
+A run may carry a budget (serving/budgets.py); the hooks check it before
+every model call and let its RunBudgetExceeded stop the run.
+"""
+
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from _agents_sdk import RunHooks
+
+from .cancellation import cancellation_reason
+from .metrics import REGISTRY
+from .tracing import Span, activate, start_span
+
+RUNS = REGISTRY.counter("eventai_runs_total", "Agent runs by entry agent and outcome", ["entry_agent", "outcome"])
+RUN_LATENCY = REGISTRY.histogram("eventai_run_duration_seconds", "End-to-end Runner run time", ["entry_agent"])
+RUN_TURNS = REGISTRY.histogram(
+    "eventai_run_turns", "LLM turns per run", ["entry_agent"], buckets=(1, 2, 3, 4, 5, 6, 8, 10, 15, 20),
+)
+RUNS_IN_FLIGHT = REGISTRY.gauge("eventai_runs_in_flight", "Runner runs currently executing")
+
+AGENT_LATENCY = REGISTRY.histogram(
+    "eventai_agent_duration_seconds", "Time spent in one agent within a run (until handoff or final output)", ["agent"],
+)
+AGENT_TURNS = REGISTRY.counter("eventai_agent_turns_total", "LLM turns taken by each agent", ["agent"])
+HANDOFFS = REGISTRY.counter("eventai_handoffs_total", "Agent handoffs", ["from_agent", "to_agent"])
+LLM_LATENCY = REGISTRY.histogram("eventai_llm_call_duration_seconds", "Model call latency", ["agent", "model"])
+LLM_TOKENS = REGISTRY.counter(
+    "eventai_llm_tokens_total", "Model tokens by agent and type (input, output, cached — part of input)",
+    ["agent", "type"],
+)
+TOOL_TURN_CALLS = REGISTRY.histogram(
+    "eventai_tool_turn_calls", "Tool calls per model turn that called tools", ["agent"], buckets=(1, 2, 3, 4, 6, 8, 12, 16),
+)
+TOOL_TURN_WALL = REGISTRY.histogram(
+    "eventai_tool_turn_wall_seconds", "Wall time of a model turn's tool calls, first start to last end", ["agent"],
+)
+TOOL_TURN_BUSY = REGISTRY.histogram(
+    "eventai_tool_turn_busy_seconds", "Summed duration of a model turn's tool calls (wall time if run serially)",
+    ["agent"],
+)
+
+
+@dataclass
+class RunRecord:
+    """What happened during one Runner run"""
+    entry_agent: str
+    started: float = field(default_factory=time.perf_counter)
+    turns: int = 0
+    current_agent: Optional[str] = None
+    agent_started: float = 0.0
+    llm_started: Dict[str, float] = field(default_factory=dict)
+    agents: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    span: Optional[Span] = None
+    agent_span: Optional[Span] = None
+    llm_spans: Dict[str, Span] = field(default_factory=dict)
+    # One entry per model call: agent, model seconds and the tool calls it led to
+    turn_log: List[Dict[str, Any]] = field(default_factory=list)
+    # A RunBudget (serving/budgets.py) the hooks check before each model call
+    budget: Optional[Any] = None
+
+    def turn_breakdown(self) -> List[Dict[str, Any]]:
+        """Per model turn: model seconds, and the count, wall, busy and slowest time of its tool calls"""
+        breakdown = []
+        for index, turn in enumerate(self.turn_log, start=1):
+            calls = turn["tools"]
+            durations = [call["ended"] - call["started"] for call in calls]
+            slowest = max(range(len(calls)), key=durations.__getitem__) if calls else None
+            breakdown.append({
+                "turn": index,
+                "agent": turn["agent"],
+                "llm_seconds": round(turn["llm_seconds"], 3),
+                "tool_calls": len(calls),
+                "tools_wall_seconds": round(max(c["ended"] for c in calls) - min(c["started"] for c in calls), 3)
+                if calls else 0.0,
+                "tools_busy_seconds": round(sum(durations), 3),
+                "slowest_tool": calls[slowest]["tool"] if calls else None,
+                "slowest_tool_seconds": round(durations[slowest], 3) if calls else 0.0,
+            })
+        return breakdown
+
+    def agent_stats(self, agent: str) -> Dict[str, Any]:
+        stats = self.agents.get(agent)
+        if stats is None:
+            stats = self.agents[agent] = {
+                "seconds": 0.0, "turns": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0,
+                "model": None, "llm_seconds": 0.0,
+            }
+        return stats
+
+
+_current_run: contextvars.ContextVar[Optional[RunRecord]] = contextvars.ContextVar("eventai_run", default=None)
+
+
+def current_run() -> Optional[RunRecord]:
+    """The RunRecord of the run executing in this context, if any"""
+    return _current_run.get()
+
+
+@contextmanager
+def observe_run(entry_agent: str, budget: Any = None):
+    """Track one Runner run; hooks inside the block report into the yielded record.
+
+    Nested calls join the enclosing run, so a caller can wrap run_agent() to
+    get hold of the record without the run being counted twice. `budget`
+    limits the run (see serving/budgets.py).
+    """
+    existing = _current_run.get()
+    if existing is not None:
+        yield existing
+        return
+
+    record = RunRecord(entry_agent=entry_agent, budget=budget)
+    record.span = start_span("agent_run", attributes={"agent.entry": entry_agent})
+    token = _current_run.set(record)
+    RUNS_IN_FLIGHT.inc()
+    outcome = "error"
+    try:
+        with activate(record.span):
+            yield record
+        outcome = "success"
+    except (asyncio.CancelledError, GeneratorExit):
+        # GeneratorExit: a streaming response closed because the client left
+        outcome = "cancelled"
+        raise
+    except Exception as e:
+        record.span.record_error(e)
+        raise
+    finally:
+        if cancellation_reason() is not None:
+            # Stopped by the serving layer (deadline, client gone), however the run unwound
+            outcome = "cancelled"
+        RUNS_IN_FLIGHT.dec()
+        _close_turn(record)
+        _close_agent(record, time.perf_counter())
+        for llm_span in record.llm_spans.values():
+            llm_span.end()
+        record.span.set_attribute("run.outcome", outcome)
+        record.span.set_attribute("run.turns", record.turns)
+        record.span.end()
+        RUNS.inc(entry_agent=entry_agent, outcome=outcome)
+        RUN_LATENCY.observe(time.perf_counter() - record.started, entry_agent=entry_agent)
+        RUN_TURNS.observe(record.turns, entry_agent=entry_agent)
+        try:
+            _current_run.reset(token)
+        except ValueError:
+            # A streaming generator finalized from another context
+            _current_run.set(None)
+
+
+def _close_agent(record: RunRecord, now: float):
+    if record.current_agent is None:
+        return
+    elapsed = now - record.agent_started
+    record.agent_stats(record.current_agent)["seconds"] += elapsed
+    AGENT_LATENCY.observe(elapsed, agent=record.current_agent)
+    record.current_agent = None
+    if record.agent_span is not None:
+        record.agent_span.end()
+        record.agent_span = None
+
+
+def _close_turn(record: RunRecord):
+    """Publish the tool-call breakdown of the run's latest model turn, once"""
+    if not record.turn_log or record.turn_log[-1].get("closed"):
+        return
+    turn = record.turn_log[-1]
+    turn["closed"] = True
+    calls = turn["tools"]
+    if not calls:
+        return
+    durations = [call["ended"] - call["started"] for call in calls]
+    wall = max(call["ended"] for call in calls) - min(call["started"] for call in calls)
+    TOOL_TURN_CALLS.observe(len(calls), agent=turn["agent"])
+    TOOL_TURN_WALL.observe(wall, agent=turn["agent"])
+    TOOL_TURN_BUSY.observe(sum(durations), agent=turn["agent"])
+    if record.agent_span is not None:
+        record.agent_span.add_event(
+            "tool_turn", calls=len(calls), wall_seconds=round(wall, 3), busy_seconds=round(sum(durations), 3),
+            slowest_seconds=round(max(durations), 3),
+        )
+
+
+def provider_model_name(model: Any) -> Optional[str]:
+    """The provider model name, looking through wrapping Models (cache, recording, pruning)"""
+    while model is not None and not isinstance(model, str):
+        inner = getattr(model, "model", None)
+        if inner is None:
+            return type(model).__name__
+        model = inner
+    return model
+
+
+class ObservabilityHooks(RunHooks):
+    """Run hooks that feed the current RunRecord and the agent metrics"""
+
+    async def on_agent_start(self, context, agent) -> None:
+        record = current_run()
+        if record is None:
+            return
+        now = time.perf_counter()
+        _close_agent(record, now)
+        record.current_agent = agent.name
+        record.agent_started = now
+        record.agent_span = start_span(f"agent:{agent.name}", parent=record.span, attributes={"agent.name": agent.name})
+
+    async def on_agent_end(self, context, agent, output: Any) -> None:
+        record = current_run()
+        if record is not None:
+            _close_agent(record, time.perf_counter())
+
+    async def on_handoff(self, context, from_agent, to_agent) -> None:
+        HANDOFFS.inc(from_agent=from_agent.name, to_agent=to_agent.name)
+        record = current_run()
+        if record is not None:
+            if record.agent_span is not None:
+                record.agent_span.add_event("handoff", to_agent=to_agent.name)
+            _close_agent(record, time.perf_counter())
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        record = current_run()
+        if record is not None:
+            _close_turn(record)
+            if record.budget is not None:
+                record.budget.check(record)
+            model = provider_model_name(getattr(agent, "model", None))
+            record.agent_stats(agent.name)["model"] = model
+            record.llm_started[agent.name] = time.perf_counter()
+            record.llm_spans[agent.name] = start_span(
+                "llm_call", kind="client", parent=record.agent_span or record.span,
+                attributes={"agent.name": agent.name, "gen_ai.request.model": model},
+            )
+
+    async def on_llm_end(self, context, agent, response) -> None:
+        AGENT_TURNS.inc(agent=agent.name)
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        cached_tokens = getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", 0) or 0
+        LLM_TOKENS.inc(input_tokens, agent=agent.name, type="input")
+        LLM_TOKENS.inc(output_tokens, agent=agent.name, type="output")
+        LLM_TOKENS.inc(cached_tokens, agent=agent.name, type="cached")
+
+        record = current_run()
+        if record is None:
+            return
+        record.turns += 1
+        stats = record.agent_stats(agent.name)
+        stats["turns"] += 1
+        stats["input_tokens"] += input_tokens
+        stats["cached_tokens"] += cached_tokens
+        stats["output_tokens"] += output_tokens
+        started = record.llm_started.pop(agent.name, None)
+        elapsed = 0.0
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            stats["llm_seconds"] += elapsed
+            LLM_LATENCY.observe(elapsed, agent=agent.name, model=stats["model"] or "unknown")
+        record.turn_log.append({"agent": agent.name, "llm_seconds": elapsed, "tools": []})
+        llm_span = record.llm_spans.pop(agent.name, None)
+        if llm_span is not None:
+            llm_span.set_attribute("gen_ai.usage.input_tokens", input_tokens)
+            llm_span.set_attribute("gen_ai.usage.output_tokens", output_tokens)
+            llm_span.end()
+
+
+RUN_HOOKS = ObservabilityHooks()
@@ -0,0 +1,168 @@
+"""
+Per-tool call, error and latency metrics and spans.
+
+`function_tool` here is a drop-in for the SDK decorator: it wraps the tool
+function with timing, error counting and a span under the calling agent's
+span, then registers it with the SDK exactly as before. Errors are counted
+when the function raises; the SDK still turns the exception into a tool
+error message for the model. A call whose request was already cancelled
+(see cancellation.py) is refused without running.
+
+The Runner starts every tool call of a model turn at once. Sync tools (all
+of tools/, which block on `requests`) run on a dedicated pool of
+TOOL_MAX_WORKERS threads rather than the loop's default executor, so a
+turn's calls overlap instead of queueing behind unrelated blocking work;
+async tools run on the loop. Each call is also logged against the current
+model turn of the run (RunRecord.turn_log) for the per-turn breakdown.
+instrument_tool() alone keeps a sync tool sync, for direct calls.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from _agents_sdk import function_tool as _sdk_function_tool
+
+from .cancellation import RunCancelled, raise_if_cancelled
+from .metrics import REGISTRY
+from .runs import current_run
+from .tracing import span
+
+TOOL_CALLS = REGISTRY.counter("eventai_tool_calls_total", "Tool invocations", ["tool"])
+TOOL_ERRORS = REGISTRY.counter("eventai_tool_errors_total", "Tool invocations that raised", ["tool"])
+TOOL_LATENCY = REGISTRY.histogram("eventai_tool_duration_seconds", "Tool execution time", ["tool"])
+TOOL_CANCELLED = REGISTRY.counter(
+    "eventai_tool_calls_cancelled_total", "Tool calls skipped because their request was cancelled", ["tool"],
+)
+TOOL_QUEUE_WAIT = REGISTRY.histogram(
+    "eventai_tool_queue_seconds", "Time a sync tool call waited for a tool pool thread", ["tool"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def tool_pool() -> ThreadPoolExecutor:
+    """The thread pool sync tools run on (TOOL_MAX_WORKERS threads, default 16)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(int(os.getenv("TOOL_MAX_WORKERS", "16")), thread_name_prefix="eventai-tool")
+    return _pool
+
+
+def configure_tool_pool(max_workers: int) -> ThreadPoolExecutor:
+    """Replace the tool pool with one of `max_workers` threads (benchmarks, tests)"""
+    global _pool
+    with _pool_lock:
+        previous, _pool = _pool, ThreadPoolExecutor(max_workers, thread_name_prefix="eventai-tool")
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return _pool
+
+
+def tool_pool_stats() -> Dict[str, int]:
+    """Workers, started threads and queued calls of the tool pool"""
+    if _pool is None:
+        return {"max_workers": int(os.getenv("TOOL_MAX_WORKERS", "16")), "workers": 0, "queued": 0}
+    return {"max_workers": _pool._max_workers, "workers": len(_pool._threads), "queued": _pool._work_queue.qsize()}
+
+
+def _check_cancelled(name: str):
+    try:
+        raise_if_cancelled()
+    except RunCancelled:
+        TOOL_CANCELLED.inc(tool=name)
+        raise
+
+
+def _tool_span(name: str):
+    record = current_run()
+    parent = record.agent_span if record is not None else None
+    return span(f"tool:{name}", parent=parent, **{"tool.name": name})
+
+
+def _log_call(name: str, started: float, ended: float):
+    record = current_run()
+    if record is not None and record.turn_log:
+        record.turn_log[-1]["tools"].append({"tool": name, "started": started, "ended": ended})
+
+
+def instrument_tool(func):
+    """Wrap a tool function (sync or async) with call/error/latency metrics"""
+    name = func.__name__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            _check_cancelled(name)
+            started = time.perf_counter()
+            TOOL_CALLS.inc(tool=name)
+            try:
+                with _tool_span(name):
+                    return await func(*args, **kwargs)
+            except Exception:
+                TOOL_ERRORS.inc(tool=name)
+                raise
+            finally:
+                ended = time.perf_counter()
+                TOOL_LATENCY.observe(ended - started, tool=name)
+                _log_call(name, started, ended)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        _check_cancelled(name)
+        started = time.perf_counter()
+        TOOL_CALLS.inc(tool=name)
+        try:
+            with _tool_span(name):
+                return func(*args, **kwargs)
+        except Exception:
+            TOOL_ERRORS.inc(tool=name)
+            raise
+        finally:
+            ended = time.perf_counter()
+            TOOL_LATENCY.observe(ended - started, tool=name)
+            _log_call(name, started, ended)
+    return wrapper
+
+
+def run_on_tool_pool(func):
+    """Async wrapper running the sync `func` on tool_pool(), with the caller's context"""
+    name = func.__name__
+
+    def timed(submitted: float, args, kwargs):
+        TOOL_QUEUE_WAIT.observe(time.perf_counter() - submitted, tool=name)
+        return func(*args, **kwargs)
+
+    @functools.wraps(func)
+    async def pooled(*args, **kwargs):
+        # The copied context carries the run record, span and cancellation into the thread
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            tool_pool(), context.run, timed, time.perf_counter(), args, kwargs,
+        )
+    return pooled
+
+
+def _register(func, **kwargs):
+    instrumented = instrument_tool(func)
+    if not inspect.iscoroutinefunction(instrumented):
+        instrumented = run_on_tool_pool(instrumented)
+    return _sdk_function_tool(instrumented, **kwargs)
+
+
+def function_tool(func=None, **kwargs):
+    """SDK `function_tool` with metrics, running sync tools on the tool pool; usable bare or with arguments"""
+    if func is None:
+        return lambda f: _register(f, **kwargs)
+    return _register(func, **kwargs)
@@ -0,0 +1,376 @@
+"""
+Span tracing for requests, agent runs, model calls, tools and I/O.
+
+Spans nest through a context variable: `span()` opens a child of whatever
+span is current, so an HTTP request span ends up parenting the agent run,
+each agent segment, model calls, tool invocations, vendor DB queries and
+outbound `requests` calls made while serving it.
+
+Every request gets a trace id (returned as X-Trace-Id) even when no
+exporter is configured; spans are only recorded when TRACE_EXPORT_PATH is
+set. Finished spans are handed to a background thread that appends them
+to the file, either one flat JSON object per line (`jsonl`) or OTLP/JSON
+`resourceSpans` batches (`otlp`, the OpenTelemetry file-exporter format).
+
+Outbound `requests` calls always get a client span, but the traceparent
+header is only sent to the hosts in TRACE_PROPAGATE_HOSTS (our own
+services), so trace ids never leak to third-party APIs.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("observability.tracing")
+
+SERVICE_NAME = "agentic-event-orchestrator"
+
+_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+@dataclass
+class Span:
+    """One timed operation within a trace"""
+    name: str
+    trace_id: str
+    span_id: str = field(default_factory=_new_span_id)
+    parent_id: Optional[str] = None
+    kind: str = "internal"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    error: Optional[str] = None
+    recording: bool = True
+
+    def set_attribute(self, key: str, value: Any):
+        if self.recording and value is not None:
+            self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any):
+        if self.recording:
+            self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def record_error(self, exc: BaseException):
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def end(self):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.recording:
+            _tracer.export(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    otlp = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": _KINDS.get(span.kind, 1),
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "events": [
+            {"timeUnixNano": str(e["time_ns"]), "name": e["name"], "attributes": _otlp_attributes(e["attributes"])}
+            for e in span.events
+        ],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        otlp["parentSpanId"] = span.parent_id
+    return otlp
+
+
+class FileSpanExporter:
+    """Appends finished spans to a file from a background thread"""
+
+    def __init__(self, path: str, fmt: str = "jsonl", max_batch: int = 512):
+        if fmt not in ("jsonl", "otlp"):
+            raise ValueError(f"Unknown trace export format {fmt!r} (expected 'jsonl' or 'otlp')")
+        self.path = path
+        self.format = fmt
+        self.max_batch = max_batch
+        self.exported = 0
+        self.errors = 0
+
+        self._queue: "queue.SimpleQueue[Optional[Span]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, span: Span):
+        self._queue.put(span)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _lines(self, batch: List[Span]) -> List[str]:
+        if self.format == "jsonl":
+            return [json.dumps(span.to_dict(), default=str) for span in batch]
+        return [json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+                "scopeSpans": [{"scope": {"name": "eventai"}, "spans": [_otlp_span(span) for span in batch]}],
+            }]
+        }, default=str)]
+
+    def _write(self, batch: List[Span]):
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(self._lines(batch)) + "\n")
+            self.exported += len(batch)
+        except Exception:
+            self.errors += 1
+            logger.warning("Span export to %s failed", self.path, exc_info=True)
+
+    def _run(self):
+        while True:
+            span = self._queue.get()
+            batch = [span] if span is not None else []
+            while span is not None and len(batch) < self.max_batch:
+                try:
+                    span = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if span is not None:
+                    batch.append(span)
+            if batch:
+                self._write(batch)
+            if span is None:
+                return
+
+
+class Tracer:
+    """Creates spans and routes finished ones to the exporter, if any"""
+
+    def __init__(self, exporter: Optional[FileSpanExporter] = None):
+        self.exporter = exporter
+
+    @property
+    def recording(self) -> bool:
+        return self.exporter is not None
+
+    def export(self, span: Span):
+        if self.exporter is not None:
+            self.exporter.submit(span)
+
+    def configure(self, path: Optional[str], fmt: str = "jsonl"):
+        """Start (or stop, with path=None) exporting spans to `path`"""
+        if self.exporter is not None:
+            self.exporter.close()
+        self.exporter = FileSpanExporter(path, fmt) if path else None
+
+    def shutdown(self):
+        self.configure(None)
+
+
+_tracer = Tracer()
+atexit.register(_tracer.shutdown)
+
+_TRACE_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+if _TRACE_PATH:
+    _tracer.configure(_TRACE_PATH, os.getenv("TRACE_EXPORT_FORMAT", "jsonl").lower())
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer"""
+    return _tracer
+
+
+# ============================================================================
+# SPAN CONTEXT
+# ============================================================================
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("eventai_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span in this context, if any"""
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def start_span(name: str, kind: str = "internal", parent: Optional[Span] = None,
+               attributes: Optional[Dict[str, Any]] = None, trace_id: Optional[str] = None,
+               parent_id: Optional[str] = None) -> Span:
+    """Create a span without making it current; the caller must end() it.
+
+    Parents default to the current span. `trace_id`/`parent_id` continue a
+    trace started elsewhere (an incoming traceparent header).
+    """
+    if parent is None and trace_id is None:
+        parent = _current_span.get()
+    if parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    span = Span(
+        name=name,
+        trace_id=trace_id or _new_trace_id(),
+        parent_id=parent_id,
+        kind=kind,
+        recording=_tracer.recording,
+    )
+    if attributes and span.recording:
+        span.attributes.update({k: v for k, v in attributes.items() if v is not None})
+    return span
+
+
+@contextmanager
+def activate(span: Span):
+    """Make `span` current for the block without ending it"""
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # A streaming generator finalized from another context
+            _current_span.set(None)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", parent: Optional[Span] = None, **attributes: Any):
+    """Open a child span for the duration of the block"""
+    s = start_span(name, kind=kind, parent=parent, attributes=attributes)
+    with activate(s):
+        try:
+            yield s
+        except BaseException as e:
+            s.record_error(e)
+            raise
+        finally:
+            s.end()
+
+
+def traceparent(s: Span) -> str:
+    """W3C traceparent header value for propagating `s` downstream"""
+    return f"00-{s.trace_id}-{s.span_id}-01"
+
+
+def parse_traceparent(value: Optional[str]):
+    """(trace_id, parent_span_id) from a W3C traceparent header, or (None, None)"""
+    parts = (value or "").strip().lower().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None
+    if not all(c in "0123456789abcdef" for c in parts[1] + parts[2]) or parts[1] == "0" * 32:
+        return None, None
+    return parts[1], parts[2]
+
+
+# ============================================================================
+# OUTBOUND HTTP (requests)
+# ============================================================================
+
+_requests_instrumented = False
+_propagate_hosts: Tuple[str, ...] = ()
+
+
+def _hosts_from_env() -> Tuple[str, ...]:
+    value = os.getenv("TRACE_PROPAGATE_HOSTS", "localhost,127.0.0.1")
+    return tuple(host.strip().lower() for host in value.split(",") if host.strip())
+
+
+def propagates_to(url: Optional[str], hosts: Iterable[str]) -> bool:
+    """Whether `url`'s host is one of `hosts` (".example.internal" matches any subdomain)"""
+    host = (urlsplit(url or "").hostname or "").lower()
+    if not host:
+        return False
+    for allowed in hosts:
+        if host == allowed or (allowed.startswith(".") and host.endswith(allowed)):
+            return True
+    return False
+
+
+def instrument_requests(propagate_hosts: Optional[Iterable[str]] = None):
+    """Trace every `requests` call; propagate the trace to internal hosts only.
+
+    Wraps Session.send, which the module-level requests.get/post helpers
+    also go through, so vendor portal and backend calls are covered without
+    touching each call site. `propagate_hosts` (default TRACE_PROPAGATE_HOSTS)
+    lists the hosts that receive a traceparent header; calling again only
+    updates the list.
+    """
+    global _requests_instrumented, _propagate_hosts
+    _propagate_hosts = tuple(h.lower() for h in propagate_hosts) if propagate_hosts is not None else _hosts_from_env()
+    if _requests_instrumented:
+        return
+    try:
+        import requests
+    except ImportError:
+        return
+
+    original_send = requests.Session.send
+
+    def send(self, request, **kwargs):
+        url = request.url.split("?", 1)[0] if request.url else None
+        with span(f"HTTP {request.method}", kind="client",
+                  **{"http.method": request.method, "http.url": url}) as s:
+            if propagates_to(request.url, _propagate_hosts):
+                request.headers["traceparent"] = traceparent(s)
+            response = original_send(self, request, **kwargs)
+            s.set_attribute("http.status_code", response.status_code)
+            return response
+
+    requests.Session.send = send
+    _requests_instrumented = True
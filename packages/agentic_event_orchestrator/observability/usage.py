@@ -0,0 +1,173 @@
+"""
+Token and cost accounting for agent runs.
+
+The run hooks collect input, cached (the part of input served from the
+provider's prompt cache) and output tokens per agent for every model call
+in a run (RunRecord.agents). UsageLedger.record() turns that into the
+`usage` block the endpoints return — totals plus a per-agent breakdown
+with model and cost — and adds it to the per-API-key totals and metrics.
+Per-session totals are kept in the session state by the server
+(add_usage).
+
+Costs use ModelPrices: USD per million input / output / cached-input
+tokens by model, with list prices for the Gemini models built in and
+LLM_PRICES ("model=input/output/cached,...") to add or override. Models
+without a price report a null cost. API keys are reported by a short
+fingerprint, never in the clear.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger("observability.usage")
+
+LLM_COST = REGISTRY.counter("eventai_llm_cost_usd_total", "Estimated model cost by agent and model", ["agent", "model"])
+KEY_TOKENS = REGISTRY.counter(
+    "eventai_api_key_tokens_total", "Model tokens by API key fingerprint and type", ["api_key", "type"],
+)
+KEY_COST = REGISTRY.counter("eventai_api_key_cost_usd_total", "Estimated model cost by API key fingerprint", ["api_key"])
+
+TOKEN_FIELDS = ("input_tokens", "cached_tokens", "output_tokens")
+
+
+@dataclass(frozen=True)
+class Price:
+    """USD per million tokens"""
+    input: float
+    output: float
+    cached: float
+
+
+# List prices per million tokens (text, <=200k context); override with LLM_PRICES
+DEFAULT_PRICES = {
+    "gemini-3-flash-preview": Price(input=0.50, output=3.00, cached=0.05),
+    "gemini-2.5-pro": Price(input=1.25, output=10.00, cached=0.125),
+    "gemini-2.5-flash": Price(input=0.30, output=2.50, cached=0.03),
+    "gemini-2.5-flash-lite": Price(input=0.10, output=0.40, cached=0.01),
+}
+
+
+def key_fingerprint(api_key: Optional[str]) -> str:
+    """Short stable identifier for an API key, safe to log and label metrics with"""
+    if not api_key or api_key == "anonymous":
+        return "anonymous"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+class ModelPrices:
+    """Per-model token prices and cost estimates"""
+
+    def __init__(self, prices: Dict[str, Price] = None):
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+        self._unpriced_logged = set()
+
+    @classmethod
+    def from_env(cls) -> "ModelPrices":
+        """DEFAULT_PRICES plus LLM_PRICES ("model=input/output/cached,...")"""
+        prices = dict(DEFAULT_PRICES)
+        for entry in os.getenv("LLM_PRICES", "").split(","):
+            if "=" in entry:
+                model, values = entry.split("=", 1)
+                parts = [float(v) for v in values.split("/")]
+                input_price, output_price = parts[0], parts[1]
+                prices[model.strip()] = Price(input_price, output_price, parts[2] if len(parts) > 2 else input_price)
+        return cls(prices)
+
+    def price_for(self, model: Optional[str]) -> Optional[Price]:
+        if not model:
+            return None
+        # "gemini/gemini-2.5-pro" (litellm) is priced as "gemini-2.5-pro"
+        return self.prices.get(model) or self.prices.get(model.rsplit("/", 1)[-1])
+
+    def cost(self, model: Optional[str], input_tokens: int, cached_tokens: int, output_tokens: int) -> Optional[float]:
+        """Estimated USD for the tokens, or None when the model has no price"""
+        price = self.price_for(model)
+        if price is None:
+            if model not in self._unpriced_logged:
+                self._unpriced_logged.add(model)
+                logger.info("No price for model %s; its calls report no cost (set LLM_PRICES)", model)
+            return None
+        uncached = max(0, input_tokens - cached_tokens)
+        return (uncached * price.input + cached_tokens * price.cached + output_tokens * price.output) / 1_000_000
+
+
+def add_usage(total: Optional[Dict[str, Any]], usage: Dict[str, Any]) -> Dict[str, Any]:
+    """`total` (e.g. a session's running totals) with one more run's usage added"""
+    total = dict(total or {"runs": 0, "requests": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0,
+                           "total_tokens": 0, "cost_usd": 0.0})
+    total["runs"] += 1
+    for field_name in ("requests", "total_tokens", *TOKEN_FIELDS):
+        total[field_name] += usage[field_name]
+    total["cost_usd"] = round(total["cost_usd"] + (usage["cost_usd"] or 0.0), 6)
+    return total
+
+
+class UsageLedger:
+    """Builds usage blocks from run records and keeps totals per API key"""
+
+    def __init__(self, prices: ModelPrices = None):
+        self.prices = prices or ModelPrices()
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "UsageLedger":
+        return cls(ModelPrices.from_env())
+
+    def usage(self, agents: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """The usage block for one run, from RunRecord.agents"""
+        breakdown = []
+        totals = {"requests": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+        cost = None
+        for name, stats in agents.items():
+            if not stats["turns"]:
+                continue
+            agent_cost = self.prices.cost(stats["model"], stats["input_tokens"], stats["cached_tokens"],
+                                          stats["output_tokens"])
+            breakdown.append({
+                "agent": name,
+                "model": stats["model"],
+                "requests": stats["turns"],
+                "input_tokens": stats["input_tokens"],
+                "cached_tokens": stats["cached_tokens"],
+                "output_tokens": stats["output_tokens"],
+                "cost_usd": round(agent_cost, 6) if agent_cost is not None else None,
+                "llm_seconds": round(stats["llm_seconds"], 3),
+            })
+            totals["requests"] += stats["turns"]
+            for field_name in TOKEN_FIELDS:
+                totals[field_name] += stats[field_name]
+            if agent_cost is not None:
+                cost = (cost or 0.0) + agent_cost
+        return {
+            **totals,
+            "total_tokens": totals["input_tokens"] + totals["output_tokens"],
+            "cost_usd": round(cost, 6) if cost is not None else None,
+            "agents": breakdown,
+        }
+
+    def record(self, agents: Dict[str, Dict[str, Any]], api_key: Optional[str]) -> Dict[str, Any]:
+        """Build the run's usage block and count it against `api_key`"""
+        usage = self.usage(agents)
+        key = key_fingerprint(api_key)
+        for entry in usage["agents"]:
+            if entry["cost_usd"]:
+                LLM_COST.inc(entry["cost_usd"], agent=entry["agent"], model=entry["model"] or "unknown")
+        for field_name in TOKEN_FIELDS:
+            KEY_TOKENS.inc(usage[field_name], api_key=key, type=field_name[:-len("_tokens")])
+        if usage["cost_usd"]:
+            KEY_COST.inc(usage["cost_usd"], api_key=key)
+        with self._lock:
+            self._keys[key] = add_usage(self._keys.get(key), usage)
+        return usage
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Totals per API key fingerprint"""
+        with self._lock:
+            return {key: dict(totals) for key, totals in self._keys.items()}
@@ -1,13 +1,18 @@
 """FastAPI server for the Agentic Event Orchestrator using OpenAI Agent SDK."""
 
 import logging
-from fastapi import FastAPI, HTTPException, Request, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Awaitable, Callable, Tuple
 import uvicorn
+import asyncio
+import json
 import os
 import sys
+import time
 import uuid
 from datetime import datetime
 
@@ -19,20 +24,70 @@ logger = logging.getLogger("agentic_orchestrator")
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from agents.sdk_agents import (
-    run_orchestration,
-    run_vendor_discovery,
-    run_scheduler,
-    run_triage,
-    run_booking,
-    run_event_planning,
+    run_orchestration_async,
+    run_vendor_discovery_async,
+    run_scheduler_async,
+    run_triage_async,
+    run_agent,
+    run_agent_streamed,
+    follow_up_agents,
     triage_agent,
+    orchestrator_agent,
+    vendor_discovery_agent,
+    scheduler_agent,
+    external_client,
+    llm_cache,
+    llm_models,
+    llm_transport,
+    LLM_MODE,
+    INTRODUCTION,
 )
-from _agents_sdk import Runner
+from agents.routing import ChatRouter, QuickReplies, QuickReply, Route
+from observability import (
+    REGISTRY,
+    MetricsMiddleware,
+    RunRecord,
+    TracingMiddleware,
+    UsageLedger,
+    add_usage,
+    cancellable,
+    instrument_requests,
+    observe_run,
+)
+from serving import (
+    AdmissionController,
+    AdmissionRejected,
+    RequestCancelled,
+    RequestDeadlines,
+    ResponseCache,
+    RunBudgetExceeded,
+    RunBudgets,
+    StoppedRun,
+    Warmup,
+    record_cancellation,
+    run_bounded,
+    run_within_budget,
+    stopped_run,
+)
+from _agents_sdk import MaxTurnsExceeded
+from sessions import ConversationContext, SessionSingleFlight, get_session_store
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm every dependency up before serving; release clients on shutdown."""
+    await _warmup.run()
+    yield
+    await _warmup.close()
+    await external_client.close()
+    from database import get_database
+    get_database().close()
+
 
 app = FastAPI(
     title="Agentic Event Orchestrator API",
     description="AI-powered event planning with OpenAI Agent SDK",
-    version="3.0.0"
+    version="3.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware — restrict to known origins
@@ -46,9 +101,18 @@ app.add_middleware(
     allow_origins=[origin.strip() for origin in ALLOWED_ORIGINS],
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization", "X-API-Key"],
+    allow_headers=["Content-Type", "Authorization", "X-API-Key", "traceparent"],
+    expose_headers=["X-Trace-Id"],
 )
 
+# Request spans (X-Trace-Id response header) and per-endpoint latency for
+# /metrics; added last so they wrap everything and time the whole response
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+# Outbound vendor-portal/backend calls become child spans of the request
+instrument_requests()
+
 # ============================================================================
 # AUTH MIDDLEWARE — API Key validation
 # ============================================================================
@@ -71,29 +135,171 @@ async def verify_api_key(request: Request):
 
 
 # ============================================================================
-# SESSION MANAGEMENT (in-memory for now)
+# ADMISSION CONTROL — bound concurrent LLM work globally and per API key
+# ============================================================================
+
+_admission = AdmissionController.from_env()
+
+async def llm_admission(request: Request):
+    """Hold an LLM slot for the whole request, or fail fast with 429.
+    
+    Requests beyond the concurrency limits wait in a bounded queue; when the
+    queue is full (or the wait times out) the client gets 429 + Retry-After.
+    """
+    if (getattr(request.state, "cached_response", None) is not None
+            or getattr(request.state, "quick_reply", None) is not None):
+        # Served from the response cache or a template — no model call, no slot needed
+        yield
+        return
+    
+    api_key = request.headers.get("X-API-Key") or "anonymous"
+    try:
+        async with _admission.admit(api_key):
+            yield
+    except AdmissionRejected as e:
+        logger.warning("LLM admission rejected (%s), retry after %ss", e.reason, e.retry_after)
+        raise HTTPException(
+            status_code=429,
+            detail="The assistant is busy right now. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+# ============================================================================
+# DEADLINES — cancel agent work past its deadline or once the client is gone
+# ============================================================================
+
+_deadlines = RequestDeadlines.from_env()
+
+@app.exception_handler(RequestCancelled)
+async def request_cancelled_handler(request: Request, exc: RequestCancelled):
+    if exc.reason == "deadline":
+        return JSONResponse(
+            {"detail": "The assistant took too long to respond. Please try again."}, status_code=504,
+        )
+    # Nobody is listening; 499 (client closed request) keeps access logs honest
+    return JSONResponse({"detail": "Client closed request"}, status_code=499)
+
+
+# ============================================================================
+# RUN BUDGETS — cap turns, time and tokens per run; stop with a partial summary
+# ============================================================================
+
+_budgets = RunBudgets.from_env()
+
+def stop_reason(result: Any) -> Optional[str]:
+    """The budget limit that stopped the run (turns, seconds, tokens), or None if it finished."""
+    return result.limit if isinstance(result, StoppedRun) else None
+
+
+# ============================================================================
+# SESSION MANAGEMENT (store selected by SESSION_BACKEND — see sessions/)
 # ============================================================================
 
-# Store conversation history per session
-_sessions: Dict[str, List[Dict[str, str]]] = {}
+# Conversation history per session, capped by count, idle TTL and bytes
+_session_store = get_session_store()
+
+# Serializes chat turns per session and coalesces duplicate submissions
+_chat_flights = SessionSingleFlight()
+
+# Rolling summary + extracted slots, packed into a token budget per turn
+_chat_context = ConversationContext.from_env()
+
+# Turns start at a keyword-matched specialist, the specialist that answered
+# the previous turn, or the triage agent — in that order
+_chat_router = ChatRouter.from_env(triage_agent, follow_up_agents)
+
+# Plain greetings, "what can you do" and thanks are answered from templates
+_quick_replies = QuickReplies.from_env(INTRODUCTION)
+
+# Tokens and estimated cost per run, per session (in its state) and per API key
+_usage = UsageLedger.from_env()
 
 def get_session(session_id: str) -> List[Dict[str, str]]:
     """Get or create a conversation session."""
-    if session_id not in _sessions:
-        _sessions[session_id] = []
-    return _sessions[session_id]
+    return _session_store.get(session_id)
+
+async def load_session(session_id: str) -> List[Dict[str, str]]:
+    """get_session() for the chat path: a shared backend is read off the event loop."""
+    return await _session_store.aget(session_id)
 
 def add_to_session(session_id: str, role: str, content: str):
-    """Add a message to the session history."""
-    session = get_session(session_id)
-    session.append({
-        "role": role,
-        "content": content,
-        "timestamp": datetime.now().isoformat()
-    })
-    # Keep last 20 messages to avoid context overflow
-    if len(session) > 20:
-        _sessions[session_id] = session[-20:]
+    """Add a message to the session history and fold it into the session summary."""
+    _session_store.append(session_id, role, content, datetime.now().isoformat())
+    state = _chat_context.update(_session_store.get_state(session_id), role, content)
+    _session_store.set_state(session_id, state)
+
+
+def record_chat_turn(session_id: str, message: str, response_text: str,
+                     route: Route, last_agent, run: RunRecord):
+    """Save the exchange and remember which agent the next turn starts at."""
+    add_to_session(session_id, "user", message)
+    add_to_session(session_id, "assistant", response_text)
+    state = _chat_router.record(_session_store.get_state(session_id), route, last_agent, run.agents)
+    _session_store.set_state(session_id, state)
+
+
+def record_usage(run: RunRecord, api_key: Optional[str], session_id: Optional[str] = None) -> "UsageInfo":
+    """Account the run's tokens and cost to the API key (and session), returning the usage block."""
+    usage = _usage.record(run.agents, api_key)
+    if session_id:
+        state = _session_store.get_state(session_id)
+        state["usage"] = add_usage(state.get("usage"), usage)
+        _session_store.set_state(session_id, state)
+        usage["session"] = state["usage"]
+    return UsageInfo(**usage)
+
+
+async def run_observed(entry_agent: str, endpoint: str,
+                       fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, RunRecord]:
+    """Run `fn()` (a run_*_async call) inside observe_run, under the endpoint's budget, so the
+    caller gets the run's record. A run stopped by its budget returns a StoppedRun."""
+    budget = _budgets.budget_for(endpoint)
+    with observe_run(entry_agent, budget) as run:
+        return await run_within_budget(budget, fn()), run
+
+
+def build_agent_response(result: Any, run: RunRecord, api_key: Optional[str]) -> "AgentResponse":
+    """The AgentResponse for a finished or budget-stopped run, with its usage recorded."""
+    return AgentResponse(
+        success=stop_reason(result) is None,
+        result=result.final_output,
+        agent_used=result.last_agent.name if result.last_agent else "AI Assistant",
+        usage=record_usage(run, api_key),
+        stopped=stop_reason(result),
+    )
+
+
+async def record_quick_reply(session_id: str, message: str, reply: QuickReply):
+    """Save a templated exchange; the session's routing state is unchanged.
+
+    Waits behind a turn already running for the session so history stays in
+    order, and loads the session first so the exchange extends the shared copy.
+    """
+    async with _chat_flights.serialized(session_id):
+        await load_session(session_id)
+        add_to_session(session_id, "user", message)
+        add_to_session(session_id, "assistant", reply.text)
+    _chat_router.record_quick_reply()
+
+
+async def chat_quick_reply(request: Request):
+    """Dependency: match template-answerable messages before an LLM slot is taken."""
+    request.state.quick_reply = None
+    if _quick_replies is None:
+        return
+    try:
+        body = ChatRequest(**await request.json())
+    except Exception:
+        return  # let the endpoint's own validation report it
+    request.state.quick_reply = _quick_replies.match(body.message)
+
+
+async def build_chat_input(request: "ChatRequest", session_id: str) -> str:
+    """Build the triage agent input: user email, known event details, the
+    condensed earlier conversation and recent messages, then the new message."""
+    history = await load_session(session_id)
+    return _chat_context.build(history, _session_store.get_state(session_id), request.message, request.user_email)
 
 
 # ============================================================================
@@ -105,10 +311,32 @@ class ChatRequest(BaseModel):
     session_id: Optional[str] = None
     user_email: Optional[str] = None
 
+class AgentUsage(BaseModel):
+    agent: str
+    model: Optional[str] = None
+    requests: int
+    input_tokens: int
+    cached_tokens: int  # part of input_tokens
+    output_tokens: int
+    cost_usd: Optional[float] = None  # None when the model has no price
+    llm_seconds: float
+
+class UsageInfo(BaseModel):
+    requests: int
+    input_tokens: int
+    cached_tokens: int
+    output_tokens: int
+    total_tokens: int
+    cost_usd: Optional[float] = None
+    agents: List[AgentUsage] = []
+    session: Optional[Dict[str, Any]] = None  # running totals for the chat session
+
 class ChatResponse(BaseModel):
     response: str
     agent: str
     session_id: str
+    usage: Optional[UsageInfo] = None  # absent for template replies (no model call)
+    stopped: Optional[str] = None  # budget limit that cut the run short: turns, seconds or tokens
 
 class PlanRequest(BaseModel):
     message: str
@@ -118,6 +346,122 @@ class AgentResponse(BaseModel):
     success: bool
     result: str
     agent_used: str
+    usage: Optional[UsageInfo] = None  # absent when served from the response cache
+    stopped: Optional[str] = None  # budget limit that cut the run short (result is a progress summary)
+
+class BatchPlanRequest(BaseModel):
+    requests: List[PlanRequest]
+    parallelism: Optional[int] = Field(None, ge=1)  # capped at BATCH_MAX_PARALLELISM
+
+
+# ============================================================================
+# RESPONSE CACHE — optional, for the idempotent /api/agent/* endpoints
+# ============================================================================
+
+# None unless RESPONSE_CACHE_ENABLED is set
+_response_cache = ResponseCache.from_env()
+
+def agent_response_cache(endpoint: str):
+    """Dependency factory: look the request up before an LLM slot is taken.
+    
+    Send `X-Cache-Bypass: 1` or `Cache-Control: no-cache` to skip the lookup;
+    the fresh result still refreshes the cache.
+    """
+    async def lookup(request: Request):
+        request.state.cache_key = None
+        request.state.cached_response = None
+        if _response_cache is None:
+            return
+        try:
+            body = PlanRequest(**await request.json())
+        except Exception:
+            return  # let the endpoint's own validation report it
+        key = _response_cache.make_key(endpoint, body.message, body.context)
+        if key is None:
+            return
+        request.state.cache_key = key
+        bypass = (
+            request.headers.get("X-Cache-Bypass", "").lower() in ("1", "true")
+            or "no-cache" in request.headers.get("Cache-Control", "").lower()
+        )
+        request.state.cache_status = "BYPASS" if bypass else "MISS"
+        if not bypass:
+            request.state.cached_response = _response_cache.get(endpoint, key)
+    return lookup
+
+
+def _cached_response(http_request: Request, response: Response) -> Optional["AgentResponse"]:
+    """Return the cached AgentResponse found by agent_response_cache, if any."""
+    cached = getattr(http_request.state, "cached_response", None)
+    if cached is not None:
+        response.headers["X-Cache"] = "HIT"
+        return cached
+    if getattr(http_request.state, "cache_key", None):
+        response.headers["X-Cache"] = http_request.state.cache_status
+    return None
+
+
+def _store_response(endpoint: str, http_request: Request, agent_response: "AgentResponse"):
+    key = getattr(http_request.state, "cache_key", None)
+    # A run cut short by its budget is not the answer to cache
+    if _response_cache is not None and key and agent_response.stopped is None:
+        # A cache hit costs nothing; don't replay the original run's usage
+        _response_cache.put(endpoint, key, agent_response.model_copy(update={"usage": None}))
+
+
+# ============================================================================
+# WARM-UP — initialize lazily created dependencies at startup (see /ready)
+# ============================================================================
+
+_warmup = Warmup.from_env()
+
+def _warm_database() -> Optional[str]:
+    from database import POSTGRES_AVAILABLE, get_database
+    if not POSTGRES_AVAILABLE:
+        return "psycopg2 not installed; using sample vendor data"
+    if get_database().get_connection() is None:
+        raise RuntimeError("connection failed; using sample vendor data")
+    return None
+
+def _warm_sessions() -> str:
+    backend = getattr(_session_store, "backend", None)
+    if backend is not None:
+        backend.load("__warmup__")  # opens the connection / creates the table
+    return type(backend or _session_store).__name__
+
+def _warm_vendor_handlers():
+    from tools.scheduler_tools import _get_optimizer
+    from tools.vendor_tools import _get_handlers
+    _get_handlers()
+    _get_optimizer()
+
+async def _warm_llm_client() -> Optional[str]:
+    if os.getenv("WARMUP_LLM", "true").lower() not in ("1", "true", "yes"):
+        return "skipped (WARMUP_LLM=false)"
+    if LLM_MODE == "replay":
+        return "skipped (LLM_MODE=replay)"
+    # Opens the pooled HTTPS connection the first chat turn would otherwise pay for
+    await external_client.models.list()
+    return None
+
+def _warm_agents() -> str:
+    """Walk the handoff graph so a broken agent definition fails readiness, not a user turn"""
+    agents = {}
+    pending = [triage_agent, *follow_up_agents.values()]
+    while pending:
+        agent = pending.pop()
+        if id(agent) in agents:
+            continue
+        agents[id(agent)] = agent
+        pending.extend(h for h in agent.handoffs if hasattr(h, "handoffs"))
+    tools = sum(len(agent.tools) for agent in agents.values())
+    return f"{len(agents)} agents, {tools} tools"
+
+_warmup.add("database", _warm_database, required=False)
+_warmup.add("sessions", _warm_sessions)
+_warmup.add("vendor_handlers", _warm_vendor_handlers)
+_warmup.add("llm_client", _warm_llm_client, required=False)
+_warmup.add("agents", _warm_agents)
 
 
 # ============================================================================
@@ -131,57 +475,96 @@ def health_check():
         "status": "healthy",
         "service": "Agentic Event Orchestrator",
         "version": "3.0.0",
+        "sessions": _session_store.stats(),
+        "chat_turns": _chat_flights.stats(),
+        "admission": _admission.snapshot(),
+        "run_budgets": _budgets.snapshot(),
+        "response_cache": _response_cache.snapshot() if _response_cache else None,
+        "llm_cache": llm_cache.snapshot() if llm_cache else None,
+        "llm_mode": LLM_MODE,
+        "models": llm_models.snapshot(),
+        "llm_http": llm_transport.snapshot(),
     }
 
 
-@app.post("/api/chat", dependencies=[Depends(verify_api_key)])
-def chat(request: ChatRequest) -> ChatResponse:
+@app.get("/ready")
+def readiness_check():
+    """Readiness probe: 200 once warm-up finished and required dependencies are up, else 503.
+    
+    Unlike /health (liveness), this reports each dependency's status and
+    warm-up time.
+    """
+    snapshot = _warmup.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+
+@app.get("/metrics", dependencies=[Depends(verify_api_key)])
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of request, agent, tool and token metrics."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+async def _run_chat(request: ChatRequest, session_id: str, api_key: Optional[str]) -> ChatResponse:
+    """Run one chat turn and record it in the session.
+    
+    The turn starts at the triage agent, or directly at a specialist when
+    the keyword pre-router is confident or the session's previous turn
+    ended there (see agents/routing.py).
+    """
+    full_input = await build_chat_input(request, session_id)
+    route = _chat_router.select(_session_store.get_state(session_id), request.message)
+    budget = _budgets.budget_for("/api/chat")
+    
+    with observe_run(route.agent.name, budget) as run:
+        result = await run_within_budget(budget, run_agent(route.agent, full_input))
+    
+    # A budget-stopped run answers with its progress summary, kept in the session like any reply
+    response_text = result.final_output
+    agent_name = result.last_agent.name if hasattr(result, 'last_agent') and result.last_agent else "AI Assistant"
+    
+    # Save to session  
+    record_chat_turn(session_id, request.message, response_text, route, result.last_agent, run)
+    
+    return ChatResponse(
+        response=response_text,
+        agent=agent_name,
+        session_id=session_id,
+        usage=record_usage(run, api_key, session_id),
+        stopped=stop_reason(result),
+    )
+
+
+@app.post("/api/chat", dependencies=[Depends(verify_api_key), Depends(chat_quick_reply), Depends(llm_admission)])
+async def chat(request: ChatRequest, http_request: Request) -> ChatResponse:
     """Main chat endpoint — the primary way users interact with the system.
     
-    Routes through the TriageAgent which delegates to specialized agents.
+    Routes through the TriageAgent which delegates to specialized agents;
+    clear-cut requests and follow-up turns go straight to a specialist, and
+    greetings are answered from a template without any model call.
     Maintains conversation context across messages via session_id.
     """
     try:
         # Generate or use existing session ID
         session_id = request.session_id or str(uuid.uuid4())
         
-        # Build conversation context
-        history = get_session(session_id)
+        reply = http_request.state.quick_reply
+        if reply is not None:
+            await record_quick_reply(session_id, request.message, reply)
+            return ChatResponse(response=reply.text, agent=triage_agent.name, session_id=session_id)
         
-        # Construct input with context
-        context_parts = []
-        
-        if request.user_email:
-            context_parts.append(f"[User email: {request.user_email}]")
-        
-        # Include recent conversation history for context
-        if history:
-            recent = history[-6:]  # Last 3 exchanges  
-            history_text = "\n".join([
-                f"{'User' if m['role'] == 'user' else 'Assistant'}: {m['content'][:200]}"
-                for m in recent
-            ])
-            context_parts.append(f"[Previous conversation:\n{history_text}]")
-        
-        context_prefix = "\n".join(context_parts)
-        full_input = f"{context_prefix}\n\nUser: {request.message}" if context_parts else request.message
-        
-        # Run through triage agent
-        result = Runner.run_sync(triage_agent, full_input)
-        
-        response_text = result.final_output
-        agent_name = result.last_agent.name if hasattr(result, 'last_agent') and result.last_agent else "AI Assistant"
-        
-        # Save to session  
-        add_to_session(session_id, "user", request.message)
-        add_to_session(session_id, "assistant", response_text)
-        
-        return ChatResponse(
-            response=response_text,
-            agent=agent_name,
-            session_id=session_id,
+        # One run per session at a time; a retried/double-submitted message
+        # shares the run already in progress instead of starting another
+        flight_key = (request.message.strip(), request.user_email)
+        return await _deadlines.run(
+            "/api/chat", http_request,
+            lambda: _chat_flights.run(
+                session_id, flight_key,
+                lambda: _run_chat(request, session_id, http_request.headers.get("X-API-Key")),
+            ),
         )
         
+    except RequestCancelled:
+        raise
     except Exception as e:
         logger.error("Chat endpoint error", exc_info=True)
         return ChatResponse(
@@ -191,41 +574,180 @@ def chat(request: ChatRequest) -> ChatResponse:
         )
 
 
-@app.post("/api/agent/orchestrate", dependencies=[Depends(verify_api_key)])
-def orchestrate_event(request: PlanRequest) -> AgentResponse:
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/chat/stream", dependencies=[Depends(verify_api_key), Depends(chat_quick_reply), Depends(llm_admission)])
+async def chat_stream(request: ChatRequest, http_request: Request) -> StreamingResponse:
+    """Streaming variant of /api/chat using server-sent events.
+    
+    Emits, in order: `start` (session id, sent before any model call so the
+    first byte goes out immediately), then any number of `token`, `handoff`,
+    `tool_start` and `tool_end` events, and finally `done` with the full
+    response and its token usage (a progress summary, with `stopped` set,
+    when the run hit its budget) — or `error` if the run fails. The exchange is saved to the
+    session once the run completes.
+    """
+    session_id = request.session_id or str(uuid.uuid4())
+    reply = http_request.state.quick_reply
+    deadline_seconds = _deadlines.seconds_for("/api/chat/stream")
+    
+    async def event_stream():
+        yield _sse("start", {"session_id": session_id})
+        if reply is not None:
+            await record_quick_reply(session_id, request.message, reply)
+            yield _sse("done", {"response": reply.text, "agent": triage_agent.name, "session_id": session_id})
+            return
+        result = None
+        finished = False
+        with cancellable() as scope:
+            def expire():
+                # Deadline: stop the run; the event loop below then ends and reports it
+                scope.cancel("deadline")
+                if result is not None and not result.is_complete:
+                    result.cancel()
+        
+            timer = asyncio.get_running_loop().call_later(deadline_seconds, expire) if deadline_seconds else None
+            try:
+                # Wait for this session's earlier turns so history stays in order
+                async with _chat_flights.serialized(session_id):
+                    if scope.reason is not None:
+                        raise RequestCancelled("/api/chat/stream", scope.reason, deadline_seconds)
+                    full_input = await build_chat_input(request, session_id)
+                    route = _chat_router.select(_session_store.get_state(session_id), request.message)
+                    budget = _budgets.budget_for("/api/chat/stream")
+                    with observe_run(route.agent.name, budget) as run:
+                        result = run_agent_streamed(route.agent, full_input)
+                        tool_names: Dict[str, str] = {}
+                        stopped = None
+            
+                        try:
+                            async for event in result.stream_events():
+                                if event.type == "raw_response_event":
+                                    if event.data.type == "response.output_text.delta" and event.data.delta:
+                                        yield _sse("token", {"delta": event.data.delta})
+                                elif event.type == "run_item_stream_event":
+                                    if event.name == "tool_called":
+                                        call_id = getattr(event.item.raw_item, "call_id", None)
+                                        tool_name = getattr(event.item.raw_item, "name", "tool")
+                                        if call_id:
+                                            tool_names[call_id] = tool_name
+                                        yield _sse("tool_start", {"tool": tool_name, "agent": event.item.agent.name})
+                                    elif event.name == "tool_output":
+                                        raw = event.item.raw_item
+                                        call_id = raw.get("call_id") if isinstance(raw, dict) else getattr(raw, "call_id", None)
+                                        yield _sse("tool_end", {"tool": tool_names.get(call_id, "tool"), "agent": event.item.agent.name})
+                                    elif event.name == "handoff_occured":
+                                        target = event.item.target_agent.name
+                                        yield _sse("handoff", {
+                                            "from": event.item.source_agent.name,
+                                            "to": target,
+                                            "message": f"routed to {target}",
+                                        })
+                        except (MaxTurnsExceeded, RunBudgetExceeded) as e:
+                            # Over budget: answer with what the run got done
+                            stopped = stopped_run(budget, e)
+            
+                        if scope.reason is not None:
+                            raise RequestCancelled("/api/chat/stream", scope.reason, deadline_seconds)
+                        response_text = stopped.final_output if stopped else str(result.final_output)
+                        last_agent = stopped.last_agent if stopped else result.last_agent
+                        agent_name = last_agent.name if last_agent else "AI Assistant"
+            
+                        record_chat_turn(session_id, request.message, response_text, route, last_agent, run)
+                        usage = record_usage(run, http_request.headers.get("X-API-Key"), session_id)
+            
+                        finished = True
+                        yield _sse("done", {
+                            "response": response_text, "agent": agent_name, "session_id": session_id,
+                            "usage": usage.model_dump(), "stopped": stop_reason(stopped),
+                        })
+            except RequestCancelled:
+                finished = True
+                record_cancellation("/api/chat/stream", "deadline")
+                yield _sse("error", {
+                    "response": "The assistant took too long to respond. Please try again.",
+                    "agent": "System",
+                    "session_id": session_id,
+                })
+            except Exception:
+                finished = True
+                logger.error("Chat stream error", exc_info=True)
+                yield _sse("error", {
+                    "response": "I apologize, I encountered an issue processing your request. Please try again.",
+                    "agent": "System",
+                    "session_id": session_id,
+                })
+            finally:
+                if timer is not None:
+                    timer.cancel()
+                # Client went away mid-stream: stop the run instead of finishing it unread
+                if not finished:
+                    scope.cancel("client_disconnect")
+                    record_cancellation("/api/chat/stream", "client_disconnect")
+                    if result is not None and not result.is_complete:
+                        result.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/agent/orchestrate", dependencies=[Depends(verify_api_key), Depends(llm_admission)])
+async def orchestrate_event(request: PlanRequest, http_request: Request) -> AgentResponse:
     """Main orchestration endpoint using OpenAI Agent SDK."""
     try:
-        result = run_orchestration(request.message)
-        
-        return AgentResponse(
-            success=True,
-            result=result.final_output,
-            agent_used=result.last_agent.name
+        result, run = await _deadlines.run(
+            "/api/agent/orchestrate", http_request,
+            lambda: run_observed(orchestrator_agent.name, "/api/agent/orchestrate", lambda: run_orchestration_async(request.message)),
         )
+        
+        return build_agent_response(result, run, http_request.headers.get("X-API-Key"))
+    except RequestCancelled:
+        raise
     except Exception as e:
         logger.error("Orchestration endpoint error", exc_info=True)
         raise HTTPException(status_code=500, detail="An internal error occurred while processing your request.")
 
 
-@app.post("/api/agent/discover", dependencies=[Depends(verify_api_key)])
-def discover_vendors(request: PlanRequest) -> AgentResponse:
+@app.post(
+    "/api/agent/discover",
+    dependencies=[Depends(verify_api_key), Depends(agent_response_cache("discover")), Depends(llm_admission)],
+)
+async def discover_vendors(request: PlanRequest, http_request: Request, response: Response) -> AgentResponse:
     """Vendor discovery using specialized agent."""
+    cached = _cached_response(http_request, response)
+    if cached is not None:
+        return cached
     try:
-        result = run_vendor_discovery(request.message)
-        
-        return AgentResponse(
-            success=True,
-            result=result.final_output,
-            agent_used=result.last_agent.name
+        result, run = await _deadlines.run(
+            "/api/agent/discover", http_request,
+            lambda: run_observed(vendor_discovery_agent.name, "/api/agent/discover", lambda: run_vendor_discovery_async(request.message)),
         )
+        
+        agent_response = build_agent_response(result, run, http_request.headers.get("X-API-Key"))
+        _store_response("discover", http_request, agent_response)
+        return agent_response
+    except RequestCancelled:
+        raise
     except Exception as e:
         logger.error("Vendor discovery endpoint error", exc_info=True)
         raise HTTPException(status_code=500, detail="An internal error occurred while processing your request.")
 
 
-@app.post("/api/agent/schedule", dependencies=[Depends(verify_api_key)])
-def create_schedule(request: PlanRequest) -> AgentResponse:
+@app.post(
+    "/api/agent/schedule",
+    dependencies=[Depends(verify_api_key), Depends(agent_response_cache("schedule")), Depends(llm_admission)],
+)
+async def create_schedule(request: PlanRequest, http_request: Request, response: Response) -> AgentResponse:
     """Schedule optimization using scheduler agent."""
+    cached = _cached_response(http_request, response)
+    if cached is not None:
+        return cached
     try:
         # Parse context or use message to extract event details
         event_details = request.context or {}
@@ -237,33 +759,137 @@ def create_schedule(request: PlanRequest) -> AgentResponse:
                 "preferences": [],
             }
         
-        result = run_scheduler(event_details)
-        
-        return AgentResponse(
-            success=True,
-            result=result.final_output,
-            agent_used=result.last_agent.name
+        result, run = await _deadlines.run(
+            "/api/agent/schedule", http_request,
+            lambda: run_observed(scheduler_agent.name, "/api/agent/schedule", lambda: run_scheduler_async(event_details)),
         )
+        
+        agent_response = build_agent_response(result, run, http_request.headers.get("X-API-Key"))
+        _store_response("schedule", http_request, agent_response)
+        return agent_response
+    except RequestCancelled:
+        raise
     except Exception as e:
         logger.error("Schedule endpoint error", exc_info=True)
         raise HTTPException(status_code=500, detail="An internal error occurred while processing your request.")
 
 
-@app.post("/api/agent/plan", dependencies=[Depends(verify_api_key)])
-def plan_event(request: PlanRequest) -> AgentResponse:
+@app.post(
+    "/api/agent/plan",
+    dependencies=[Depends(verify_api_key), Depends(agent_response_cache("plan")), Depends(llm_admission)],
+)
+async def plan_event(request: PlanRequest, http_request: Request, response: Response) -> AgentResponse:
     """Plan endpoint (legacy compatibility for backend proxy)."""
+    cached = _cached_response(http_request, response)
+    if cached is not None:
+        return cached
     try:
-        result = run_triage(request.message)
-        
-        return AgentResponse(
-            success=True,
-            result=result.final_output,
-            agent_used=result.last_agent.name
+        result, run = await _deadlines.run(
+            "/api/agent/plan", http_request,
+            lambda: run_observed(triage_agent.name, "/api/agent/plan", lambda: run_triage_async(request.message)),
         )
+        
+        agent_response = build_agent_response(result, run, http_request.headers.get("X-API-Key"))
+        _store_response("plan", http_request, agent_response)
+        return agent_response
+    except RequestCancelled:
+        raise
     except Exception as e:
         logger.error("Plan endpoint error", exc_info=True)
         raise HTTPException(status_code=500, detail="An internal error occurred while processing your request.")
 
 
+# ============================================================================
+# BATCH — many plan requests in one call, run with bounded parallelism
+# ============================================================================
+
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "100"))
+BATCH_MAX_PARALLELISM = int(os.getenv("BATCH_MAX_PARALLELISM", "8"))
+
+
+async def _plan_item(item: PlanRequest, api_key: str) -> Dict[str, Any]:
+    """Run one batch item like /api/agent/plan, sharing its response cache."""
+    key = _response_cache.make_key("plan", item.message, item.context) if _response_cache else None
+    cached = _response_cache.get("plan", key) if key else None
+    if cached is not None:
+        return {"response": cached, "cache": "HIT"}
+    
+    # Each item takes its own LLM slot, so a batch competes fairly with chat traffic
+    async with _admission.admit(api_key):
+        # Deadline per item; a closed stream cancels the items themselves (run_bounded)
+        result, run = await _deadlines.run(
+            "/api/agent/batch", None,
+            lambda: run_observed(triage_agent.name, "/api/agent/batch", lambda: run_triage_async(item.message)),
+        )
+    
+    agent_response = build_agent_response(result, run, api_key)
+    if key and agent_response.stopped is None:
+        _response_cache.put("plan", key, agent_response.model_copy(update={"usage": None}))
+    return {"response": agent_response, "cache": "MISS" if key else None}
+
+
+@app.post("/api/agent/batch", dependencies=[Depends(verify_api_key)])
+async def plan_batch(request: BatchPlanRequest, http_request: Request) -> StreamingResponse:
+    """Run a list of plan requests concurrently, streaming results as they finish.
+    
+    Server-sent events: `start` (item count and effective parallelism), one
+    `result` per item in completion order — carrying its `index` in the
+    submitted list, `status` (ok / rejected / timeout / error), timings and, when ok,
+    the same payload /api/agent/plan returns — then `done` with totals.
+    """
+    if not request.requests:
+        raise HTTPException(status_code=400, detail="Batch contains no requests")
+    if len(request.requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_ITEMS} requests")
+    
+    parallelism = min(request.parallelism or BATCH_MAX_PARALLELISM, BATCH_MAX_PARALLELISM)
+    api_key = http_request.headers.get("X-API-Key") or "anonymous"
+    
+    async def event_stream():
+        started = time.perf_counter()
+        counts = {"ok": 0, "rejected": 0, "timeout": 0, "error": 0}
+        yield _sse("start", {"count": len(request.requests), "parallelism": parallelism})
+        
+        outcomes = run_bounded(request.requests, lambda item: _plan_item(item, api_key), parallelism)
+        try:
+            async for outcome in outcomes:
+                item = {
+                    "index": outcome.index,
+                    "queued_ms": round(outcome.queued_ms, 1),
+                    "run_ms": round(outcome.run_ms, 1),
+                    "total_ms": round(outcome.total_ms, 1),
+                }
+                if outcome.ok:
+                    item.update(status="ok", cache=outcome.value["cache"], **outcome.value["response"].model_dump())
+                elif isinstance(outcome.error, AdmissionRejected):
+                    item.update(status="rejected", retry_after=outcome.error.retry_after,
+                                error="The assistant is busy right now. Please retry shortly.")
+                elif isinstance(outcome.error, RequestCancelled):
+                    item.update(status="timeout", error="The assistant took too long to respond to this request.")
+                else:
+                    logger.error("Batch item %d failed", outcome.index, exc_info=outcome.error)
+                    item.update(status="error", error="An internal error occurred while processing this request.")
+                counts[item["status"]] += 1
+                yield _sse("result", item)
+        finally:
+            # Client went away: cancel the items that have not finished
+            await outcomes.aclose()
+        
+        yield _sse("done", {
+            "count": len(request.requests),
+            "succeeded": counts["ok"],
+            "rejected": counts["rejected"],
+            "timed_out": counts["timeout"],
+            "failed": counts["error"],
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
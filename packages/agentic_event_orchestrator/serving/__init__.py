@@ -0,0 +1,30 @@
+"""
+Request-serving infrastructure for the FastAPI server: admission control,
+response caching, batching and other layers that sit between HTTP and the agent runs.
+"""
+
+from .admission import AdmissionController, AdmissionRejected
+from .batch import BatchOutcome, run_bounded
+from .budgets import RunBudget, RunBudgetExceeded, RunBudgets, StoppedRun, run_within_budget, stopped_run
+from .deadlines import RequestCancelled, RequestDeadlines, record_cancellation
+from .response_cache import ResponseCache
+from .warmup import Warmup, WarmupStep
+
+__all__ = [
+    "AdmissionController",
+    "AdmissionRejected",
+    "BatchOutcome",
+    "RequestCancelled",
+    "RequestDeadlines",
+    "ResponseCache",
+    "RunBudget",
+    "RunBudgetExceeded",
+    "RunBudgets",
+    "StoppedRun",
+    "Warmup",
+    "WarmupStep",
+    "record_cancellation",
+    "run_bounded",
+    "run_within_budget",
+    "stopped_run",
+]
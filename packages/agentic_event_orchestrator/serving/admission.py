@@ -0,0 +1,185 @@
+"""
+Admission control for LLM-bound endpoints.
+
+Every request that will call the model provider must take a slot from a
+global limit and from its API key's limit. Requests that cannot get a slot
+wait in a bounded queue; once the queue is full, or a request has waited
+longer than the queue timeout, it is rejected straight away so the server
+can answer 429 with a Retry-After instead of piling up upstream calls.
+Queued and rejected requests and time spent queued are exported as
+eventai_admission_* metrics.
+"""
+
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict
+
+from observability import REGISTRY
+
+ADMISSION_QUEUED = REGISTRY.counter(
+    "eventai_admission_queued_total", "LLM-bound requests that had to wait in the admission queue",
+)
+ADMISSION_REJECTED = REGISTRY.counter(
+    "eventai_admission_rejected_total", "LLM-bound requests refused a slot, by reason (queue_full or timeout)",
+    ["reason"],
+)
+ADMISSION_QUEUE_TIME = REGISTRY.histogram(
+    "eventai_admission_queue_seconds", "Time queued requests waited for an admission slot",
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is refused a slot"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class _KeyGate:
+    semaphore: asyncio.Semaphore
+    users: int = 0
+
+
+@dataclass
+class AdmissionStats:
+    """Counters and queue-time accounting"""
+    admitted: int = 0
+    queued: int = 0
+    rejected: Dict[str, int] = field(default_factory=lambda: {"queue_full": 0, "timeout": 0})
+    queue_seconds_total: float = 0.0
+    queue_seconds_max: float = 0.0
+
+
+class AdmissionController:
+    """Global + per-key concurrency limits with a bounded wait queue"""
+
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        per_key_concurrent: int = 16,
+        max_queue: int = 64,
+        queue_timeout: float = 10.0,
+    ):
+        self.max_concurrent = max_concurrent
+        self.per_key_concurrent = per_key_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._global = asyncio.Semaphore(max_concurrent)
+        self._keys: Dict[str, _KeyGate] = {}
+        self._in_flight = 0
+        self._waiting = 0
+        # Smoothed slot hold time, used to estimate Retry-After
+        self._hold_seconds = 1.0
+
+        self.stats = AdmissionStats()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Build from LLM_MAX_CONCURRENCY / LLM_PER_KEY_CONCURRENCY / LLM_MAX_QUEUE / LLM_QUEUE_TIMEOUT"""
+        return cls(
+            max_concurrent=int(os.getenv("LLM_MAX_CONCURRENCY", "32")),
+            per_key_concurrent=int(os.getenv("LLM_PER_KEY_CONCURRENCY", "16")),
+            max_queue=int(os.getenv("LLM_MAX_QUEUE", "64")),
+            queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT", "10")),
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    def retry_after(self) -> int:
+        """Seconds until a queued request would likely get a slot"""
+        backlog = self._waiting + 1
+        return max(1, math.ceil(self._hold_seconds * backlog / self.max_concurrent))
+
+    @asynccontextmanager
+    async def admit(self, key: str = "anonymous"):
+        """Hold a global and a per-key slot for the duration of the block"""
+        gate = self._keys.get(key)
+        if gate is None:
+            gate = self._keys[key] = _KeyGate(asyncio.Semaphore(self.per_key_concurrent))
+        gate.users += 1
+        try:
+            await self._acquire(gate)
+            started = time.monotonic()
+            self._in_flight += 1
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+                self._global.release()
+                gate.semaphore.release()
+                held = time.monotonic() - started
+                self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * held
+        finally:
+            gate.users -= 1
+            if gate.users == 0:
+                self._keys.pop(key, None)
+
+    async def _acquire(self, gate: _KeyGate):
+        # Fast path: free slots and nobody ahead of us
+        if not self._waiting and not gate.semaphore.locked() and not self._global.locked():
+            await gate.semaphore.acquire()
+            await self._global.acquire()
+            self.stats.admitted += 1
+            return
+
+        if self._waiting >= self.max_queue:
+            self.stats.rejected["queue_full"] += 1
+            ADMISSION_REJECTED.inc(reason="queue_full")
+            raise AdmissionRejected("queue_full", self.retry_after())
+
+        self._waiting += 1
+        self.stats.queued += 1
+        ADMISSION_QUEUED.inc()
+        enqueued = time.monotonic()
+        key_acquired = False
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await gate.semaphore.acquire()
+                key_acquired = True
+                await self._global.acquire()
+        except TimeoutError:
+            if key_acquired:
+                gate.semaphore.release()
+            self.stats.rejected["timeout"] += 1
+            ADMISSION_REJECTED.inc(reason="timeout")
+            raise AdmissionRejected("timeout", self.retry_after())
+        except BaseException:
+            if key_acquired:
+                gate.semaphore.release()
+            raise
+        finally:
+            self._waiting -= 1
+            waited = time.monotonic() - enqueued
+            self.stats.queue_seconds_total += waited
+            self.stats.queue_seconds_max = max(self.stats.queue_seconds_max, waited)
+            ADMISSION_QUEUE_TIME.observe(waited)
+
+        self.stats.admitted += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        """Current state and counters for monitoring"""
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self.stats.admitted,
+            "queued": self.stats.queued,
+            "rejected": dict(self.stats.rejected),
+            "queue_seconds_total": round(self.stats.queue_seconds_total, 6),
+            "queue_seconds_max": round(self.stats.queue_seconds_max, 6),
+        }
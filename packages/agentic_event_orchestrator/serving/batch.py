@@ -0,0 +1,59 @@
+"""
+Bounded-parallel execution of a batch of independent requests.
+
+run_bounded() starts every item but lets at most `parallelism` of them run
+at once, and yields each item's outcome as soon as it finishes (completion
+order, not submission order). A failing item is reported, not raised, so
+one bad request never sinks the rest of the batch. Closing the iterator
+early (e.g. the client disconnected) cancels whatever is still pending.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class BatchOutcome:
+    """Result and timings of one batch item"""
+    index: int
+    ok: bool
+    value: Any = None
+    error: Optional[BaseException] = None
+    queued_ms: float = 0.0  # waiting for a parallelism slot
+    run_ms: float = 0.0
+
+    @property
+    def total_ms(self) -> float:
+        return self.queued_ms + self.run_ms
+
+
+async def run_bounded(items: Sequence[T], fn: Callable[[T], Awaitable[Any]],
+                      parallelism: int) -> AsyncIterator[BatchOutcome]:
+    """Run `fn` over `items` with at most `parallelism` in flight, yielding as each completes"""
+    gate = asyncio.Semaphore(max(1, parallelism))
+    submitted = time.perf_counter()
+
+    async def run_one(index: int, item: T) -> BatchOutcome:
+        async with gate:
+            started = time.perf_counter()
+            outcome = BatchOutcome(index=index, ok=True, queued_ms=(started - submitted) * 1000)
+            try:
+                outcome.value = await fn(item)
+            except Exception as e:
+                outcome.ok = False
+                outcome.error = e
+            outcome.run_ms = (time.perf_counter() - started) * 1000
+            return outcome
+
+    tasks = [asyncio.ensure_future(run_one(i, item)) for i, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,193 @@
+"""
+Per-run turn, time and token budgets for agent work.
+
+A RunBudget caps one Runner run: model turns (the SDK's max_turns, passed
+by run_agent), wall time since the run started and tokens (input + output)
+across every agent in the run. Time and tokens are checked by the run
+hooks before each model call, so a run over budget stops between calls
+instead of being cut off mid-call (the request deadline, deadlines.py,
+stays the hard limit).
+
+A stopped run is not an error for the caller: run_within_budget() turns
+the stop into a StoppedRun whose final_output is a partial-progress
+summary — the agents consulted, the tools that returned and the latest
+draft answer — built from what the run produced, without another model
+call. Stops are counted by endpoint, limit and the agent that was running.
+
+Budgets come from RUN_MAX_TURNS / RUN_MAX_SECONDS / RUN_MAX_TOKENS (the
+default for every endpoint) and RUN_BUDGETS ("/api/agent/orchestrate=
+16/150/300000,/api/chat=8//" — turns/seconds/tokens, an empty field keeps
+the default); 0 disables a limit.
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Dict, List, Optional
+
+from _agents_sdk import AgentsException, ItemHelpers, MaxTurnsExceeded
+from observability import REGISTRY
+
+logger = logging.getLogger("serving.budgets")
+
+BUDGET_STOPS = REGISTRY.counter(
+    "eventai_run_budget_stops_total",
+    "Runs stopped by their budget, by endpoint, limit (turns, seconds, tokens) and the agent running at the time",
+    ["endpoint", "limit", "agent"],
+)
+
+MAX_DRAFT_CHARS = 600
+
+# Passed as the SDK's max_turns when the turn limit is off; leaving it out
+# would fall back to the SDK's own default of 10
+UNLIMITED_TURNS = 1_000_000
+
+
+class RunBudgetExceeded(AgentsException):
+    """Raised by the run hooks when a run goes over its time or token budget.
+
+    An AgentsException, so the SDK attaches the run's progress (run_data).
+    """
+
+    def __init__(self, limit: str, used: float, maximum: float):
+        super().__init__(f"Run budget exceeded: {limit} used {used:g} of {maximum:g}")
+        self.limit = limit
+        self.used = used
+        self.maximum = maximum
+
+
+@dataclass(frozen=True)
+class RunBudget:
+    """Limits for one run; 0 means no limit"""
+    endpoint: str = ""
+    max_turns: int = 10
+    max_seconds: float = 0.0
+    max_tokens: int = 0
+
+    @property
+    def sdk_max_turns(self) -> int:
+        """max_turns for the Runner (0 disables the limit)"""
+        return self.max_turns or UNLIMITED_TURNS
+
+    def check(self, record: Any):
+        """Raise RunBudgetExceeded if the run (a RunRecord) is over its time or token budget"""
+        if self.max_seconds:
+            elapsed = time.perf_counter() - record.started
+            if elapsed >= self.max_seconds:
+                raise RunBudgetExceeded("seconds", round(elapsed, 1), self.max_seconds)
+        if self.max_tokens:
+            tokens = sum(stats["input_tokens"] + stats["output_tokens"] for stats in record.agents.values())
+            if tokens >= self.max_tokens:
+                raise RunBudgetExceeded("tokens", tokens, self.max_tokens)
+
+    def describe(self, limit: str) -> str:
+        if limit == "turns":
+            return f"{self.max_turns} model turns"
+        if limit == "seconds":
+            return f"{self.max_seconds:g} seconds"
+        return f"{self.max_tokens:,} tokens"
+
+
+class RunBudgets:
+    """Budget lookup per endpoint"""
+
+    def __init__(self, default: RunBudget = None, per_endpoint: Dict[str, RunBudget] = None):
+        self.default = default or RunBudget()
+        self.per_endpoint = dict(per_endpoint or {})
+
+    @classmethod
+    def from_env(cls) -> "RunBudgets":
+        """Build from RUN_MAX_TURNS / RUN_MAX_SECONDS / RUN_MAX_TOKENS / RUN_BUDGETS"""
+        default = RunBudget(
+            max_turns=int(os.getenv("RUN_MAX_TURNS", "10")),
+            max_seconds=float(os.getenv("RUN_MAX_SECONDS", "90")),
+            max_tokens=int(os.getenv("RUN_MAX_TOKENS", "200000")),
+        )
+        per_endpoint = {}
+        for entry in os.getenv("RUN_BUDGETS", "").split(","):
+            if "=" in entry:
+                path, values = entry.rsplit("=", 1)
+                fields = (values.split("/") + ["", "", ""])[:3]
+                turns, seconds, tokens = (field.strip() for field in fields)
+                per_endpoint[path.strip()] = replace(
+                    default,
+                    max_turns=int(turns) if turns else default.max_turns,
+                    max_seconds=float(seconds) if seconds else default.max_seconds,
+                    max_tokens=int(tokens) if tokens else default.max_tokens,
+                )
+        return cls(default, per_endpoint)
+
+    def budget_for(self, endpoint: str) -> RunBudget:
+        return replace(self.per_endpoint.get(endpoint, self.default), endpoint=endpoint)
+
+    def snapshot(self) -> Dict[str, Any]:
+        def limits(budget: RunBudget) -> Dict[str, Any]:
+            return {"max_turns": budget.max_turns, "max_seconds": budget.max_seconds, "max_tokens": budget.max_tokens}
+        return {"default": limits(self.default), **{path: limits(b) for path, b in self.per_endpoint.items()}}
+
+
+@dataclass
+class StoppedRun:
+    """Stands in for a RunResult when the run was stopped by its budget"""
+    final_output: str
+    last_agent: Any
+    limit: str
+
+
+def _progress_summary(budget: Optional[RunBudget], limit: str, run_data: Any) -> str:
+    """Partial-progress answer from the items the run produced before it stopped"""
+    agents: List[str] = []
+    tools: Dict[str, int] = {}
+    tool_names: Dict[str, str] = {}
+    draft = ""
+    for item in getattr(run_data, "new_items", None) or []:
+        agent = getattr(getattr(item, "agent", None), "name", None)
+        if agent and agent not in agents:
+            agents.append(agent)
+        raw = getattr(item, "raw_item", None)
+        if item.type == "tool_call_item":
+            tool_names[getattr(raw, "call_id", "")] = getattr(raw, "name", "tool")
+        elif item.type == "tool_call_output_item":
+            call_id = raw.get("call_id") if isinstance(raw, dict) else getattr(raw, "call_id", "")
+            name = tool_names.get(call_id, "tool")
+            tools[name] = tools.get(name, 0) + 1
+        elif item.type == "message_output_item":
+            draft = ItemHelpers.text_message_output(item).strip() or draft
+
+    limit_text = budget.describe(limit) if budget is not None else limit
+    lines = [f"I couldn't finish this request within its limit of {limit_text}. Here is where I got to:"]
+    if agents:
+        lines.append(f"- Worked on by: {', '.join(agents)}")
+    if tools:
+        lines.append("- Completed lookups: " + ", ".join(
+            f"{name} (x{count})" if count > 1 else name for name, count in tools.items()
+        ))
+    if draft:
+        if len(draft) > MAX_DRAFT_CHARS:
+            draft = draft[:MAX_DRAFT_CHARS - 1].rstrip() + "…"
+        lines.append(f"- Latest findings: {draft}")
+    if not agents and not tools and not draft:
+        lines.append("- Nothing was completed yet.")
+    lines.append("Reply \"continue\" to pick up from here, or narrow the request.")
+    return "\n".join(lines)
+
+
+def stopped_run(budget: Optional[RunBudget], exc: AgentsException) -> StoppedRun:
+    """The StoppedRun for a run that raised MaxTurnsExceeded or RunBudgetExceeded"""
+    limit = exc.limit if isinstance(exc, RunBudgetExceeded) else "turns"
+    run_data = exc.run_data
+    last_agent = getattr(run_data, "last_agent", None)
+    agent_name = getattr(last_agent, "name", "unknown")
+    endpoint = budget.endpoint if budget is not None else ""
+    BUDGET_STOPS.inc(endpoint=endpoint or "unknown", limit=limit, agent=agent_name)
+    logger.warning("Run for %s stopped by its %s budget in %s: %s", endpoint or "?", limit, agent_name, exc)
+    return StoppedRun(_progress_summary(budget, limit, run_data), last_agent, limit)
+
+
+async def run_within_budget(budget: Optional[RunBudget], work: Awaitable[Any]) -> Any:
+    """Await a run; a budget stop returns a StoppedRun instead of raising"""
+    try:
+        return await work
+    except (MaxTurnsExceeded, RunBudgetExceeded) as e:
+        return stopped_run(budget, e)
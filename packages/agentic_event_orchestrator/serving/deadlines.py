@@ -0,0 +1,110 @@
+"""
+Per-endpoint deadlines and client-disconnect cancellation for agent work.
+
+RequestDeadlines.run() executes a request's agent work as a task and
+watches it: if the deadline passes, or the HTTP client disconnects while
+the task is still running, the task is cancelled — which stops the Runner
+and its in-flight model and tool calls — and RequestCancelled is raised.
+Each cancellation is counted by endpoint and reason.
+
+Deadlines come from REQUEST_DEADLINE_SECONDS (default for every endpoint)
+and REQUEST_DEADLINES ("/api/chat=60,/api/agent/orchestrate=180");
+0 disables the deadline for an endpoint.
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from observability import REGISTRY, cancellable
+
+T = TypeVar("T")
+
+REQUESTS_CANCELLED = REGISTRY.counter(
+    "eventai_requests_cancelled_total",
+    "Requests whose agent work was cancelled, by reason (client_disconnect or deadline)",
+    ["endpoint", "reason"],
+)
+
+
+class RequestCancelled(Exception):
+    """Raised when a request's work was cancelled before it finished"""
+
+    def __init__(self, endpoint: str, reason: str, seconds: Optional[float] = None):
+        detail = f" after {seconds:g}s" if seconds is not None else ""
+        super().__init__(f"{endpoint} cancelled ({reason}){detail}")
+        self.endpoint = endpoint
+        self.reason = reason
+        self.seconds = seconds
+
+
+def record_cancellation(endpoint: str, reason: str):
+    """Count a cancellation handled outside run() (e.g. a closed stream)"""
+    REQUESTS_CANCELLED.inc(endpoint=endpoint, reason=reason)
+
+
+class RequestDeadlines:
+    """Deadline lookup per endpoint and the cancel-on-deadline/disconnect runner"""
+
+    def __init__(self, default_seconds: float = 120.0, per_endpoint: Dict[str, float] = None,
+                 poll_interval: float = 0.25):
+        self.default_seconds = default_seconds
+        self.per_endpoint = dict(per_endpoint or {})
+        self.poll_interval = poll_interval
+
+    @classmethod
+    def from_env(cls) -> "RequestDeadlines":
+        """Build from REQUEST_DEADLINE_SECONDS / REQUEST_DEADLINES"""
+        per_endpoint = {}
+        for entry in os.getenv("REQUEST_DEADLINES", "").split(","):
+            if "=" in entry:
+                path, seconds = entry.rsplit("=", 1)
+                per_endpoint[path.strip()] = float(seconds)
+        return cls(
+            default_seconds=float(os.getenv("REQUEST_DEADLINE_SECONDS", "120")),
+            per_endpoint=per_endpoint,
+        )
+
+    def seconds_for(self, endpoint: str) -> Optional[float]:
+        """The endpoint's deadline in seconds, or None when disabled"""
+        seconds = self.per_endpoint.get(endpoint, self.default_seconds)
+        return seconds if seconds > 0 else None
+
+    async def run(self, endpoint: str, request: Any, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn()` under the endpoint's deadline, cancelling it if `request` disconnects.
+
+        `request` is the Starlette Request to watch, or None to apply only the deadline.
+        """
+        seconds = self.seconds_for(endpoint)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + seconds if seconds is not None else None
+
+        with cancellable() as scope:
+            task = asyncio.ensure_future(fn())
+        try:
+            while True:
+                timeout = self.poll_interval if request is not None else None
+                if deadline is not None:
+                    remaining = deadline - loop.time()
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+                done, _ = await asyncio.wait({task}, timeout=max(0.0, timeout) if timeout is not None else None)
+                if done:
+                    return task.result()
+                if deadline is not None and loop.time() >= deadline:
+                    reason = "deadline"
+                    break
+                if request is not None and await request.is_disconnected():
+                    reason = "client_disconnect"
+                    break
+        except asyncio.CancelledError:
+            # Our own caller was cancelled (e.g. server shutdown): take the work down too
+            scope.cancel("cancelled")
+            task.cancel()
+            raise
+
+        scope.cancel(reason)
+        task.cancel()
+        # Let the run unwind (spans, metrics, session single-flight) before reporting
+        await asyncio.gather(task, return_exceptions=True)
+        record_cancellation(endpoint, reason)
+        raise RequestCancelled(endpoint, reason, seconds if reason == "deadline" else None)
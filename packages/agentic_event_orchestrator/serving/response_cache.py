@@ -0,0 +1,92 @@
+"""
+Response cache for idempotent agent endpoints.
+
+Keys are a hash of the endpoint plus the normalized PlanRequest (message
+lower-cased with whitespace collapsed, context serialized with sorted
+keys), so the same discovery query from many users is answered once per
+TTL. Each endpoint has its own TTL (0 disables caching for it), and the
+whole cache is bounded by entry count with LRU eviction.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def _normalize_message(message: str) -> str:
+    return " ".join(message.lower().split())
+
+
+class ResponseCache:
+    """Size-bounded LRU of endpoint responses with per-endpoint TTLs"""
+
+    def __init__(self, ttls: Dict[str, float], max_entries: int = 1024):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+
+        self.hits: Dict[str, int] = {endpoint: 0 for endpoint in ttls}
+        self.misses: Dict[str, int] = {endpoint: 0 for endpoint in ttls}
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        """Build from RESPONSE_CACHE_* settings, or None when the cache is disabled"""
+        if os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(
+            ttls={
+                "discover": float(os.getenv("RESPONSE_CACHE_TTL_DISCOVER", "600")),
+                "schedule": float(os.getenv("RESPONSE_CACHE_TTL_SCHEDULE", "1800")),
+                "plan": float(os.getenv("RESPONSE_CACHE_TTL_PLAN", "300")),
+            },
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024")),
+        )
+
+    def make_key(self, endpoint: str, message: str, context: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Cache key for a request, or None if the endpoint is not cached"""
+        if self.ttls.get(endpoint, 0) <= 0:
+            return None
+        payload = json.dumps(
+            {"endpoint": endpoint, "message": _normalize_message(message), "context": context or {}},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, endpoint: str, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.misses[endpoint] = self.misses.get(endpoint, 0) + 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits[endpoint] = self.hits.get(endpoint, 0) + 1
+        return entry[2]
+
+    def put(self, endpoint: str, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttls[endpoint], endpoint, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,154 @@
+"""
+Start-up warm-up and readiness tracking.
+
+Dependencies that are otherwise created on first use (database connection,
+vendor handlers, the LLM client's connection pool, ...) are registered as
+named steps and initialized once when the server starts, concurrently and
+each under a timeout. The outcome of every step, with its timing, backs the
+/ready endpoint: the server is ready once warm-up has finished and every
+required step succeeded. Optional steps (external services the server can
+degrade around) are reported but do not hold readiness back. Required
+steps that failed are retried in the background with exponential backoff,
+so a dependency that comes up late makes the server ready without a
+restart.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("serving.warmup")
+
+
+def _timed(fn: Callable[[], Any]):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+@dataclass
+class WarmupStep:
+    """One dependency to initialize and its outcome"""
+    name: str
+    fn: Callable[[], Any]  # sync or async; may return a short detail string
+    required: bool = True
+    ready: bool = False
+    seconds: Optional[float] = None
+    detail: Optional[str] = None
+
+
+class Warmup:
+    """Runs the registered warm-up steps and reports readiness"""
+
+    def __init__(self, timeout: float = 10.0, retry_base: float = 1.0, retry_max: float = 30.0):
+        self.timeout = timeout
+        self.retry_base = retry_base  # 0 disables retries
+        self.retry_max = retry_max
+        self.steps: Dict[str, WarmupStep] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.retries = 0
+        self._retry_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "Warmup":
+        """Build with WARMUP_TIMEOUT (seconds per step) / WARMUP_RETRY_BASE / WARMUP_RETRY_MAX"""
+        return cls(
+            timeout=float(os.getenv("WARMUP_TIMEOUT", "10")),
+            retry_base=float(os.getenv("WARMUP_RETRY_BASE", "1")),
+            retry_max=float(os.getenv("WARMUP_RETRY_MAX", "30")),
+        )
+
+    def add(self, name: str, fn: Callable[[], Any], required: bool = True):
+        self.steps[name] = WarmupStep(name, fn, required)
+
+    async def run(self):
+        """Run every step concurrently; failures are recorded, never raised.
+
+        Failed required steps keep being retried in the background until
+        they succeed or close() is called.
+        """
+        await self.close()
+        self.started_at = time.perf_counter()
+        await asyncio.gather(*(self._run_step(step) for step in self.steps.values()))
+        self.finished_at = time.perf_counter()
+        logger.info("Warm-up finished in %.2fs: %s", self.finished_at - self.started_at,
+                    ", ".join(f"{s.name}={'ok' if s.ready else 'FAILED'}" for s in self.steps.values()))
+        if not self.ready and self.retry_base > 0:
+            self._retry_task = asyncio.create_task(self._retry_failed())
+
+    async def _retry_failed(self):
+        delay = self.retry_base
+        while True:
+            failed = [s for s in self.steps.values() if s.required and not s.ready]
+            if not failed:
+                logger.info("Required warm-up steps are up after %d retries", self.retries)
+                return
+            await asyncio.sleep(delay)
+            self.retries += 1
+            await asyncio.gather(*(self._run_step(step) for step in failed))
+            delay = min(delay * 2, self.retry_max)
+
+    async def close(self):
+        """Stop retrying failed steps"""
+        task, self._retry_task = self._retry_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run_step(self, step: WarmupStep):
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(step.fn):
+                result = await asyncio.wait_for(step.fn(), self.timeout)
+            else:
+                # Timed in the worker thread so other steps' event-loop work isn't counted
+                result, seconds = await asyncio.wait_for(asyncio.to_thread(_timed, step.fn), self.timeout)
+                started = time.perf_counter() - seconds
+            step.ready = True
+            step.detail = result if isinstance(result, str) else None
+        except asyncio.TimeoutError:
+            step.detail = f"timed out after {self.timeout:g}s"
+        except Exception as e:
+            step.detail = f"{type(e).__name__}: {e}"
+        step.seconds = time.perf_counter() - started
+        if not step.ready:
+            log = logger.error if step.required else logger.warning
+            log("Warm-up step %s failed: %s", step.name, step.detail)
+
+    @property
+    def ready(self) -> bool:
+        return self.finished_at is not None and all(s.ready for s in self.steps.values() if s.required)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Readiness, total warm-up time and per-dependency status/timing"""
+        dependencies: List[Dict[str, Any]] = [
+            {
+                "name": s.name,
+                "required": s.required,
+                "ready": s.ready,
+                "seconds": round(s.seconds, 4) if s.seconds is not None else None,
+                "detail": s.detail,
+            }
+            for s in self.steps.values()
+        ]
+        if self.finished_at is not None:
+            status = "ready" if self.ready else "not_ready"
+        else:
+            status = "warming_up" if self.started_at is not None else "starting"
+        return {
+            "status": status,
+            "ready": self.ready,
+            "warmup_seconds": (
+                round(self.finished_at - self.started_at, 4) if self.finished_at is not None else None
+            ),
+            "retries": self.retries,
+            "dependencies": dependencies,
+        }
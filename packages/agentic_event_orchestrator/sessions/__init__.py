@@ -0,0 +1,75 @@
+"""
+Conversation session storage for the chat server.
+
+The store is chosen by SESSION_BACKEND:
+- "memory" (default): bounded per-process SessionStore
+- "sql": write-behind to SQLite/PostgreSQL via the DatabaseConnection config
+- "redis": write-behind to a Redis-protocol server at REDIS_URL (needs
+  the optional `redis` extra)
+
+Only the shared backends survive restarts and work with multiple workers.
+A backend that cannot start — e.g. "redis" without the redis package —
+is logged with its error and the server falls back to in-memory sessions.
+"""
+
+import atexit
+import logging
+import os
+from typing import Optional, Union
+
+from .context import ConversationContext
+from .memory import SessionStore
+from .persistent import WriteBehindSessionStore
+from .singleflight import SessionSingleFlight
+
+logger = logging.getLogger("sessions")
+
+
+def _create_store() -> Union[SessionStore, WriteBehindSessionStore]:
+    cache = SessionStore.from_env()
+    backend_name = os.getenv("SESSION_BACKEND", "memory").lower()
+    if backend_name == "memory":
+        return cache
+
+    from .backends import RedisSessionBackend, SqlSessionBackend
+
+    try:
+        if backend_name == "sql":
+            backend = SqlSessionBackend(
+                sqlite_path=os.getenv("SESSION_SQLITE_PATH") or None,
+                ttl_seconds=cache.ttl_seconds,
+            )
+        elif backend_name == "redis":
+            backend = RedisSessionBackend(url=os.getenv("REDIS_URL"), ttl_seconds=cache.ttl_seconds)
+        else:
+            raise ValueError(f"Unknown SESSION_BACKEND: {backend_name}")
+    except Exception:
+        logger.error("Session backend %r unavailable; using in-memory sessions", backend_name, exc_info=True)
+        return cache
+
+    store = WriteBehindSessionStore(
+        backend,
+        cache=cache,
+        flush_interval=float(os.getenv("SESSION_FLUSH_INTERVAL", "0.05")),
+    )
+    atexit.register(store.close)
+    return store
+
+
+_store: Optional[Union[SessionStore, WriteBehindSessionStore]] = None
+
+def get_session_store() -> Union[SessionStore, WriteBehindSessionStore]:
+    """Get the process-wide session store"""
+    global _store
+    if _store is None:
+        _store = _create_store()
+    return _store
+
+
+__all__ = [
+    "ConversationContext",
+    "SessionSingleFlight",
+    "SessionStore",
+    "WriteBehindSessionStore",
+    "get_session_store",
+]
@@ -0,0 +1,203 @@
+"""
+Shared session backends.
+
+A backend persists whole sessions so any worker process or replica can pick
+up a conversation. A session record is {"messages": [...], "state": {...}};
+both backends expose the same small interface:
+
+    load(session_id) -> session record, or None if unknown/expired
+    save_many({session_id: record})  — one batched write
+    close()
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from database import DatabaseConnection
+
+# Try to import redis, the Redis backend needs an injected client without it
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger("sessions.backends")
+
+SessionRecord = Dict[str, Any]
+
+
+def _decode_record(raw: str) -> SessionRecord:
+    data = json.loads(raw)
+    if isinstance(data, list):
+        # Rows written before session state existed hold just the messages
+        return {"messages": data, "state": {}}
+    return data
+
+
+class SessionBackendError(Exception):
+    """Raised when a backend cannot be reached"""
+
+
+class SqlSessionBackend:
+    """Sessions in a SQL table (SQLite or PostgreSQL).
+
+    Uses the same configuration as DatabaseConnection: a `sqlite:///path`
+    connection string selects SQLite, anything else goes through psycopg2.
+    A dedicated connection is opened so session writes never share a
+    transaction with VendorRepository reads.
+    """
+
+    TABLE = "chat_sessions"
+
+    def __init__(self, db: DatabaseConnection = None, sqlite_path: str = None, ttl_seconds: float = 3600):
+        self.db = db or DatabaseConnection()
+        self.ttl_seconds = ttl_seconds
+
+        connection_string = self.db.connection_string or ""
+        if sqlite_path is None and connection_string.startswith("sqlite:///"):
+            sqlite_path = connection_string[len("sqlite:///"):]
+        self.sqlite_path = sqlite_path
+
+        self._sqlite = None
+        self._lock = threading.Lock()
+        self._ensure_table()
+
+    @property
+    def _placeholder(self) -> str:
+        return "?" if self.sqlite_path else "%s"
+
+    def _connection(self):
+        if self.sqlite_path:
+            if self._sqlite is None:
+                self._sqlite = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+            return self._sqlite
+
+        conn = self.db.get_connection()
+        if conn is None:
+            raise SessionBackendError("PostgreSQL is not available for the session backend")
+        return conn
+
+    def _ensure_table(self):
+        with self._lock:
+            conn = self._connection()
+            cur = conn.cursor()
+            try:
+                cur.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                        session_id TEXT PRIMARY KEY,
+                        history TEXT NOT NULL,
+                        updated_at DOUBLE PRECISION NOT NULL
+                    )
+                """)
+                conn.commit()
+            finally:
+                cur.close()
+
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        p = self._placeholder
+        with self._lock:
+            conn = self._connection()
+            cur = conn.cursor()
+            try:
+                cur.execute(
+                    f"SELECT history, updated_at FROM {self.TABLE} WHERE session_id = {p}",
+                    [session_id],
+                )
+                row = cur.fetchone()
+                # Close the read transaction so later loads see other workers' writes
+                conn.commit()
+            finally:
+                cur.close()
+
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return _decode_record(row[0])
+
+    def save_many(self, sessions: Dict[str, SessionRecord]):
+        if not sessions:
+            return
+        p = self._placeholder
+        now = time.time()
+        rows = [(sid, json.dumps(record, ensure_ascii=False), now) for sid, record in sessions.items()]
+        with self._lock:
+            conn = self._connection()
+            cur = conn.cursor()
+            try:
+                cur.executemany(
+                    f"""
+                    INSERT INTO {self.TABLE} (session_id, history, updated_at)
+                    VALUES ({p}, {p}, {p})
+                    ON CONFLICT (session_id)
+                    DO UPDATE SET history = excluded.history, updated_at = excluded.updated_at
+                    """,
+                    rows,
+                )
+                # Idle sessions are purged as part of the same batch
+                cur.execute(f"DELETE FROM {self.TABLE} WHERE updated_at < {p}", [now - self.ttl_seconds])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    def close(self):
+        if self._sqlite is not None:
+            self._sqlite.close()
+            self._sqlite = None
+        else:
+            self.db.close()
+
+
+class RedisSessionBackend:
+    """Sessions as JSON strings in Redis, expired by key TTL.
+
+    `client` is anything speaking the redis-py subset used here (`get`,
+    `pipeline().set(..., ex=...)`, `execute`), which lets tests and benches
+    run against a local stand-in instead of a server. Without a client,
+    redis-py is required (the package's `redis` extra); if it is missing
+    the constructor raises SessionBackendError saying so.
+    """
+
+    def __init__(self, client: Any = None, url: str = None, ttl_seconds: float = 3600,
+                 key_prefix: str = "eventai:session:"):
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise SessionBackendError(
+                    "SESSION_BACKEND=redis needs the redis package: install the 'redis' extra "
+                    "(pip install 'agentic-event-orchestrator[redis]') or inject a client"
+                )
+            client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.client = client
+        self.ttl_seconds = int(ttl_seconds)
+        self.key_prefix = key_prefix
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        raw = self.client.get(self._key(session_id))
+        if raw is None:
+            return None
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return _decode_record(raw)
+
+    def save_many(self, sessions: Dict[str, SessionRecord]):
+        if not sessions:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for session_id, record in sessions.items():
+            pipe.set(self._key(session_id), json.dumps(record, ensure_ascii=False), ex=self.ttl_seconds)
+        pipe.execute()
+
+    def close(self):
+        close = getattr(self.client, "close", None)
+        if close:
+            close()
@@ -0,0 +1,163 @@
+"""
+Token-budgeted conversation context for chat turns.
+
+Instead of replaying the last few messages cut to 200 characters, each
+session keeps a small state that is updated as messages arrive:
+
+- slots: event details the user has stated (event type, date, budget,
+  location, attendees), latest value wins
+- summary: one short line per message, so facts that scrolled out of the
+  recent window are still visible in condensed form. A line is extractive:
+  a long message keeps the sentences that carry facts (event details,
+  numbers, names) within a word budget, rather than just its first words.
+  Nothing is paraphrased and no model call is made.
+
+build() then packs the slots, as many recent messages as fit (close to
+verbatim), and summary lines for everything older into a fixed token
+budget. Token counts are estimated at ~4 characters per token.
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from nlp_processor.slot_extractor import extract_slots
+
+SLOT_LABELS = (
+    ("event_type", "Event type"),
+    ("date", "Date"),
+    ("budget", "Budget"),
+    ("location", "Location"),
+    ("attendees", "Attendees"),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def _clip(text: str, max_tokens: int) -> str:
+    text = " ".join(text.split())
+    max_chars = max_tokens * 4
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def _fact_score(sentence: str) -> int:
+    """How much a sentence is worth keeping: event details, then numbers and names"""
+    words = sentence.split()
+    names = sum(1 for w in words[1:] if w[:1].isupper())
+    return 3 * len(extract_slots(sentence)) + (1 if any(c.isdigit() for c in sentence) else 0) + min(names, 2)
+
+
+def _condense(content: str, max_words: int) -> str:
+    """The most fact-dense sentences, in their original order, within max_words"""
+    words = content.split()
+    if len(words) <= max_words:
+        return " ".join(words)
+
+    sentences = [" ".join(s.split()) for s in _SENTENCE_RE.split(content) if s.strip()]
+    # The opening sentence usually states the topic, so it wins ties
+    scores = [_fact_score(s) + (1 if i == 0 else 0) for i, s in enumerate(sentences)]
+    kept = set()
+    budget = max_words
+    for i in sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True):
+        length = len(sentences[i].split())
+        if scores[i] and length <= budget:
+            kept.add(i)
+            budget -= length
+    if not kept:
+        return " ".join(words[:max_words]) + " …"
+
+    parts: List[str] = []
+    for i, sentence in enumerate(sentences):
+        if i in kept:
+            parts.append(sentence)
+        elif not parts or parts[-1] != "…":
+            parts.append("…")
+    return " ".join(parts)
+
+
+def _speaker(role: str) -> str:
+    return "User" if role == "user" else "Assistant"
+
+
+class ConversationContext:
+    """Maintains per-session summary/slot state and builds the agent input"""
+
+    def __init__(self, token_budget: int = 800, max_message_tokens: int = 250,
+                 summary_line_words: int = 32, max_summary_lines: int = 60):
+        self.token_budget = token_budget
+        self.max_message_tokens = max_message_tokens
+        self.summary_line_words = summary_line_words
+        self.max_summary_lines = max_summary_lines
+
+    @classmethod
+    def from_env(cls) -> "ConversationContext":
+        """Build from CHAT_CONTEXT_TOKEN_BUDGET / CHAT_CONTEXT_MESSAGE_TOKENS"""
+        return cls(
+            token_budget=int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "800")),
+            max_message_tokens=int(os.getenv("CHAT_CONTEXT_MESSAGE_TOKENS", "250")),
+        )
+
+    def update(self, state: Dict[str, Any], role: str, content: str) -> Dict[str, Any]:
+        """Fold one new message into a session state; returns the new state.
+
+        Keys other than slots/summary are carried over unchanged.
+        """
+        slots = dict(state.get("slots") or {})
+        if role == "user":
+            slots.update(extract_slots(content))
+
+        summary = list(state.get("summary") or [])
+        summary.append([role, _condense(content, self.summary_line_words)])
+        return {**state, "slots": slots, "summary": summary[-self.max_summary_lines:]}
+
+    def build(self, history: List[Dict[str, str]], state: Dict[str, Any], message: str,
+              user_email: Optional[str] = None) -> str:
+        """Agent input for `message` given the session history and state"""
+        header: List[str] = []
+        if user_email:
+            header.append(f"[User email: {user_email}]")
+
+        slots = state.get("slots") or {}
+        known = [f"{label}: {slots[key]}" for key, label in SLOT_LABELS if slots.get(key)]
+        if known:
+            header.append(f"[Known event details: {'; '.join(known)}]")
+
+        remaining = self.token_budget - sum(estimate_tokens(h) for h in header)
+
+        # Most recent messages first, as long as they fit
+        recent: List[str] = []
+        for m in reversed(history):
+            line = f"{_speaker(m['role'])}: {_clip(m['content'], self.max_message_tokens)}"
+            cost = estimate_tokens(line)
+            if cost > remaining:
+                break
+            recent.append(line)
+            remaining -= cost
+        recent.reverse()
+
+        # Summary lines line up with messages; skip those already shown in full
+        summary = state.get("summary") or []
+        older = summary[:max(0, len(summary) - len(recent))]
+        condensed: List[str] = []
+        for role, text in reversed(older):
+            line = f"- {_speaker(role)}: {text}"
+            cost = estimate_tokens(line)
+            if cost > remaining:
+                break
+            condensed.append(line)
+            remaining -= cost
+        condensed.reverse()
+
+        parts = list(header)
+        if condensed:
+            parts.append("[Earlier in this conversation:\n" + "\n".join(condensed) + "]")
+        if recent:
+            parts.append("[Previous conversation:\n" + "\n".join(recent) + "]")
+
+        context_prefix = "\n".join(parts)
+        return f"{context_prefix}\n\nUser: {message}" if parts else message
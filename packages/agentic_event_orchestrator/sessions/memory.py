@@ -0,0 +1,193 @@
+"""
+In-memory session store.
+
+SessionStore keeps per-session message history in memory with hard bounds:
+a maximum number of sessions (least recently used evicted first), an idle
+TTL, and a byte cap per session (oldest messages dropped first). Each
+session also carries a small JSON-serializable state dict (the rolling
+conversation summary and slots) that outlives trimmed messages.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class _SessionEntry:
+    """History plus bookkeeping for one session"""
+    messages: List[Dict[str, str]] = field(default_factory=list)
+    state: Dict[str, Any] = field(default_factory=dict)
+    size_bytes: int = 0
+    last_access: float = 0.0
+
+
+def _message_size(message: Dict[str, str]) -> int:
+    return sum(len(key) + len(str(value).encode("utf-8")) for key, value in message.items())
+
+
+class SessionStore:
+    """Bounded in-memory session store with LRU eviction and idle TTL"""
+
+    def __init__(
+        self,
+        max_sessions: int = 10_000,
+        ttl_seconds: float = 3600,
+        max_session_bytes: int = 64 * 1024,
+        max_messages: int = 20,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_session_bytes = max_session_bytes
+        self.max_messages = max_messages
+
+        self._entries: "OrderedDict[str, _SessionEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.truncations = 0
+
+    @classmethod
+    def from_env(cls) -> "SessionStore":
+        """Build a store from SESSION_MAX_COUNT / SESSION_TTL_SECONDS / SESSION_MAX_BYTES"""
+        return cls(
+            max_sessions=int(os.getenv("SESSION_MAX_COUNT", "10000")),
+            ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS", "3600")),
+            max_session_bytes=int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024))),
+        )
+
+    def get(self, session_id: str) -> List[Dict[str, str]]:
+        """Return the session history, creating an empty session on a miss"""
+        with self._lock:
+            return self._get_entry(session_id, time.monotonic(), count=True).messages
+
+    async def aget(self, session_id: str) -> List[Dict[str, str]]:
+        """get() for the event loop (memory reads never block)"""
+        return self.get(session_id)
+
+    def append(self, session_id: str, role: str, content: str, timestamp: str):
+        """Append a message, then enforce the message and byte caps"""
+        message = {"role": role, "content": content, "timestamp": timestamp}
+        with self._lock:
+            entry = self._get_entry(session_id, time.monotonic())
+            entry.messages.append(message)
+            entry.size_bytes += _message_size(message)
+            self._trim(entry)
+
+    def replace(self, session_id: str, messages: List[Dict[str, str]], state: Optional[Dict[str, Any]] = None):
+        """Overwrite a session's history (e.g. with a copy loaded from a backend)"""
+        with self._lock:
+            entry = self._get_entry(session_id, time.monotonic())
+            entry.messages[:] = [dict(m) for m in messages]
+            entry.size_bytes = sum(_message_size(m) for m in entry.messages)
+            if state is not None:
+                entry.state = dict(state)
+            self._trim(entry)
+
+    def get_state(self, session_id: str) -> Dict[str, Any]:
+        """The session's state dict (empty for a new session); treat as read-only"""
+        with self._lock:
+            return self._get_entry(session_id, time.monotonic()).state
+
+    def set_state(self, session_id: str, state: Dict[str, Any]):
+        """Replace the session's state dict"""
+        with self._lock:
+            self._get_entry(session_id, time.monotonic()).state = state
+
+    def snapshot(self, session_id: str) -> List[Dict[str, str]]:
+        """Copy of a session's history without touching LRU order or counters"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            return [dict(m) for m in entry.messages] if entry else []
+
+    def snapshot_state(self, session_id: str) -> Dict[str, Any]:
+        """Copy of a session's state without touching LRU order or counters"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            return dict(entry.state) if entry else {}
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for monitoring"""
+        with self._lock:
+            return {
+                "sessions": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "truncations": self.truncations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, session_id: str) -> bool:
+        """True while the session is held and not past its idle TTL"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            return entry is not None and time.monotonic() - entry.last_access <= self.ttl_seconds
+
+    # ------------------------------------------------------------------
+    # Internals (caller holds the lock)
+    # ------------------------------------------------------------------
+
+    def _get_entry(self, session_id: str, now: float, count: bool = False) -> _SessionEntry:
+        # Only history reads (count=True) feed hits/misses: a chat turn touches
+        # the state several times, which would drown out the real hit ratio
+        entry = self._entries.get(session_id)
+        if entry is not None and now - entry.last_access > self.ttl_seconds:
+            del self._entries[session_id]
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            if count:
+                self.misses += 1
+            self._expire_idle(now)
+            while len(self._entries) >= self.max_sessions:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            entry = _SessionEntry()
+            self._entries[session_id] = entry
+        else:
+            if count:
+                self.hits += 1
+            self._entries.move_to_end(session_id)
+
+        entry.last_access = now
+        return entry
+
+    def _expire_idle(self, now: float):
+        # Entries are ordered by last access, so idle ones sit at the front
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if now - oldest.last_access <= self.ttl_seconds:
+                break
+            self._entries.popitem(last=False)
+            self.expirations += 1
+
+    def _trim(self, entry: _SessionEntry):
+        while len(entry.messages) > self.max_messages:
+            entry.size_bytes -= _message_size(entry.messages.pop(0))
+
+        if entry.size_bytes <= self.max_session_bytes:
+            return
+
+        self.truncations += 1
+        while entry.size_bytes > self.max_session_bytes and len(entry.messages) > 1:
+            entry.size_bytes -= _message_size(entry.messages.pop(0))
+
+        # A single oversized message: keep the tail of its content
+        if entry.size_bytes > self.max_session_bytes:
+            message = entry.messages[0]
+            excess = entry.size_bytes - self.max_session_bytes
+            content = message["content"].encode("utf-8")
+            message["content"] = content[excess:].decode("utf-8", errors="ignore")
+            entry.size_bytes = _message_size(message)
+
@@ -0,0 +1,185 @@
+"""
+Write-behind session store over a shared backend.
+
+Appends land in the local SessionStore immediately and the session is
+marked dirty; a background thread flushes dirty sessions to the backend in
+batches. The chat path therefore never waits on a write. Reads of a
+session with unflushed changes are served locally, everything else is
+loaded from the backend so a follow-up routed to another worker sees the
+conversation; the async chat path uses aget(), which loads on a worker
+thread so the event loop never waits on the backend (or on the flusher
+holding the backend's lock). Session state is stored and loaded
+alongside the messages. A write to a session this worker has not loaded
+loads it first (blocking), so the next flush extends the shared copy
+instead of replacing it with the new messages alone.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+from .memory import SessionStore
+
+logger = logging.getLogger("sessions.persistent")
+
+
+class WriteBehindSessionStore:
+    """SessionStore-compatible facade that persists through a backend"""
+
+    def __init__(self, backend, cache: Optional[SessionStore] = None,
+                 flush_interval: float = 0.05, max_batch: int = 500):
+        self.backend = backend
+        self.cache = cache if cache is not None else SessionStore()  # an empty store is falsy
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._dirty: Dict[str, None] = {}  # insertion-ordered set
+        self._in_flight: Set[str] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+        self.flushes = 0
+        self.flushed_sessions = 0
+        self.flush_errors = 0
+        self.load_errors = 0
+
+        self._thread = threading.Thread(target=self._run, name="session-flusher", daemon=True)
+        self._thread.start()
+
+    def get(self, session_id: str) -> List[Dict[str, str]]:
+        """Return the session history, creating an empty session on a miss (blocks on the backend)"""
+        if self._pending(session_id):
+            return self.cache.get(session_id)
+        return self._loaded(session_id, self._load(session_id))
+
+    async def aget(self, session_id: str) -> List[Dict[str, str]]:
+        """get() for the event loop: the backend load runs on a worker thread"""
+        if self._pending(session_id):
+            return self.cache.get(session_id)
+        return self._loaded(session_id, await asyncio.to_thread(self._load, session_id))
+
+    def _pending(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._dirty or session_id in self._in_flight
+
+    def _load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """The backend's record, {} when it has none, or None when the load failed"""
+        try:
+            return self.backend.load(session_id) or {}
+        except Exception:
+            self.load_errors += 1
+            logger.warning("Session backend load failed; serving local copy", exc_info=True)
+            return None
+
+    def _loaded(self, session_id: str, record: Optional[Dict[str, Any]]) -> List[Dict[str, str]]:
+        # Local changes made while the load was running win over the loaded copy
+        if record is not None and not self._pending(session_id):
+            self.cache.replace(session_id, record.get("messages") or [], record.get("state") or {})
+        return self.cache.get(session_id)
+
+    def get_state(self, session_id: str) -> Dict[str, Any]:
+        """The session's state as of the last get() or set_state() on this worker"""
+        return self.cache.get_state(session_id)
+
+    def set_state(self, session_id: str, state: Dict[str, Any]):
+        """Replace the session's state and queue the session for the next flush"""
+        self._ensure_loaded(session_id)
+        self.cache.set_state(session_id, state)
+        self._mark_dirty(session_id)
+
+    def append(self, session_id: str, role: str, content: str, timestamp: str):
+        """Append locally and queue the session for the next flush"""
+        self._ensure_loaded(session_id)
+        self.cache.append(session_id, role, content, timestamp)
+        self._mark_dirty(session_id)
+
+    def _ensure_loaded(self, session_id: str):
+        # Callers on the event loop aget() first, so this only blocks for ones that skip it
+        if session_id not in self.cache and not self._pending(session_id):
+            self._loaded(session_id, self._load(session_id))
+
+    def _mark_dirty(self, session_id: str):
+        with self._lock:
+            self._dirty[session_id] = None
+            backlog = len(self._dirty)
+        if backlog >= self.max_batch:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write all dirty sessions now; returns how many were written"""
+        written = 0
+        while True:
+            with self._lock:
+                batch_ids = list(self._dirty)[:self.max_batch]
+                for session_id in batch_ids:
+                    del self._dirty[session_id]
+                self._in_flight.update(batch_ids)
+            if not batch_ids:
+                return written
+
+            # A dirty session always has messages; an empty snapshot means it was
+            # evicted locally, and writing it would wipe the shared copy
+            snapshots = {sid: self.cache.snapshot(sid) for sid in batch_ids}
+            batch = {
+                sid: {"messages": history, "state": self.cache.snapshot_state(sid)}
+                for sid, history in snapshots.items() if history
+            }
+            try:
+                self.backend.save_many(batch)
+            except Exception:
+                self.flush_errors += 1
+                logger.warning("Session backend flush failed; will retry", exc_info=True)
+                with self._lock:
+                    for session_id in batch_ids:
+                        self._dirty.setdefault(session_id, None)
+                    self._in_flight.difference_update(batch_ids)
+                return written
+
+            with self._lock:
+                self._in_flight.difference_update(batch_ids)
+
+            # Evicted sessions were skipped, not written
+            self.flushes += 1
+            self.flushed_sessions += len(batch)
+            written += len(batch)
+
+    def stats(self) -> Dict[str, int]:
+        """Local cache counters plus flush accounting"""
+        stats = self.cache.stats()
+        with self._lock:
+            stats["pending_writes"] = len(self._dirty)
+        stats.update({
+            "flushes": self.flushes,
+            "flushed_sessions": self.flushed_sessions,
+            "flush_errors": self.flush_errors,
+            "load_errors": self.load_errors,
+        })
+        return stats
+
+    def close(self):
+        """Stop the flusher after writing everything still pending"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        self.backend.close()
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self.cache
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            errors_before = self.flush_errors
+            self.flush()
+            if self.flush_errors > errors_before:
+                # Backend is down: back off instead of retrying every interval
+                self._stopped.wait(1.0)
@@ -0,0 +1,95 @@
+"""
+Per-session request serialization with duplicate coalescing.
+
+Requests for the same session run one at a time, in arrival order
+(asyncio.Lock wakes waiters FIFO), so history writes never interleave.
+A request whose key matches one already running or queued for that session
+does not start a second run: it waits for and shares the first one's
+result. This absorbs client retries and double-clicks.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _SessionSlot:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+
+
+class SessionSingleFlight:
+    """Serializes work per session and coalesces identical in-flight calls"""
+
+    def __init__(self):
+        self._slots: Dict[str, _SessionSlot] = {}
+        self._in_flight: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+
+        self.runs = 0
+        self.coalesced = 0
+        self.queued = 0
+
+    @asynccontextmanager
+    async def serialized(self, session_id: str):
+        """Hold the session's turn for the duration of the block"""
+        slot = self._slots.setdefault(session_id, _SessionSlot())
+        slot.users += 1
+        try:
+            if slot.lock.locked():
+                self.queued += 1
+            async with slot.lock:
+                yield
+        finally:
+            slot.users -= 1
+            if slot.users == 0:
+                self._slots.pop(session_id, None)
+
+    async def run(self, session_id: str, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn` in the session's turn, or share the result of an identical call"""
+        flight_key = (session_id, key)
+        while flight_key in self._in_flight:
+            existing = self._in_flight[flight_key]
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(existing)
+            except asyncio.CancelledError:
+                if existing.cancelled():
+                    # The original caller went away before finishing: take over
+                    self.coalesced -= 1
+                    continue
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        # Followers may all have left; don't warn about an unread exception
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[flight_key] = future
+        try:
+            async with self.serialized(session_id):
+                self.runs += 1
+                result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._in_flight.get(flight_key) is future:
+                del self._in_flight[flight_key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        return {
+            "active_sessions": len(self._slots),
+            "in_flight": len(self._in_flight),
+            "runs": self.runs,
+            "coalesced": self.coalesced,
+            "queued": self.queued,
+        }
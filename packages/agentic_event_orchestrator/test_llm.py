@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Tests for the model-call layers (model tiers, HTTP transport, response cache, record/replay,
+schema pruning).
+Run: python test_llm.py  (or pytest test_llm.py)
+"""
+
+import asyncio
+import sys
+import os
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText
+
+from _agents_sdk import Model, ModelResponse, Usage, function_tool, handoff
+from llm import (
+    AgentModels, CachingModel, Cassette, LLMResponseCache, LLMTransport, PruningModel, RecordingModel, ReplayMiss,
+    ReplayModel, ToolGroup, build_llm_client,
+)
+from llm.cache import CACHE_REQUESTS, CACHE_SAVED_TOKENS
+from llm.replay import REPLAY_CALLS, turn_position
+from llm.transport import HTTP_CONNECTIONS, HTTP_IN_FLIGHT, HTTP_POOL_WAIT, HTTP_QUEUE_WAIT, HTTP_RETRIES
+from mock_openai_server import MockOpenAIServer
+
+
+class CountingModel(Model):
+    """Answers with a message and a tool call, counting provider calls"""
+
+    model = "fake-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        self.calls += 1
+        message = ResponseOutputMessage(
+            id="msg_1", type="message", role="assistant", status="completed",
+            content=[ResponseOutputText(type="output_text", text=f"answer {self.calls}", annotations=[])],
+        )
+        call = ResponseFunctionToolCall(
+            type="function_call", call_id="call_1", name="search_vendors", arguments='{"query": "catering"}',
+        )
+        return ModelResponse(output=[message, call], usage=Usage(requests=1, input_tokens=100, output_tokens=20),
+                             response_id=None)
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def _call(model, instructions="Find vendors", user_input="caterers in Lahore"):
+    return model.get_response(instructions, user_input, None, [], None, [], None,
+                              previous_response_id=None, conversation_id=None, prompt=None)
+
+
+def test_agent_models_resolve_per_agent_tiers_and_share_instances():
+    models = AgentModels(client=None, default="gemini-3-flash-preview", per_agent={
+        "TriageAgent": "gemini-2.5-flash-lite",
+        "BookingAgent": "gemini-2.5-flash-lite",
+        "OrchestratorAgent": "litellm/anthropic/claude-sonnet-4",
+    })
+    assert models.model_for("TriageAgent").model == "gemini-2.5-flash-lite"
+    assert models.model_for("TriageAgent") is models.model_for("BookingAgent")
+    assert models.model_for("VendorDiscoveryAgent") is models.model_for()
+    assert models.model_for().model == "gemini-3-flash-preview"
+
+    orchestrator = models.model_for("OrchestratorAgent")
+    assert type(orchestrator).__name__ == "LitellmModel" and orchestrator.model == "anthropic/claude-sonnet-4"
+
+
+def test_transport_retries_reuses_connections_and_caps_concurrency():
+    server = MockOpenAIServer(latency=0.05, fail_first=2).start()
+    transport = LLMTransport(provider="mock", concurrency=2, retries=3, retry_base=0.01, http2=False)
+    client = build_llm_client(server.base_url, "test-key", transport=transport)
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def run():
+        first = await client.chat.completions.create(model="mock-model", messages=messages)
+        assert first.choices[0].message.content == "Hello from the mock model"
+        assert HTTP_RETRIES.value(provider="mock", reason="503") == 2
+
+        await asyncio.gather(*[client.chat.completions.create(model="mock-model", messages=messages)
+                               for _ in range(8)])
+        stream = await client.chat.completions.create(model="mock-model", messages=messages, stream=True)
+        assert [chunk async for chunk in stream][0].choices[0].delta.content == "Hello from the mock model"
+        await client.close()
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.shutdown()
+    assert server.requests == 12 and server.max_in_flight == 2
+    # Keep-alive: never more connections than concurrent calls
+    assert server.connections <= 2 and HTTP_CONNECTIONS.value(provider="mock") == server.connections
+    assert HTTP_QUEUE_WAIT.count(provider="mock") == 10 and HTTP_POOL_WAIT.count(provider="mock") == 12
+    assert HTTP_IN_FLIGHT.value(provider="mock") == 0
+
+
+def test_transport_falls_back_to_http1_when_h2_is_missing():
+    import importlib.util
+
+    find_spec = importlib.util.find_spec
+    importlib.util.find_spec = lambda name, *args: None if name == "h2" else find_spec(name, *args)
+    try:
+        transport = LLMTransport(provider="no-h2", http2=True)
+    finally:
+        importlib.util.find_spec = find_spec
+    assert transport.http2 is False
+
+
+def test_streamed_runs_request_and_count_usage():
+    from _agents_sdk import Agent, OpenAIChatCompletionsModel, set_tracing_disabled
+    from agents.sdk_agents import run_agent_streamed
+    from observability import observe_run
+
+    server = MockOpenAIServer().start()
+    transport = LLMTransport(provider="mock-stream", http2=False)
+    client = build_llm_client(server.base_url, "test-key", transport=transport)
+    set_tracing_disabled(True)
+    agent = Agent(name="StreamingAgent", instructions="Plan",
+                  model=OpenAIChatCompletionsModel(model="mock-model", openai_client=client))
+
+    async def run():
+        # Without include_usage the endpoint reports none, as Gemini does
+        stream = await client.chat.completions.create(
+            model="mock-model", messages=[{"role": "user", "content": "hi"}], stream=True)
+        assert all(chunk.usage is None for chunk in [chunk async for chunk in stream])
+
+        with observe_run(agent.name) as record:
+            result = run_agent_streamed(agent, "plan a wedding")
+            async for _ in result.stream_events():
+                pass
+        await client.close()
+        return result, record
+
+    try:
+        result, record = asyncio.run(run())
+    finally:
+        server.shutdown()
+    assert result.final_output == "Hello from the mock model"
+    assert result.context_wrapper.usage.input_tokens == 10 and result.context_wrapper.usage.output_tokens == 5
+    stats = record.agents["StreamingAgent"]
+    assert (stats["input_tokens"], stats["output_tokens"]) == (10, 5)
+
+
+def test_caching_model_serves_identical_calls_from_memory_and_disk():
+    directory = tempfile.mkdtemp()
+    inner = CountingModel()
+    model = CachingModel(inner, LLMResponseCache(ttl_seconds=60, directory=directory), agent="CacheTestAgent")
+
+    first = asyncio.run(_call(model))
+    second = asyncio.run(_call(model))
+    other = asyncio.run(_call(model, user_input="photographers in Karachi"))
+    assert inner.calls == 2
+    assert second.output[0].content[0].text == first.output[0].content[0].text == "answer 1"
+    assert second.output[1].name == "search_vendors"
+    assert second.usage.input_tokens == 0 and other.output[0].content[0].text == "answer 2"
+
+    # A fresh process sharing the directory is served from disk
+    restarted = CachingModel(inner, LLMResponseCache(ttl_seconds=60, directory=directory), agent="CacheTestAgent")
+    assert asyncio.run(_call(restarted)).output[0].content[0].text == "answer 1"
+    assert inner.calls == 2
+    assert CACHE_REQUESTS.value(agent="CacheTestAgent", result="hit_memory") == 1
+    assert CACHE_REQUESTS.value(agent="CacheTestAgent", result="hit_disk") == 1
+    assert CACHE_SAVED_TOKENS.value(agent="CacheTestAgent", type="input") == 200
+
+
+def test_cache_key_names_the_provider_model_through_wrappers():
+    directory = tempfile.mkdtemp()
+    first_inner, second_inner = CountingModel(), CountingModel()
+    first = CachingModel(PruningModel(first_inner, agent="WrapTestAgent"),
+                         LLMResponseCache(ttl_seconds=60, directory=directory), agent="WrapTestAgent")
+    # Another worker: new model objects, same on-disk tier
+    second = CachingModel(PruningModel(second_inner, agent="WrapTestAgent"),
+                          LLMResponseCache(ttl_seconds=60, directory=directory), agent="WrapTestAgent")
+
+    assert first.model_name == second.model_name == "fake-model"
+    asyncio.run(_call(first))
+    assert asyncio.run(_call(second)).output[0].content[0].text == "answer 1"
+    assert (first_inner.calls, second_inner.calls) == (1, 0)
+    assert CACHE_REQUESTS.value(agent="WrapTestAgent", result="hit_disk") == 1
+
+
+def test_cache_entries_expire_and_streaming_replays_hits():
+    inner = CountingModel()
+    cache = LLMResponseCache(ttl_seconds=0.05)
+    model = CachingModel(inner, cache, agent="StreamTestAgent")
+
+    asyncio.run(_call(model))
+
+    async def stream():
+        return [event async for event in model.stream_response(
+            "Find vendors", "caterers in Lahore", None, [], None, [], None,
+            previous_response_id=None, conversation_id=None, prompt=None,
+        )]
+
+    events = asyncio.run(stream())
+    assert [e.type for e in events] == ["response.output_text.delta", "response.completed"]
+    assert events[0].delta == "answer 1" and len(events[-1].response.output) == 2
+
+    time.sleep(0.06)
+    asyncio.run(_call(model))
+    assert inner.calls == 2 and cache.expirations == 1
+
+
+def test_recorded_calls_replay_with_synthetic_latency():
+    path = os.path.join(tempfile.mkdtemp(), "cassette.jsonl")
+    inner = CountingModel()
+    recorder = RecordingModel(inner, Cassette(path), agent="ReplayTestAgent")
+    asyncio.run(_call(recorder))
+    asyncio.run(_call(recorder, user_input="photographers in Karachi"))
+    assert inner.calls == 2
+
+    # A fresh process replays from the file without calling a provider
+    model = ReplayModel(Cassette(path), latency=0.05).for_agent("ReplayTestAgent")
+    start = time.perf_counter()
+    exact = asyncio.run(_call(model))
+    assert time.perf_counter() - start >= 0.05
+    assert exact.output[0].content[0].text == "answer 1" and exact.output[1].name == "search_vendors"
+    assert exact.usage.input_tokens == 100
+
+    # An unseen question at the same point in the turn falls back to the agent's step
+    other = asyncio.run(_call(model, user_input="florists in Islamabad"))
+    assert other.output[0].content[0].text == "answer 1"
+    assert REPLAY_CALLS.value(agent="ReplayTestAgent", match="exact") == 1
+    assert REPLAY_CALLS.value(agent="ReplayTestAgent", match="step") == 1
+
+    strict = ReplayModel(Cassette(path), latency=0, strict=True).for_agent("OtherAgent")
+    try:
+        asyncio.run(_call(strict))
+        assert False, "expected ReplayMiss"
+    except ReplayMiss as e:
+        assert e.agent == "OtherAgent"
+
+
+def test_turn_position_counts_only_the_agents_own_tool_calls():
+    class Tool:
+        name = "search_vendors"
+
+    history = [
+        {"role": "user", "content": "earlier question"},
+        {"type": "function_call", "name": "search_vendors", "call_id": "a", "arguments": "{}"},
+        {"role": "user", "content": [{"type": "input_text", "text": "caterers in Lahore"}]},
+        {"type": "function_call", "name": "transfer_to_vendordiscoveryagent", "call_id": "b", "arguments": "{}"},
+        {"type": "function_call_output", "call_id": "b", "output": "{}"},
+        {"type": "function_call", "name": "search_vendors", "call_id": "c", "arguments": "{}"},
+        {"type": "function_call_output", "call_id": "c", "output": "[]"},
+    ]
+    assert turn_position(history, [Tool()]) == ("caterers in Lahore", 1)
+    assert turn_position("hello", [Tool()]) == ("hello", 0)
+
+
+def test_pruning_compacts_schemas_and_loads_tool_groups_on_demand():
+    from _agents_sdk import Agent
+
+    @function_tool
+    def search_vendors(query: str, location: str = "") -> str:
+        """Search for vendors. Returns a ranked list with prices and ratings.
+
+        Args:
+            query: The type of vendor to search for (e.g. caterer, florist)
+            location: Optional city or area where the event will be held
+        """
+        return "[]"
+
+    @function_tool
+    def cancel_booking(booking_id: str) -> str:
+        """Cancel an existing booking. The vendor is notified.
+
+        Args:
+            booking_id: The booking ID to cancel
+        """
+        return "{}"
+
+    class Recorder(CountingModel):
+        async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                               *args, **kwargs):
+            self.tools, self.handoffs = tools, handoffs
+            return await super().get_response()
+
+    inner = Recorder()
+    model = PruningModel(inner, agent="BookingAgent", groups=[ToolGroup.of(["cancel_booking"], r"cancel")])
+    tools = [search_vendors, cancel_booking]
+    handoffs = [handoff(Agent(name="TriageAgent", instructions="Route"))]
+
+    def send(user_input):
+        asyncio.run(model.get_response("Book", user_input, None, tools, None, handoffs, None,
+                                        previous_response_id=None, conversation_id=None, prompt=None))
+        return [tool.name for tool in inner.tools]
+
+    assert send("book a caterer") == ["search_vendors"]
+    compact = inner.tools[0]
+    assert compact.description == "Search for vendors."
+    properties = compact.params_json_schema["properties"]
+    assert properties["query"] == {"description": "The type of vendor to search for", "type": "string"}
+    assert properties["location"]["description"] == "City or area where the event will be held"
+    assert inner.handoffs[0].tool_description == "Transfer to TriageAgent."
+    # The agent still executes the original tools; compacted copies are reused
+    assert search_vendors.description.startswith("Search for vendors. Returns")
+    send("book a caterer")
+    assert inner.tools[0] is compact
+
+    assert send("please cancel my booking") == ["search_vendors", "cancel_booking"]
+    # Once the agent has called one of its tools this turn, the whole set is loaded
+    history = [
+        {"role": "user", "content": "book a caterer"},
+        {"type": "function_call", "name": "search_vendors", "call_id": "a", "arguments": "{}"},
+        {"type": "function_call_output", "call_id": "a", "output": "[]"},
+    ]
+    assert send(history) == ["search_vendors", "cancel_booking"]
+
+
+def test_pruning_compacts_handoffs_rebuilt_every_turn():
+    from _agents_sdk import Agent
+
+    booking, mail = Agent(name="BookingAgent", instructions="Book"), Agent(name="MailAgent", instructions="Mail")
+    model = PruningModel(CountingModel(), agent="TriageAgent")
+
+    # The SDK builds a new Handoff for a bare Agent on every turn; freed ones get their ids reused
+    for _ in range(50):
+        for agent in (booking, mail):
+            fresh = handoff(agent)
+            _, [compacted] = model.prune("hello", [], [fresh])
+            assert compacted.agent_name == agent.name and compacted.tool_name == fresh.tool_name
+            assert compacted.on_invoke_handoff is fresh.on_invoke_handoff
+            assert compacted.tool_description == f"Transfer to {agent.name}."
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Tests for metrics and span tracing.
+Run: python test_observability.py  (or pytest test_observability.py)
+"""
+
+import asyncio
+import json
+import sys
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from observability import RUN_HOOKS, MetricsRegistry, get_tracer, instrument_requests, observe_run, span
+from observability.runs import AGENT_TURNS, LLM_LATENCY, LLM_TOKENS, RUNS
+from observability.usage import KEY_COST, KEY_TOKENS, ModelPrices, Price, UsageLedger, add_usage, key_fingerprint
+from observability.tools import TOOL_CALLS, TOOL_ERRORS, function_tool, instrument_tool
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    calls = registry.counter("demo_calls_total", "Calls", ["tool"])
+    latency = registry.histogram("demo_seconds", "Latency", ["tool"], buckets=(0.1, 1))
+    registry.gauge("demo_depth", "Depth", callback=lambda: 3)
+
+    calls.inc(tool='say "hi"')
+    latency.observe(0.5, tool="x")
+    text = registry.render()
+
+    assert "# TYPE demo_calls_total counter" in text
+    assert 'demo_calls_total{tool="say \\"hi\\""} 1' in text
+    assert 'demo_seconds_bucket{tool="x",le="0.1"} 0' in text
+    assert 'demo_seconds_bucket{tool="x",le="1"} 1' in text
+    assert 'demo_seconds_bucket{tool="x",le="+Inf"} 1' in text
+    assert 'demo_seconds_count{tool="x"} 1' in text
+    assert "demo_depth 3" in text
+
+
+def test_instrument_tool_counts_calls_and_errors():
+    def flaky_tool(fail: bool) -> str:
+        if fail:
+            raise RuntimeError("boom")
+        return "ok"
+
+    wrapped = instrument_tool(flaky_tool)
+    assert wrapped.__name__ == "flaky_tool"
+    assert wrapped(False) == "ok"
+    try:
+        wrapped(True)
+    except RuntimeError:
+        pass
+
+    assert TOOL_CALLS.value(tool="flaky_tool") == 2
+    assert TOOL_ERRORS.value(tool="flaky_tool") == 1
+
+
+def test_hooks_attribute_turns_and_tokens_to_agents():
+    triage = SimpleNamespace(name="TestTriage")
+    # A wrapped model (e.g. CachingModel) reports the provider model underneath
+    vendor = SimpleNamespace(name="TestVendor", model=SimpleNamespace(model=SimpleNamespace(model="small-model")))
+    response = SimpleNamespace(usage=SimpleNamespace(input_tokens=120, output_tokens=30))
+
+    async def run():
+        with observe_run(triage.name) as record:
+            await RUN_HOOKS.on_agent_start(None, triage)
+            await RUN_HOOKS.on_llm_start(None, triage, None, [])
+            await RUN_HOOKS.on_llm_end(None, triage, response)
+            await RUN_HOOKS.on_handoff(None, triage, vendor)
+            await RUN_HOOKS.on_agent_start(None, vendor)
+            await RUN_HOOKS.on_llm_start(None, vendor, None, [])
+            await RUN_HOOKS.on_llm_end(None, vendor, response)
+            await RUN_HOOKS.on_agent_end(None, vendor, "done")
+        return record
+
+    record = asyncio.run(run())
+    assert record.turns == 2
+    assert set(record.agents) == {"TestTriage", "TestVendor"}
+    assert record.agents["TestVendor"]["input_tokens"] == 120
+    assert record.agents["TestVendor"]["model"] == "small-model"
+    assert record.agents["TestVendor"]["llm_seconds"] > 0
+    assert LLM_LATENCY.count(agent="TestVendor", model="small-model") == 1
+    assert AGENT_TURNS.value(agent="TestVendor") == 1
+    assert LLM_TOKENS.value(agent="TestTriage", type="output") == 30
+    assert RUNS.value(entry_agent="TestTriage", outcome="success") == 1
+
+
+def test_usage_ledger_prices_runs_and_totals_them_per_key_and_session():
+    triage = SimpleNamespace(name="UsageTriage", model="tiny-model")
+    vendor = SimpleNamespace(name="UsageVendor", model="gemini/big-model")  # litellm-style name
+    usage = SimpleNamespace(input_tokens=1000, output_tokens=200, input_tokens_details=SimpleNamespace(cached_tokens=400))
+
+    async def run():
+        with observe_run(triage.name) as record:
+            for agent in (triage, vendor, vendor):
+                await RUN_HOOKS.on_agent_start(None, agent)
+                await RUN_HOOKS.on_llm_start(None, agent, None, [])
+                await RUN_HOOKS.on_llm_end(None, agent, SimpleNamespace(usage=usage))
+        return record
+
+    record = asyncio.run(run())
+    assert record.agents["UsageVendor"]["cached_tokens"] == 800
+
+    ledger = UsageLedger(ModelPrices({"big-model": Price(input=1.0, output=10.0, cached=0.1)}))
+    block = ledger.record(record.agents, api_key="secret-key")
+    assert (block["requests"], block["input_tokens"], block["cached_tokens"]) == (3, 3000, 1200)
+    assert block["total_tokens"] == 3600
+    by_agent = {entry["agent"]: entry for entry in block["agents"]}
+    # 1200 uncached input, 800 cached, 400 output tokens of big-model; tiny-model has no price
+    assert by_agent["UsageVendor"]["cost_usd"] == round((1200 * 1.0 + 800 * 0.1 + 400 * 10.0) / 1e6, 6)
+    assert by_agent["UsageTriage"]["cost_usd"] is None
+    assert block["cost_usd"] == by_agent["UsageVendor"]["cost_usd"]
+
+    key = key_fingerprint("secret-key")
+    assert key != "secret-key" and KEY_TOKENS.value(api_key=key, type="cached") == 1200
+    assert KEY_COST.value(api_key=key) == block["cost_usd"]
+    session = add_usage(add_usage(None, block), block)
+    assert session["runs"] == 2 and session["output_tokens"] == 1200
+    assert ledger.snapshot()[key]["total_tokens"] == 3600
+
+
+def test_spans_nest_run_agent_llm_and_tool():
+    triage = SimpleNamespace(name="TraceTriage")
+    response = SimpleNamespace(usage=SimpleNamespace(input_tokens=10, output_tokens=5))
+
+    @instrument_tool
+    def lookup_venue() -> str:
+        return "found"
+
+    async def run():
+        with span("POST /api/chat", kind="server") as root:
+            with observe_run(triage.name):
+                await RUN_HOOKS.on_agent_start(None, triage)
+                await RUN_HOOKS.on_llm_start(None, triage, None, [])
+                await RUN_HOOKS.on_llm_end(None, triage, response)
+                lookup_venue()
+                await RUN_HOOKS.on_agent_end(None, triage, "done")
+        return root
+
+    path = os.path.join(tempfile.mkdtemp(), "spans.jsonl")
+    tracer = get_tracer()
+    tracer.configure(path)
+    try:
+        root = asyncio.run(run())
+    finally:
+        tracer.configure(None)
+
+    with open(path) as f:
+        spans = {s["name"]: s for s in map(json.loads, f)}
+    assert {s["trace_id"] for s in spans.values()} == {root.trace_id}
+    assert spans["agent_run"]["parent_id"] == root.span_id
+    agent = spans["agent:TraceTriage"]
+    assert agent["parent_id"] == spans["agent_run"]["span_id"]
+    assert spans["llm_call"]["parent_id"] == agent["span_id"]
+    assert spans["llm_call"]["attributes"]["gen_ai.usage.input_tokens"] == 10
+    assert spans["tool:lookup_venue"]["parent_id"] == agent["span_id"]
+
+
+def test_outbound_requests_propagate_trace_only_to_internal_hosts():
+    import requests
+    from requests.adapters import BaseAdapter
+
+    class RecordingAdapter(BaseAdapter):
+        def __init__(self):
+            super().__init__()
+            self.headers = {}
+
+        def send(self, request, **kwargs):
+            self.headers[request.url] = dict(request.headers)
+            response = requests.Response()
+            response.status_code, response.url, response.request = 200, request.url, request
+            return response
+
+        def close(self):
+            pass
+
+    adapter = RecordingAdapter()
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    urls = {
+        "http://backend.internal:3001/api/v1/events": True,
+        "https://vendors.svc.local/search": True,
+        "https://api.example.com/v1/places": False,
+        "http://evil-backend.internal/": False,
+    }
+
+    path = os.path.join(tempfile.mkdtemp(), "spans.jsonl")
+    tracer = get_tracer()
+    tracer.configure(path)
+    instrument_requests(["backend.internal", ".svc.local"])
+    try:
+        with span("POST /api/agent/discover", kind="server") as root:
+            for url in urls:
+                session.get(url)
+    finally:
+        instrument_requests()
+        tracer.configure(None)
+
+    for url, internal in urls.items():
+        header = adapter.headers[url].get("traceparent")
+        assert (header is not None) == internal, url
+        if internal:
+            assert header.split("-")[1] == root.trace_id
+    with open(path) as f:
+        clients = [s for s in map(json.loads, f) if s["name"] == "HTTP GET"]
+    # External calls are still traced on our side
+    assert sorted(s["attributes"]["http.url"] for s in clients) == sorted(urls)
+    assert all(s["parent_id"] == root.span_id for s in clients)
+
+
+def test_tool_calls_of_one_turn_run_concurrently():
+    from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText
+    from _agents_sdk import Agent, Model, ModelResponse, Runner, Usage, set_tracing_disabled
+
+    @function_tool
+    def check_availability(vendor_id: str) -> str:
+        """Check a vendor's availability."""
+        time.sleep(0.2)  # a blocking `requests` call
+        return f"{vendor_id} available"
+
+    class ParallelCallsModel(Model):
+        """Asks for four calls in the first turn, then answers"""
+
+        async def get_response(self, system_instructions, input, *args, **kwargs):
+            if any(isinstance(item, dict) and item.get("type") == "function_call_output" for item in input):
+                output = [ResponseOutputMessage(
+                    id="msg_1", type="message", role="assistant", status="completed",
+                    content=[ResponseOutputText(type="output_text", text="all available", annotations=[])],
+                )]
+            else:
+                output = [ResponseFunctionToolCall(type="function_call", call_id=f"call_{i}",
+                                                   name="check_availability", arguments=f'{{"vendor_id": "v{i}"}}')
+                          for i in range(4)]
+            return ModelResponse(output=output, usage=Usage(requests=1), response_id=None)
+
+        def stream_response(self, *args, **kwargs):
+            raise NotImplementedError
+
+    set_tracing_disabled(True)
+    agent = Agent(name="ParallelToolsAgent", instructions="Check", model=ParallelCallsModel(),
+                  tools=[check_availability])
+
+    async def run():
+        with observe_run(agent.name) as record:
+            result = await Runner.run(agent, "are v0-v3 free?", hooks=RUN_HOOKS)
+        return result, record
+
+    result, record = asyncio.run(run())
+    assert result.final_output == "all available"
+    first, second = record.turn_breakdown()
+    assert first["tool_calls"] == 4 and first["slowest_tool"] == "check_availability"
+    assert first["tools_busy_seconds"] >= 0.8
+    # Wall time is that of the slowest call, not the sum
+    assert first["tools_wall_seconds"] < 0.4
+    assert second["tool_calls"] == 0
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
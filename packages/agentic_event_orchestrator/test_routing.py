@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for chat turn routing.
+Run: python test_routing.py  (or pytest test_routing.py)
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from agents.routing import ROUTES, SAVED_SECONDS, ChatRouter, PreRouter, QuickReplies
+
+triage = SimpleNamespace(name="TriageAgent")
+booking = SimpleNamespace(name="BookingAgent")
+booking_follow_up = SimpleNamespace(name="BookingAgent")
+
+
+def test_sticky_router_follows_last_specialist_and_escalates():
+    router = ChatRouter(triage, {"BookingAgent": booking_follow_up})
+    state = {"slots": {"location": "Lahore"}}
+    route = router.select(state, "yes please")
+    assert route.agent is triage and route.kind == "triage"
+
+    # Triage handed off to booking: next turn skips triage
+    state = router.record(state, route, booking, {"TriageAgent": {"seconds": 0.8}, "BookingAgent": {"seconds": 1.0}})
+    assert state["active_agent"] == "BookingAgent" and state["slots"] == {"location": "Lahore"}
+    route = router.select(state, "the 14th works")
+    assert route.agent is booking_follow_up and route.kind == "sticky"
+
+    saved_before = SAVED_SECONDS.value()
+    state = router.record(state, route, booking, {"BookingAgent": {"seconds": 0.9}})
+    assert abs(SAVED_SECONDS.value() - saved_before - 0.8) < 1e-9
+
+    # Off-topic: booking handed back to triage, which answered itself
+    route = router.select(state, "what can you do?")
+    state = router.record(state, route, triage, {"BookingAgent": {"seconds": 0.3}, "TriageAgent": {"seconds": 0.5}})
+    assert state["active_agent"] is None
+    assert router.select(state, "thanks").agent is triage
+
+
+def test_sticky_routing_can_be_disabled():
+    router = ChatRouter(triage, {"BookingAgent": booking_follow_up}, sticky=False)
+    assert router.select({"active_agent": "BookingAgent"}, "ok").agent is triage
+
+
+def test_pre_router_dispatches_only_clear_cut_messages():
+    pre_router = PreRouter()
+    assert pre_router.classify("Please book the photographer for June 14").agent == "BookingAgent"
+    assert pre_router.classify("show my bookings").agent == "BookingAgent"
+    assert pre_router.classify("Find caterers in Lahore under 5 lakh").agent == "VendorDiscoveryAgent"
+    assert pre_router.classify("Send invitations to my guest list").agent == "MailAgent"
+    assert pre_router.classify("can you make a timeline for the mehndi").agent == "SchedulerAgent"
+    # Greetings, vague and multi-intent messages are left to the TriageAgent
+    assert pre_router.classify("hi there").agent is None
+    assert pre_router.classify("send it").agent is None
+    assert pre_router.classify("find caterers and book them, then invite everyone").agent is None
+
+
+def test_pre_router_takes_precedence_over_sticky_agent():
+    mail_follow_up = SimpleNamespace(name="MailAgent")
+    router = ChatRouter(triage, {"BookingAgent": booking_follow_up, "MailAgent": mail_follow_up},
+                        pre_router=PreRouter())
+    state = {"active_agent": "BookingAgent"}
+    route = router.select(state, "now send the RSVP invitations")
+    assert route.agent is mail_follow_up and route.kind == "prerouted"
+    assert router.select(state, "sounds good").kind == "sticky"
+
+
+def test_quick_replies_match_only_whole_greetings_and_thanks():
+    replies = QuickReplies("Welcome!")
+    assert replies.match("Hi there! 👋").intent == "greeting"
+    assert replies.match("Assalam o alaikum").text == "Welcome!"
+    assert replies.match("hey, what can you do?").intent == "greeting"
+    assert replies.match("What can you do?").intent == "capabilities"
+    assert replies.match("ok thanks a lot!").intent == "thanks"
+    for message in ("hi, I want to plan a wedding", "help me book a DJ", "thanks, now book it"):
+        assert replies.match(message) is None
+
+    router = ChatRouter(triage, {"BookingAgent": booking_follow_up})
+    router.record_quick_reply()
+    assert ROUTES.value(route="quick_reply", agent="TriageAgent") >= 1
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
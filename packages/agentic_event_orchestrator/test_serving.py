@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Tests for the request-serving layers.
+Run: python test_serving.py  (or pytest test_serving.py)
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+
+from _agents_sdk import Model, ModelResponse, Usage
+from llm.cache import replay_events
+from observability.tools import TOOL_CANCELLED, instrument_tool
+from serving import (
+    AdmissionController, AdmissionRejected, RequestCancelled, RequestDeadlines, ResponseCache, RunBudget,
+    RunBudgets, Warmup, run_bounded, run_within_budget,
+)
+from serving.admission import ADMISSION_QUEUE_TIME, ADMISSION_QUEUED, ADMISSION_REJECTED
+from serving.budgets import BUDGET_STOPS
+from serving.deadlines import REQUESTS_CANCELLED
+
+
+def _message(text):
+    return ResponseOutputMessage(
+        id="msg_test", type="message", role="assistant", status="completed",
+        content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+    )
+
+
+class FixedModel(Model):
+    """Answers every call with the same output items; streams them as a replayed response"""
+
+    def __init__(self, *output):
+        self.output = list(output)
+        self.calls = 0
+
+    async def get_response(self, *args, **kwargs):
+        self.calls += 1
+        return ModelResponse(output=self.output, usage=Usage(requests=1, input_tokens=50, output_tokens=10),
+                             response_id=None)
+
+    async def stream_response(self, *args, **kwargs):
+        self.calls += 1
+        for event in replay_events(self.output, "fixed-model", Usage(requests=1, input_tokens=50, output_tokens=10)):
+            yield event
+
+
+def _client(server):
+    import httpx
+    transport = httpx.ASGITransport(app=server.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test",
+                             headers={"X-API-Key": server.AI_SERVICE_API_KEY})
+
+
+def test_admission_queues_then_rejects_when_full_with_retry_after():
+    gate = AdmissionController(max_concurrent=1, per_key_concurrent=4, max_queue=1, queue_timeout=1.0)
+    queued, full = ADMISSION_QUEUED.value(), ADMISSION_REJECTED.value(reason="queue_full")
+    waits = ADMISSION_QUEUE_TIME.count()
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold(key):
+            async with gate.admit(key):
+                await release.wait()
+
+        first = asyncio.create_task(hold("key-a"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(hold("key-b"))  # no global slot left: queues
+        await asyncio.sleep(0)
+        assert (gate.in_flight, gate.waiting) == (1, 1)
+
+        try:
+            async with gate.admit("key-c"):
+                raise AssertionError("admitted past a full queue")
+        except AdmissionRejected as e:
+            rejection = e
+        release.set()
+        await asyncio.gather(first, second)
+        return rejection
+
+    rejection = asyncio.run(scenario())
+    # Retry-After: the queued request plus this one, at the initial 1s hold time, over 1 slot
+    assert rejection.reason == "queue_full" and rejection.retry_after == 2
+    assert (gate.in_flight, gate.waiting) == (0, 0)
+    snapshot = gate.snapshot()
+    assert snapshot["admitted"] == 2 and snapshot["queued"] == 1 and snapshot["rejected"]["queue_full"] == 1
+    assert ADMISSION_QUEUED.value() == queued + 1
+    assert ADMISSION_REJECTED.value(reason="queue_full") == full + 1
+    assert ADMISSION_QUEUE_TIME.count() == waits + 1
+
+
+def test_admission_per_key_cap_and_queue_timeout():
+    gate = AdmissionController(max_concurrent=4, per_key_concurrent=1, max_queue=8, queue_timeout=0.05)
+    timeouts = ADMISSION_REJECTED.value(reason="timeout")
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold(key):
+            async with gate.admit(key):
+                await release.wait()
+
+        busy = asyncio.create_task(hold("key-a"))
+        await asyncio.sleep(0)
+        # Global slots are free, but key-a already holds its only slot
+        try:
+            async with gate.admit("key-a"):
+                raise AssertionError("key-a admitted past its per-key cap")
+        except AdmissionRejected as e:
+            rejection = e
+        async with gate.admit("key-b"):  # other keys are not held up
+            assert gate.in_flight == 2
+        release.set()
+        await busy
+        return rejection
+
+    rejection = asyncio.run(scenario())
+    assert rejection.reason == "timeout" and rejection.retry_after >= 1
+    assert gate.snapshot()["queue_seconds_max"] >= 0.05
+    assert ADMISSION_REJECTED.value(reason="timeout") == timeouts + 1
+    assert (gate.in_flight, gate.waiting) == (0, 0) and not gate._keys
+
+
+def test_response_cache_normalizes_keys_expires_per_endpoint_and_evicts_lru():
+    cache = ResponseCache({"discover": 60, "plan": 0.05, "schedule": 0}, max_entries=2)
+    key = cache.make_key("discover", "Caterers  in\tLAHORE ", {"guests": 300, "city": "Lahore"})
+    assert key == cache.make_key("discover", "caterers in lahore", {"city": "Lahore", "guests": 300})
+    assert key != cache.make_key("plan", "caterers in lahore", {"city": "Lahore", "guests": 300})
+    assert key != cache.make_key("discover", "caterers in karachi", {"city": "Lahore", "guests": 300})
+    assert cache.make_key("schedule", "caterers in lahore", None) is None  # TTL 0: not cached
+
+    plan_key = cache.make_key("plan", "wedding plan", None)
+    cache.put("discover", key, "vendors")
+    cache.put("plan", plan_key, "plan")
+    assert cache.get("discover", key) == "vendors" and cache.get("plan", plan_key) == "plan"
+    time.sleep(0.06)
+    # "plan" has the short TTL; "discover" is still fresh
+    assert cache.get("plan", plan_key) is None and cache.get("discover", key) == "vendors"
+    assert cache.snapshot()["expirations"] == 1
+
+    first, second = cache.make_key("discover", "djs", None), cache.make_key("discover", "photographers", None)
+    cache.put("discover", first, "djs")
+    cache.get("discover", key)  # most recently used: survives the next insert
+    cache.put("discover", second, "photographers")
+    assert cache.get("discover", first) is None and cache.get("discover", key) == "vendors"
+    snapshot = cache.snapshot()
+    assert snapshot["entries"] == 2 and snapshot["evictions"] == 1
+    assert snapshot["hits"] == {"discover": 4, "plan": 1, "schedule": 0}
+    assert snapshot["misses"] == {"discover": 1, "plan": 1, "schedule": 0}
+
+
+def test_response_cache_headers_and_bypass_over_http():
+    import server
+    from agents.sdk_agents import vendor_discovery_agent
+
+    model = FixedModel(_message("Three caterers are free that day."))
+    saved = server._response_cache, vendor_discovery_agent.model
+    server._response_cache = ResponseCache({"discover": 60})
+    vendor_discovery_agent.model = model
+
+    async def scenario():
+        async with _client(server) as client:
+            async def post(message, **headers):
+                response = await client.post("/api/agent/discover", json={"message": message}, headers=headers)
+                assert response.status_code == 200, response.text
+                return response
+
+            miss = await post("Caterers in Lahore")
+            hit = await post("  caterers IN lahore ")
+            bypass = await post("caterers in lahore", **{"X-Cache-Bypass": "1"})
+            no_cache = await post("caterers in lahore", **{"Cache-Control": "no-cache"})
+            return miss, hit, bypass, no_cache
+
+    try:
+        miss, hit, bypass, no_cache = asyncio.run(scenario())
+        snapshot = server._response_cache.snapshot()
+    finally:
+        server._response_cache, vendor_discovery_agent.model = saved
+
+    assert miss.headers["X-Cache"] == "MISS" and hit.headers["X-Cache"] == "HIT"
+    assert bypass.headers["X-Cache"] == no_cache.headers["X-Cache"] == "BYPASS"
+    assert hit.json()["result"] == miss.json()["result"] == "Three caterers are free that day."
+    # The hit never reached the model and carries no usage of its own
+    assert hit.json()["usage"] is None and miss.json()["usage"] is not None
+    assert model.calls == 3
+    assert snapshot["hits"] == {"discover": 1} and snapshot["misses"] == {"discover": 1}
+
+
+def test_chat_stream_sends_handoff_tokens_and_usage_then_saves_the_session():
+    import json
+    from openai.types.responses import ResponseFunctionToolCall
+    import server
+    from _agents_sdk import handoff
+    from agents.sdk_agents import event_planner_agent, triage_agent
+
+    transfer = ResponseFunctionToolCall(type="function_call", call_id="call_handoff", arguments="{}",
+                                        name=handoff(event_planner_agent).tool_name)
+    triage_model, planner_model = FixedModel(transfer), FixedModel(_message("Let's start with the guest list."))
+    saved = triage_agent.model, event_planner_agent.model
+    triage_agent.model, event_planner_agent.model = triage_model, planner_model
+
+    async def scenario():
+        async with _client(server) as client:
+            body = {"message": "Could you take this one on for me?", "session_id": "stream-test"}
+            async with client.stream("POST", "/api/chat/stream", json=body) as response:
+                assert response.status_code == 200
+                assert response.headers["content-type"].startswith("text/event-stream")
+                raw = "".join([chunk async for chunk in response.aiter_text()])
+        events = []
+        for block in raw.strip().split("\n\n"):
+            name, data = block.split("\n", 1)
+            events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+        return events, await server._session_store.aget("stream-test")
+
+    try:
+        events, history = asyncio.run(scenario())
+    finally:
+        triage_agent.model, event_planner_agent.model = saved
+
+    assert [name for name, _ in events] == ["start", "handoff", "token", "done"]
+    assert events[0][1] == {"session_id": "stream-test"}
+    assert events[1][1]["from"] == "TriageAgent" and events[1][1]["to"] == "EventPlannerAgent"
+    assert events[2][1] == {"delta": "Let's start with the guest list."}
+    done = events[-1][1]
+    assert done["response"] == "Let's start with the guest list." and done["agent"] == "EventPlannerAgent"
+    assert done["stopped"] is None
+    assert done["usage"]["requests"] == 2 and done["usage"]["input_tokens"] == 100
+    assert (triage_model.calls, planner_model.calls) == (1, 1)
+
+    # The exchange is in the session once the stream has finished
+    assert [(m["role"], m["content"]) for m in history] == [
+        ("user", "Could you take this one on for me?"), ("assistant", "Let's start with the guest list."),
+    ]
+    assert server._session_store.get_state("stream-test")["usage"]["requests"] == 2
+
+
+def test_run_bounded_caps_parallelism_and_streams_in_completion_order():
+    running = {"now": 0, "peak": 0}
+
+    async def plan(delay):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(delay)
+        running["now"] -= 1
+        if delay == 0.02:
+            raise ValueError("bad request")
+        return f"planned in {delay}"
+
+    async def collect():
+        return [o async for o in run_bounded([0.08, 0.01, 0.02, 0.03, 0.01], plan, parallelism=2)]
+
+    outcomes = asyncio.run(collect())
+    assert running["peak"] == 2
+    assert [o.index for o in outcomes] == [1, 2, 3, 4, 0]
+    failed = [o for o in outcomes if not o.ok]
+    assert len(failed) == 1 and failed[0].index == 2 and isinstance(failed[0].error, ValueError)
+    assert outcomes[-1].value == "planned in 0.08"
+    assert outcomes[3].queued_ms >= 50  # item 4 waited for a slot until item 3 finished
+
+
+def test_batch_rejects_parallelism_below_one():
+    import server
+
+    async def scenario():
+        async with _client(server) as client:
+            body = {"requests": [{"message": "Plan a mehndi"}]}
+            return [
+                (await client.post("/api/agent/batch", json={**body, "parallelism": p})).status_code
+                for p in (-3, 0)
+            ]
+
+    assert asyncio.run(scenario()) == [422, 422]
+
+
+def test_run_bounded_cancels_pending_items_when_closed():
+    started = []
+
+    async def plan(i):
+        started.append(i)
+        await asyncio.sleep(0.01 if i == 0 else 5)
+        return i
+
+    async def first_only():
+        before = asyncio.all_tasks()
+        outcomes = run_bounded(range(4), plan, parallelism=2)
+        async for outcome in outcomes:
+            await outcomes.aclose()
+            await asyncio.sleep(0)
+            return outcome, asyncio.all_tasks() - before
+
+    first, leftover = asyncio.run(asyncio.wait_for(first_only(), timeout=2))
+    assert first.index == 0
+    assert 3 not in started
+    assert not leftover
+
+
+def test_deadlines_cancel_work_on_disconnect_and_timeout():
+    class FakeRequest:
+        def __init__(self, gone_after):
+            self.gone_at = None
+            self.gone_after = gone_after
+
+        async def is_disconnected(self):
+            now = asyncio.get_running_loop().time()
+            self.gone_at = self.gone_at or now + self.gone_after
+            return now >= self.gone_at
+
+    cancelled = []
+
+    @instrument_tool
+    def lookup_vendor():
+        return "found"
+
+    async def agent_run():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            # A sync tool reached after cancellation is refused
+            try:
+                lookup_vendor()
+            except Exception as e:
+                cancelled.append(type(e).__name__)
+            raise
+
+    deadlines = RequestDeadlines(default_seconds=0.1, per_endpoint={"/slow": 0, "/gone": 5}, poll_interval=0.01)
+    assert deadlines.seconds_for("/slow") is None and deadlines.seconds_for("/other") == 0.1
+
+    async def run(endpoint, request):
+        try:
+            await deadlines.run(endpoint, request, agent_run)
+        except RequestCancelled as e:
+            return e.reason
+
+    assert asyncio.run(run("/gone", FakeRequest(0.05))) == "client_disconnect"
+    assert asyncio.run(run("/other", None)) == "deadline"
+    assert cancelled == [True, "RunCancelled", True, "RunCancelled"]
+    assert REQUESTS_CANCELLED.value(endpoint="/gone", reason="client_disconnect") == 1
+    assert REQUESTS_CANCELLED.value(endpoint="/other", reason="deadline") == 1
+    assert TOOL_CANCELLED.value(tool="lookup_vendor") == 2
+
+    async def quick():
+        return "ok"
+
+    assert asyncio.run(deadlines.run("/slow", FakeRequest(1), quick)) == "ok"
+
+
+def test_warmup_reports_per_dependency_readiness():
+    async def slow_service():
+        await asyncio.sleep(1)
+
+    def broken_optional():
+        raise ConnectionError("unreachable")
+
+    warmup = Warmup(timeout=0.05, retry_base=0)
+    warmup.add("cache", lambda: "warm")
+    warmup.add("external", broken_optional, required=False)
+    assert warmup.snapshot()["status"] == "starting" and not warmup.ready
+
+    asyncio.run(warmup.run())
+    snapshot = warmup.snapshot()
+    deps = {d["name"]: d for d in snapshot["dependencies"]}
+    assert snapshot["ready"] and snapshot["status"] == "ready"
+    assert deps["cache"]["detail"] == "warm" and deps["cache"]["seconds"] is not None
+    assert not deps["external"]["ready"] and "unreachable" in deps["external"]["detail"]
+
+    warmup.add("service", slow_service)
+    asyncio.run(warmup.run())
+    assert not warmup.ready
+    assert warmup.snapshot()["dependencies"][-1]["detail"] == "timed out after 0.05s"
+
+
+def test_warmup_retries_failed_required_steps_until_ready():
+    attempts = {"sessions": 0}
+
+    def flaky_sessions():
+        attempts["sessions"] += 1
+        if attempts["sessions"] < 3:
+            raise ConnectionError("redis not up yet")
+        return "connected"
+
+    async def scenario():
+        warmup = Warmup(timeout=1.0, retry_base=0.01, retry_max=0.02)
+        warmup.add("sessions", flaky_sessions)
+        await warmup.run()
+        first = warmup.snapshot()
+        for _ in range(100):
+            if warmup.ready:
+                break
+            await asyncio.sleep(0.01)
+        await warmup.close()
+        return first, warmup.snapshot()
+
+    first, final = asyncio.run(scenario())
+    assert first["status"] == "not_ready" and "redis not up yet" in first["dependencies"][0]["detail"]
+    # /ready recovers without a restart once the dependency comes up
+    assert final["ready"] and final["status"] == "ready" and final["retries"] == 2
+    assert final["dependencies"][0]["detail"] == "connected"
+
+
+def test_run_budgets_stop_runs_with_a_progress_summary():
+    from openai.types.responses import ResponseFunctionToolCall
+    from _agents_sdk import Agent, MaxTurnsExceeded, set_tracing_disabled
+    from agents.sdk_agents import run_agent, run_agent_streamed
+    from serving import stopped_run
+    from observability import observe_run
+    from observability.tools import function_tool
+
+    os.environ["RUN_BUDGETS"] = "/api/agent/orchestrate=16//300000,/api/chat=4"
+    try:
+        budgets = RunBudgets.from_env()
+    finally:
+        del os.environ["RUN_BUDGETS"]
+    orchestrate = budgets.budget_for("/api/agent/orchestrate")
+    assert (orchestrate.max_turns, orchestrate.max_seconds, orchestrate.max_tokens) == (16, 90, 300000)
+    assert budgets.budget_for("/api/chat").max_turns == 4 and budgets.budget_for("/other").max_turns == 10
+
+    @function_tool
+    def lookup_venue() -> str:
+        """Look up a venue."""
+        return "found"
+
+    class LoopingModel(Model):
+        """Calls the tool on every turn, answering only after `finish_after` calls"""
+
+        def __init__(self, finish_after=None):
+            self.calls = 0
+            self.finish_after = finish_after
+
+        async def get_response(self, *args, **kwargs):
+            self.calls += 1
+            if self.calls == self.finish_after:
+                return ModelResponse(output=[_message("done")], usage=Usage(requests=1), response_id=None)
+            call = ResponseFunctionToolCall(type="function_call", call_id=f"call_{self.calls}",
+                                            name="lookup_venue", arguments="{}")
+            return ModelResponse(output=[call], usage=Usage(requests=1, input_tokens=900, output_tokens=100),
+                                 response_id=None)
+
+        async def stream_response(self, *args, **kwargs):
+            response = await self.get_response(*args, **kwargs)
+            for event in replay_events(response.output, "looping-model", response.usage):
+                yield event
+
+    set_tracing_disabled(True)
+
+    async def run(budget, finish_after=None):
+        agent = Agent(name="LoopingAgent", instructions="Plan", model=LoopingModel(finish_after), tools=[lookup_venue])
+        with observe_run(agent.name, budget):
+            return await run_within_budget(budget, run_agent(agent, "plan everything")), agent.model.calls
+
+    # Tokens: checked before each model call, so the fourth call never happens
+    stopped, calls = asyncio.run(run(RunBudget(endpoint="/test", max_turns=10, max_tokens=2500)))
+    assert stopped.limit == "tokens" and calls == 3
+    assert stopped.last_agent.name == "LoopingAgent"
+    assert "2,500 tokens" in stopped.final_output and "lookup_venue (x3)" in stopped.final_output
+    assert BUDGET_STOPS.value(endpoint="/test", limit="tokens", agent="LoopingAgent") == 1
+
+    stopped, calls = asyncio.run(run(RunBudget(endpoint="/test", max_turns=2)))
+    assert stopped.limit == "turns" and calls == 2
+    assert "2 model turns" in stopped.final_output
+    assert BUDGET_STOPS.value(endpoint="/test", limit="turns", agent="LoopingAgent") == 1
+
+    # RUN_MAX_TURNS=0 lifts the limit instead of falling back to the SDK's 10
+    result, calls = asyncio.run(run(RunBudget(endpoint="/test", max_turns=0), finish_after=14))
+    assert result.final_output == "done" and calls == 14
+
+    # Streamed runs stop the same way, raising from stream_events() as /api/chat/stream expects
+    async def run_streamed(budget):
+        agent = Agent(name="LoopingAgent", instructions="Plan", model=LoopingModel(), tools=[lookup_venue])
+        with observe_run(agent.name, budget):
+            result = run_agent_streamed(agent, "plan everything")
+            try:
+                async for _ in result.stream_events():
+                    pass
+            except MaxTurnsExceeded as e:
+                return stopped_run(budget, e), agent.model.calls
+
+    stopped, calls = asyncio.run(run_streamed(RunBudget(endpoint="/test", max_turns=3)))
+    assert stopped.limit == "turns" and calls == 3 and "lookup_venue (x3)" in stopped.final_output
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
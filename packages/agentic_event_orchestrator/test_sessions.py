@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Tests for the chat session store.
+Run: python test_sessions.py  (or pytest test_sessions.py)
+"""
+
+import asyncio
+import sys
+import os
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sessions import ConversationContext, SessionSingleFlight, SessionStore, WriteBehindSessionStore
+from sessions.context import estimate_tokens
+from sessions.backends import RedisSessionBackend, SqlSessionBackend
+from nlp_processor.slot_extractor import extract_slots
+
+
+class FakeRedis:
+    """Local stand-in for the redis-py calls the backend makes"""
+
+    def __init__(self):
+        self.data = {}
+        self.pipelines = 0
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def pipeline(self, transaction=True):
+        client = self
+        client.pipelines += 1
+
+        class Pipeline:
+            def __init__(self):
+                self.ops = []
+
+            def set(self, key, value, ex=None):
+                self.ops.append((key, value.encode("utf-8")))
+
+            def execute(self):
+                client.data.update(self.ops)
+
+        return Pipeline()
+
+
+def test_lru_eviction():
+    store = SessionStore(max_sessions=2)
+    store.append("a", "user", "hello", "t")
+    store.append("b", "user", "hello", "t")
+    store.get("a")  # a is now most recently used
+    store.append("c", "user", "hello", "t")
+
+    assert "a" in store and "c" in store
+    assert "b" not in store
+    assert store.stats()["evictions"] == 1
+
+
+def test_idle_ttl_expires_sessions():
+    store = SessionStore(ttl_seconds=0)
+    store.append("a", "user", "hello", "t")
+
+    assert store.get("a") == []
+    assert store.stats()["expirations"] == 1
+
+
+def test_byte_cap_drops_oldest_messages():
+    store = SessionStore(max_session_bytes=200)
+    for i in range(10):
+        store.append("a", "user", f"message {i} " + "x" * 40, "t")
+
+    history = store.get("a")
+    assert history[-1]["content"].startswith("message 9")
+    assert sum(len(m["content"]) for m in history) < 200
+    assert store.stats()["truncations"] > 0
+
+
+def test_message_cap_and_counters():
+    store = SessionStore(max_messages=20)
+    for i in range(25):
+        store.append("a", "user", str(i), "t")
+
+    history = store.get("a")
+    assert [m["content"] for m in history] == [str(i) for i in range(5, 25)]
+
+    # Only history reads are counted, not appends or state access
+    store.set_state("a", {"summary": "x"})
+    store.get_state("a")
+    store.get("b")
+    stats = store.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["sessions"] == 2
+
+
+def _shared_worker_roundtrip(make_backend):
+    # Two stores over one backend behave like two worker processes
+    worker_a = WriteBehindSessionStore(make_backend(), flush_interval=3600)
+    worker_b = WriteBehindSessionStore(make_backend(), flush_interval=3600)
+    try:
+        worker_a.append("s1", "user", "plan a wedding in Lahore", "t1")
+        worker_a.set_state("s1", {"slots": {"location": "Lahore"}})
+        worker_a.append("s2", "user", "book a DJ", "t1")
+        assert worker_b.get("s1") == []  # not flushed yet
+
+        assert worker_a.flush() == 2
+        assert worker_a.stats()["flushes"] == 1  # both sessions in one batch
+        assert [m["content"] for m in worker_b.get("s1")] == ["plan a wedding in Lahore"]
+        assert worker_b.get_state("s1") == {"slots": {"location": "Lahore"}}
+
+        worker_b.append("s1", "assistant", "What is your budget?", "t2")
+        worker_b.flush()
+        assert [m["role"] for m in worker_a.get("s1")] == ["user", "assistant"]
+    finally:
+        worker_a.close()
+        worker_b.close()
+
+
+def test_sqlite_backend_shares_sessions_between_workers():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        _shared_worker_roundtrip(lambda: SqlSessionBackend(sqlite_path=path))
+
+
+def test_quick_reply_on_another_worker_extends_the_shared_session():
+    import server
+    from agents.routing import QuickReply
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        worker_a = WriteBehindSessionStore(SqlSessionBackend(sqlite_path=path), flush_interval=3600)
+        worker_b = WriteBehindSessionStore(SqlSessionBackend(sqlite_path=path), flush_interval=3600)
+        saved = server._session_store
+        server._session_store = worker_b
+        try:
+            worker_a.append("s1", "user", "plan a wedding in Lahore", "t1")
+            worker_a.append("s1", "assistant", "What is your budget?", "t1")
+            worker_a.set_state("s1", {"active_agent": "EventPlannerAgent", "slots": {"location": "Lahore"}})
+            worker_a.flush()
+
+            asyncio.run(server.record_quick_reply("s1", "thanks!", QuickReply("thanks", "You're welcome!")))
+            worker_b.flush()
+
+            assert [m["content"] for m in worker_a.get("s1")] == [
+                "plan a wedding in Lahore", "What is your budget?", "thanks!", "You're welcome!",
+            ]
+            state = worker_a.get_state("s1")
+            assert state["active_agent"] == "EventPlannerAgent" and state["slots"] == {"location": "Lahore"}
+        finally:
+            server._session_store = saved
+            worker_a.close()
+            worker_b.close()
+
+
+def test_quick_reply_waits_for_the_turn_already_running():
+    import server
+    from agents.routing import QuickReply
+
+    async def scenario():
+        async with server._chat_flights.serialized("order-test"):
+            thanks = asyncio.create_task(
+                server.record_quick_reply("order-test", "thanks!", QuickReply("thanks", "You're welcome!"))
+            )
+            await asyncio.sleep(0.01)
+            assert server._session_store.get("order-test") == []
+            server.add_to_session("order-test", "user", "find me a caterer")
+            server.add_to_session("order-test", "assistant", "Here are three caterers.")
+        await thanks
+        return await server.load_session("order-test")
+
+    history = asyncio.run(scenario())
+    assert [m["content"] for m in history] == [
+        "find me a caterer", "Here are three caterers.", "thanks!", "You're welcome!",
+    ]
+
+
+def test_redis_backend_shares_sessions_between_workers():
+    fake = FakeRedis()
+    _shared_worker_roundtrip(lambda: RedisSessionBackend(client=fake))
+    assert fake.pipelines == 2
+
+
+def test_write_on_worker_that_never_read_the_session_keeps_shared_history():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        worker_a = WriteBehindSessionStore(SqlSessionBackend(sqlite_path=path), flush_interval=3600)
+        worker_b = WriteBehindSessionStore(SqlSessionBackend(sqlite_path=path), flush_interval=3600)
+        try:
+            worker_a.append("s1", "user", "plan a wedding in Lahore", "t1")
+            worker_a.set_state("s1", {"active_agent": "EventPlannerAgent"})
+            worker_a.flush()
+
+            # worker_b writes without a get() first
+            worker_b.append("s1", "user", "thanks!", "t2")
+            assert worker_b.flush() == 1
+
+            assert [m["content"] for m in worker_a.get("s1")] == ["plan a wedding in Lahore", "thanks!"]
+            assert worker_a.get_state("s1") == {"active_agent": "EventPlannerAgent"}
+        finally:
+            worker_a.close()
+            worker_b.close()
+
+
+def test_redis_backend_without_redis_package_names_the_extra():
+    from sessions import backends
+
+    saved = backends.REDIS_AVAILABLE
+    backends.REDIS_AVAILABLE = False
+    try:
+        RedisSessionBackend()
+    except backends.SessionBackendError as e:
+        assert "'redis' extra" in str(e)
+    else:
+        raise AssertionError("expected SessionBackendError")
+    finally:
+        backends.REDIS_AVAILABLE = saved
+
+
+def test_append_does_not_wait_on_backend():
+    class DownBackend:
+        def load(self, session_id):
+            return None
+
+        def save_many(self, sessions):
+            raise ConnectionError("backend down")
+
+        def close(self):
+            pass
+
+    store = WriteBehindSessionStore(DownBackend(), flush_interval=3600)
+    store.append("s1", "user", "hi", "t")
+    assert store.flush() == 0
+    stats = store.stats()
+    assert stats["flush_errors"] == 1 and stats["pending_writes"] == 1
+    # Unflushed history is still served locally
+    assert store.get("s1")[0]["content"] == "hi"
+    store.close()
+
+
+def test_async_get_loads_off_the_event_loop():
+    loop_thread = threading.get_ident()
+    loaded_on = []
+
+    class SlowBackend:
+        def __init__(self):
+            self.saved = {}
+
+        def load(self, session_id):
+            loaded_on.append(threading.get_ident())
+            time.sleep(0.05)
+            return {"messages": [{"role": "user", "content": "from the backend", "timestamp": "t0"}]}
+
+        def save_many(self, sessions):
+            self.saved.update(sessions)
+
+        def close(self):
+            pass
+
+    backend = SlowBackend()
+    store = WriteBehindSessionStore(backend, cache=SessionStore(max_sessions=1), flush_interval=3600)
+
+    async def scenario():
+        load = asyncio.create_task(store.aget("s1"))
+        await asyncio.sleep(0.01)  # the loop keeps running during the load
+        store.append("s1", "user", "written while loading", "t1")
+        return await load
+
+    history = asyncio.run(scenario())
+    assert loaded_on and loaded_on[0] != loop_thread
+    # The write loaded the session first; the slower load did not overwrite it
+    assert [m["content"] for m in history] == ["from the backend", "written while loading"]
+
+    store.append("s2", "user", "evicts s1", "t2")
+    assert store.flush() == 1  # s1 was evicted locally and skipped
+    assert list(backend.saved) == ["s2"] and store.stats()["flushed_sessions"] == 1
+    store.close()
+
+
+def test_single_flight_coalesces_duplicates_and_orders_distinct_messages():
+    flights = SessionSingleFlight()
+    calls = []
+
+    async def turn(message):
+        calls.append(message)
+        await asyncio.sleep(0.01)
+        return f"reply to {message}"
+
+    async def scenario():
+        return await asyncio.gather(
+            flights.run("s1", "book a DJ", lambda: turn("book a DJ")),
+            flights.run("s1", "book a DJ", lambda: turn("book a DJ")),  # double-click
+            flights.run("s1", "and a caterer", lambda: turn("and a caterer")),
+            flights.run("s2", "book a DJ", lambda: turn("s2: book a DJ")),  # other session
+        )
+
+    replies = asyncio.run(scenario())
+    assert replies[0] == replies[1] == "reply to book a DJ"
+    assert [c for c in calls if not c.startswith("s2")] == ["book a DJ", "and a caterer"]
+    assert "s2: book a DJ" in calls
+    stats = flights.stats()
+    assert stats["runs"] == 3 and stats["coalesced"] == 1
+    assert stats["active_sessions"] == 0 and stats["in_flight"] == 0
+
+
+def test_context_keeps_early_facts_within_token_budget():
+    store = SessionStore(max_messages=20)
+    context = ConversationContext(token_budget=300, max_message_tokens=60)
+
+    def add(role, content):
+        store.append("s1", role, content, "t")
+        store.set_state("s1", context.update(store.get_state("s1"), role, content))
+
+    add("user", "Planning a wedding in Lahore on June 14th 2025 for 300 guests, budget Rs 2,500,000")
+    add("assistant", "Great! Shall I look for caterers first?")
+    for i in range(30):
+        add("user", f"Tell me more about option {i} " + "with lots of detail " * 20)
+        add("assistant", f"Option {i} is a good fit " + "for many reasons " * 20)
+
+    prompt = context.build(store.get("s1"), store.get_state("s1"), "book the caterer")
+    assert estimate_tokens(prompt) <= 300 + estimate_tokens("\n\nUser: book the caterer")
+    # The opening message scrolled out of history long ago, its facts did not
+    assert "Planning a wedding" not in prompt
+    for fact in ("wedding", "June 14th 2025", "Rs 2,500,000", "Lahore", "Attendees: 300"):
+        assert fact in prompt
+    assert "Option 29 is a good fit" in prompt
+    assert prompt.endswith("User: book the caterer")
+
+
+def test_summary_keeps_facts_stated_late_in_a_long_message():
+    context = ConversationContext(token_budget=200, max_message_tokens=40)
+    state = context.update({}, "user", (
+        "Thanks so much for the quick reply, it has been a hectic week for the whole family. "
+        "We have been going back and forth on a lot of things and everyone has opinions. "
+        "Anyway, we settled on the Royal Palm Club for the reception. "
+        "Let me know what you think."
+    ))
+    state = context.update(state, "assistant", "Lovely choice, shall I check their availability?")
+
+    # The opening message has scrolled out of history; only its summary line is left
+    history = [{"role": "assistant", "content": "Lovely choice, shall I check their availability?", "timestamp": "t"}]
+    prompt = context.build(history, state, "book it")
+    # Past word 24 of the message, and not an extracted slot
+    assert "Royal Palm Club" in prompt
+    assert "going back and forth" not in prompt
+
+
+def test_budget_is_not_read_from_ordinary_words():
+    # "runs 4 hours 30 minutes" and "chairs 50" contain "rs" / "m" but no money
+    assert "budget" not in extract_slots("the event runs 4 hours 30 minutes")
+    assert "budget" not in extract_slots("we need 20 chairs 50 tables")
+    assert extract_slots("budget Rs. 50,000 for 20 chairs")["budget"] == "Rs. 50,000"
+    assert extract_slots("PKR 300k for catering")["budget"] == "PKR 300k"
+    assert extract_slots("around 2 million rupees")["budget"] == "2 million rupees"
+
+    context = ConversationContext()
+    state = context.update({}, "user", "The mehndi runs 4 hours 30 minutes with 20 chairs 50 tables")
+    prompt = context.build([], state, "what next?")
+    assert "Budget" not in prompt
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
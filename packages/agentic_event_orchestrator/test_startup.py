@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests that heavy optional dependencies stay out of server start-up.
+Run: python test_startup.py  (or pytest test_startup.py)
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_server_import_skips_heavy_optional_dependencies():
+    with open(os.path.join(HERE, "startup_budget.json"), encoding="utf-8") as f:
+        forbidden = json.load(f)["forbidden"]
+
+    script = (
+        "import json, sys, server; "
+        f"print(json.dumps([m for m in {forbidden!r} if m in sys.modules]))"
+    )
+    env = dict(os.environ, LITELLM_LOCAL_MODEL_COST_MAP="True")
+    proc = subprocess.run([sys.executable, "-c", script], cwd=HERE, env=env,
+                          capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert json.loads(proc.stdout.strip().splitlines()[-1]) == []
+
+
+def test_legacy_agents_and_litellm_still_load_on_demand():
+    script = (
+        "import agents, _agents_sdk; "
+        "assert _agents_sdk.LitellmModel.__name__ == 'LitellmModel'; "
+        "agents.EventPlannerAgent; "
+        "import agents.routing  # the local package is still 'agents' afterwards"
+    )
+    env = dict(os.environ, LITELLM_LOCAL_MODEL_COST_MAP="True")
+    proc = subprocess.run([sys.executable, "-c", script], cwd=HERE, env=env,
+                          capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
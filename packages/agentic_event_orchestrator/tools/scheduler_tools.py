@@ -7,7 +7,7 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from _agents_sdk import function_tool
+from observability.tools import function_tool
 from pydantic import BaseModel, Field
 
 # Import existing optimizer